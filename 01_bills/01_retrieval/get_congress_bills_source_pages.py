@@ -36,6 +36,28 @@ def get_congress_bills_source_pages(
         bool,
         typer.Option(help="Whether to refetch data and overwrite an existing page"),
     ] = False,
+    cache_location: Annotated[
+        str,
+        typer.Option(
+            help="Local SQLite file used to record/replay API responses. No caching if not provided."
+        ),
+    ] = None,
+    cache_mode: Annotated[
+        str,
+        typer.Option(
+            help="Response cache mode (record, replay, refresh). replay never calls the API."
+        ),
+    ] = "record",
+    cache_ttl: Annotated[
+        float,
+        typer.Option(help="Seconds after which cached responses are refetched."),
+    ] = None,
+    cache_max_size: Annotated[
+        int,
+        typer.Option(
+            help="Maximum size in bytes of the response cache, least recently used responses are evicted."
+        ),
+    ] = None,
     log_level: Annotated[
         str,
         typer.Option(
@@ -65,6 +87,10 @@ def get_congress_bills_source_pages(
         output_location=output_location,
         page_limit=page_limit,
         overwrite=overwrite,
+        cache_location=cache_location,
+        cache_mode=cache_mode,
+        cache_ttl=cache_ttl,
+        cache_max_size=cache_max_size,
     )
 
 
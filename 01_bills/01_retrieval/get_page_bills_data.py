@@ -8,6 +8,7 @@ from pathlib import Path
 from utils.fetch_store import (
     fetch_and_store_bills_from_source_page,
 )
+from utils.text_versions import TEXT_VERSION_POLICIES
 
 
 def get_bills_from_source_page(
@@ -37,6 +38,34 @@ def get_bills_from_source_page(
         bool,
         typer.Option(help="Whether to refetch data and overwrite existing bill files"),
     ] = False,
+    cache_location: Annotated[
+        str,
+        typer.Option(
+            help="Local SQLite file used to record/replay API responses. No caching if not provided."
+        ),
+    ] = None,
+    cache_mode: Annotated[
+        str,
+        typer.Option(
+            help="Response cache mode (record, replay, refresh). replay never calls the API."
+        ),
+    ] = "record",
+    cache_ttl: Annotated[
+        float,
+        typer.Option(help="Seconds after which cached responses are refetched."),
+    ] = None,
+    cache_max_size: Annotated[
+        int,
+        typer.Option(
+            help="Maximum size in bytes of the response cache, least recently used responses are evicted."
+        ),
+    ] = None,
+    text_version_policy: Annotated[
+        str,
+        typer.Option(
+            help="Text versions to download (all, latest, introduced, enrolled). Use the policy gathering will read to download only the texts it needs."
+        ),
+    ] = "all",
     log_level: Annotated[
         str,
         typer.Option(
@@ -52,6 +81,8 @@ def get_bills_from_source_page(
     level_enum = getattr(logging, log_level, None)
     if not isinstance(level_enum, int):
         raise typer.BadParameter(f"Invalid log level: {log_level}")
+    if text_version_policy not in TEXT_VERSION_POLICIES:
+        raise typer.BadParameter(f"Unknown text version policy: {text_version_policy}")
     logging.basicConfig(
         level=level_enum,
         format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
@@ -66,6 +97,11 @@ def get_bills_from_source_page(
         source_file=source_file,
         output_location=output_location,
         overwrite=overwrite,
+        text_version_policy=text_version_policy,
+        cache_location=cache_location,
+        cache_mode=cache_mode,
+        cache_ttl=cache_ttl,
+        cache_max_size=cache_max_size,
     )
 
 
@@ -4,6 +4,7 @@ import ray
 import logging
 
 from typing_extensions import Annotated
+from utils.text_versions import TEXT_VERSION_POLICIES
 
 logger = logging.getLogger("ray")
 logger.setLevel(logging.DEBUG)
@@ -52,6 +53,12 @@ def get_congress_range_bills(
         bool,
         typer.Option(help="Whether to refetch data and overwrite existing bill files"),
     ] = False,
+    text_version_policy: Annotated[
+        str,
+        typer.Option(
+            help="Text versions to download (all, latest, introduced, enrolled). Use the policy gathering will read to download only the texts it needs."
+        ),
+    ] = "all",
     log_level: Annotated[
         str,
         typer.Option(
@@ -59,6 +66,9 @@ def get_congress_range_bills(
         ),
     ] = "INFO",
 ):
+    if text_version_policy not in TEXT_VERSION_POLICIES:
+        raise typer.BadParameter(f"Unknown text version policy: {text_version_policy}")
+
     ray.init()
 
     result = []
@@ -71,6 +81,7 @@ def get_congress_range_bills(
                 source_location=source_location,
                 output_location=output_location,
                 overwrite=overwrite,
+                text_version_policy=text_version_policy,
                 log_level=log_level,
             )
         )
@@ -1,9 +1,13 @@
+import json
 import requests
 import logging
 import pathlib
 import urllib.parse
 from requests.adapters import HTTPAdapter, Retry
 
+from .cache import ResponseCache
+from .text_versions import TEXT_TYPES
+
 json_headers = {
     "Content-Type": "application/json",
     "Accept": "application/json",
@@ -21,14 +25,14 @@ BILL_SUBFIELDS = {
     "textVersions": "text",
 }
 TEXT_SUBFIELD = "textVersions"
-TEXT_TYPES = ["Formatted Text", "Formatted XML"]
 
 
 class LoCBillsAPI(object):
-    def __init__(self, api_url, api_key):
+    def __init__(self, api_url, api_key, cache: ResponseCache = None):
 
         self.split_api_url = urllib.parse.urlsplit(api_url)
         self.api_key = api_key
+        self.cache = cache
 
         self.session = requests.Session()
         retries = Retry(
@@ -48,6 +52,11 @@ class LoCBillsAPI(object):
         url = urllib.parse.urlunsplit(url_components)
         logger.debug(f"GET: {url=} {qs=}")
         qs["api_key"] = self.api_key
+        if self.cache:
+            resp_text = self.cache.fetch(
+                url, qs, lambda: self._get_text(url, qs, json_headers)
+            )
+            return json.loads(resp_text)
         response = self.session.get(url, params=qs, headers=json_headers)
         response.raise_for_status()
         resp_json = response.json()
@@ -71,7 +80,12 @@ class LoCBillsAPI(object):
 
     def get_bill_text(self, url):
         logger.debug(f"GET: {url=}")
-        response = self.session.get(url)
+        if self.cache:
+            return self.cache.fetch(url, {}, lambda: self._get_text(url))
+        return self._get_text(url)
+
+    def _get_text(self, url, params=None, headers=None):
+        response = self.session.get(url, params=params, headers=headers)
         response.raise_for_status()
         resp_data = response.text
         return resp_data
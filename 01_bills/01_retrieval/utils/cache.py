@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import urllib.parse
+import zlib
+
+from pathlib import Path
+
+logger = logging.getLogger("ray")
+
+CACHE_MODES = ["record", "replay", "refresh"]
+EXCLUDED_PARAMS = {"api_key"}
+EVICTION_INTERVAL = 500
+
+
+class CacheMissError(LookupError):
+    pass
+
+
+def normalize_request(url: str, params: dict = None) -> str:
+    """
+    Returns a canonical form of a request: lower-cased scheme and host, no
+    trailing slash, and query parameters (from the url and params) sorted,
+    with the api_key removed.
+    """
+    split_url = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(split_url.query)
+    query.extend((str(k), str(v)) for k, v in (params or {}).items())
+    query = sorted((k, v) for k, v in query if k not in EXCLUDED_PARAMS)
+    return urllib.parse.urlunsplit(
+        (
+            split_url.scheme.lower(),
+            split_url.netloc.lower(),
+            split_url.path.rstrip("/") or "/",
+            urllib.parse.urlencode(query),
+            "",
+        )
+    )
+
+
+def request_key(url: str, params: dict = None) -> str:
+    return hashlib.sha256(normalize_request(url, params).encode("utf-8")).hexdigest()
+
+
+class ResponseCache(object):
+    """
+    On-disk (SQLite) record/replay cache of Congress.gov API responses.
+
+    Modes:
+    'record': return cached responses, fetching and storing any missing or expired;
+    'replay': only return cached responses, raising CacheMissError when missing;
+    'refresh': always fetch and overwrite the cached response.
+
+    Entries older than `ttl` seconds are refetched in 'record' mode (replay serves them
+    as stored) and removed on eviction. When `max_size` (bytes of stored responses)
+    is exceeded the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        mode: str = "record",
+        ttl: float = None,
+        max_size: int = None,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(
+                f"Invalid cache mode: {mode} (expected one of {CACHE_MODES})"
+            )
+        self.location = Path(location)
+        self.mode = mode
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+        self.location.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._connection = sqlite3.connect(
+            self.location, timeout=60, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._connection.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, url: str, params: dict = None):
+        """
+        Returns the cached response text for a request, or None.
+        """
+        key = request_key(url, params)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, created_at = row
+            if self.mode == "record" and self._is_expired(created_at, now):
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+        return zlib.decompress(body).decode("utf-8")
+
+    def put(self, url: str, params: dict, text: str):
+        key = request_key(url, params)
+        body = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, normalize_request(url, params), body, len(body), now, now),
+            )
+            self._connection.commit()
+            self._puts += 1
+            self.stats["stored"] += 1
+        if self._puts % EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def fetch(self, url: str, params: dict, fetch_function) -> str:
+        """
+        Returns the response text for a request according to the cache mode,
+        calling fetch_function() to get it from the API when required.
+        """
+        if self.mode != "refresh":
+            text = self.get(url, params)
+            if text is not None:
+                self.stats["hits"] += 1
+                logger.debug(f"Cache hit: {url=}")
+                return text
+        self.stats["misses"] += 1
+        if self.mode == "replay":
+            raise CacheMissError(
+                f"No cached response for: {normalize_request(url, params)}"
+            )
+        text = fetch_function()
+        self.put(url, params, text)
+        return text
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def evict(self):
+        """
+        Removes expired entries, then least recently used entries until
+        the cache is within max_size.
+        """
+        evicted = 0
+        with self._lock:
+            if self.ttl is not None:
+                cursor = self._connection.execute(
+                    "DELETE FROM responses WHERE created_at < ?",
+                    (time.time() - self.ttl,),
+                )
+                evicted += cursor.rowcount
+            if self.max_size is not None:
+                total = self._connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()[0]
+                if total > self.max_size:
+                    rows = self._connection.execute(
+                        "SELECT key, size FROM responses ORDER BY accessed_at"
+                    )
+                    keys = []
+                    for key, size in rows:
+                        if total <= self.max_size:
+                            break
+                        keys.append((key,))
+                        total -= size
+                    self._connection.executemany(
+                        "DELETE FROM responses WHERE key = ?", keys
+                    )
+                    evicted += len(keys)
+            self._connection.commit()
+        self.stats["evicted"] += evicted
+        if evicted:
+            logger.debug(f"Evicted cached responses: {evicted}")
+        return evicted
+
+    def close(self):
+        self.evict()
+        self._connection.close()
+
+
+def init_response_cache(
+    cache_location: str = None,
+    cache_mode: str = "record",
+    cache_ttl: float = None,
+    cache_max_size: int = None,
+):
+    """
+    Returns a ResponseCache for the given location, or None if no location is given.
+    """
+    if not cache_location:
+        return None
+    return ResponseCache(
+        location=cache_location, mode=cache_mode, ttl=cache_ttl, max_size=cache_max_size
+    )
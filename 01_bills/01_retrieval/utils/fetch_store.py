@@ -11,6 +11,9 @@ from .api import (
     TEXT_SUBFIELD,
     TEXT_TYPES,
 )
+from .cache import (
+    init_response_cache,
+)
 from .location import (
     init_location,
 )
@@ -18,6 +21,9 @@ from .status import (
     is_bill_processed,
     is_page_processed,
 )
+from .text_versions import (
+    select_text_urls,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -92,17 +98,24 @@ def fetch_and_store_congress_bills_source_pages(
     output_location: str,
     page_limit: int,
     overwrite: bool,
+    cache_location: str = None,
+    cache_mode: str = "record",
+    cache_ttl: float = None,
+    cache_max_size: int = None,
 ):
     """
     Get all pages of bills for the provided congress from the congress.gov API
     from the /bill/bill_list_by_congress endpoint,
     and save them in the output directory provided.
+    When a cache_location is provided, API responses are recorded to/replayed from
+    a local response cache (see `ResponseCache`).
     """
 
     filesystem, output_location = init_location(
         output_location, is_dir=True, is_dest=True
     )
-    bills_api = LoCBillsAPI(api_url, api_key)
+    cache = init_response_cache(cache_location, cache_mode, cache_ttl, cache_max_size)
+    bills_api = LoCBillsAPI(api_url, api_key, cache=cache)
     page_offset = 0
     dest_path = fetch_and_store_bills_source_page(
         bills_api=bills_api,
@@ -127,6 +140,8 @@ def fetch_and_store_congress_bills_source_pages(
             page_limit=page_limit,
             overwrite=overwrite,
         )
+    if cache:
+        cache.close()
 
 
 def fetch_and_store_subfield_data(
@@ -139,7 +154,13 @@ def fetch_and_store_subfield_data(
     output_location: str,
     filesystem: fsspec.filesystem,
     overwrite: bool,
+    text_version_policy: str = "all",
 ):
+    """
+    Fetch and store a subfield of a bill. For the `textVersions` subfield, also fetch and store the texts
+    (of the TEXT_TYPES formats) of the text versions selected by the text version policy
+    (a name of TEXT_VERSION_POLICIES, e.g. "all" or "latest")
+    """
     status = {"present": False}
     if bill_json.get("bill").get(subfield_name):
         url_name = BILL_SUBFIELDS.get(subfield_name)
@@ -173,37 +194,28 @@ def fetch_and_store_subfield_data(
                 return status
         if subfield_name == TEXT_SUBFIELD:
             status["bill_texts"] = status.get("bill_texts", {})
-            for text_version in subfield_json.get("textVersions"):
-                for format in text_version.get("formats"):
-                    if format.get("type").strip() in TEXT_TYPES:
-                        url = format.get("url")
-                        text_file_name = url.split("/")[-1]
-                        text_status = status.get("bill_texts", {}).get(
-                            text_file_name, {}
-                        )
-                        bill_text_path = f"{output_location}{text_file_name}"
-                        if filesystem.exists(bill_text_path) and not overwrite:
-                            text_status["location"] = bill_text_path
-                            text_status["processed"] = True
-                            logger.debug(
-                                f"Skipping existing bill text: {bill_text_path}"
-                            )
-                        else:
-                            try:
-                                bill_text = bills_api.get_bill_text(url)
-                                with filesystem.open(bill_text_path, "w") as f_out:
-                                    f_out.write(bill_text)
-                                logger.debug(f"Stored bill text: {bill_text_path}")
-                                text_status["location"] = bill_text_path
-                                text_status["processed"] = True
-                            except Exception as e:
-                                text_status["processed"] = False
-                                text_status["exception"] = str(e)
-                                logger.info(
-                                    f"Bill text error: ({bill_text_path}, {str(e)})"
-                                )
-
-                        status["bill_texts"][text_file_name] = text_status
+            for url in select_text_urls(subfield_json, text_version_policy, TEXT_TYPES):
+                text_file_name = url.split("/")[-1]
+                text_status = status.get("bill_texts", {}).get(text_file_name, {})
+                bill_text_path = f"{output_location}{text_file_name}"
+                if filesystem.exists(bill_text_path) and not overwrite:
+                    text_status["location"] = bill_text_path
+                    text_status["processed"] = True
+                    logger.debug(f"Skipping existing bill text: {bill_text_path}")
+                else:
+                    try:
+                        bill_text = bills_api.get_bill_text(url)
+                        with filesystem.open(bill_text_path, "w") as f_out:
+                            f_out.write(bill_text)
+                        logger.debug(f"Stored bill text: {bill_text_path}")
+                        text_status["location"] = bill_text_path
+                        text_status["processed"] = True
+                    except Exception as e:
+                        text_status["processed"] = False
+                        text_status["exception"] = str(e)
+                        logger.info(f"Bill text error: ({bill_text_path}, {str(e)})")
+
+                status["bill_texts"][text_file_name] = text_status
         return status
 
 
@@ -214,6 +226,7 @@ def fetch_and_store_bill_data(
     bill_number: int,
     output_location: str,
     overwrite: bool,
+    text_version_policy: str = "all",
 ):
     """
     Fetch the detailed data for a bill from the congress.gov API
@@ -221,7 +234,8 @@ def fetch_and_store_bill_data(
     save this at the subpath /{congress}/{house}/{bill_number}/bill.json of the provided output location.
     For each of the subfields specified in the BILL_SUBFIELDS that are present in the detailed bill data,
     fetch the subfield data from the congress.gov API and store alongside the bill.json (e.g. text.json).
-    When the subfield is `textVersions`, also fetch all iterations of the bill text in the XML format and store alongside bill.json.
+    When the subfield is `textVersions`, also fetch the iterations of the bill text selected by the text version policy
+    (all of them by default) in the TEXT_TYPES formats and store alongside bill.json.
     """
     logger.info(f"Processing Bill: ({congress=}, {house=}, {bill_number=})")
 
@@ -257,6 +271,7 @@ def fetch_and_store_bill_data(
             output_location=bill_output,
             filesystem=filesystem,
             overwrite=overwrite,
+            text_version_policy=text_version_policy,
         )
         status["subfields"][subfield_name] = subfield_status
     return status
@@ -269,6 +284,11 @@ def fetch_and_store_bills_from_source_page(
     output_location: str,
     overwrite: bool,
     status_data: dict = {},
+    cache_location: str = None,
+    cache_mode: str = "record",
+    cache_ttl: float = None,
+    cache_max_size: int = None,
+    text_version_policy: str = "all",
 ):
 
     source_filesystem, source_file = init_location(source_file)
@@ -281,7 +301,8 @@ def fetch_and_store_bills_from_source_page(
     if not status_data:
         status_data = json.load(source_filesystem.open(source_status_file, "r"))
 
-    bills_api = LoCBillsAPI(api_url, api_key)
+    cache = init_response_cache(cache_location, cache_mode, cache_ttl, cache_max_size)
+    bills_api = LoCBillsAPI(api_url, api_key, cache=cache)
     page_bills = source_data.get("bills")
     total_bills = len(page_bills)
     for count, bill_data in enumerate(source_data.get("bills"), start=1):
@@ -302,6 +323,7 @@ def fetch_and_store_bills_from_source_page(
                 bill_number=bill_number,
                 output_location=output_location,
                 overwrite=overwrite,
+                text_version_policy=text_version_policy,
             )
             status_data["bills"][bill_path] = bill_status
             json.dump(
@@ -309,6 +331,8 @@ def fetch_and_store_bills_from_source_page(
             )
         else:
             logger.info(f"Bill already processed: {bill_path}")
+    if cache:
+        cache.close()
 
 
 def fetch_and_store_congress_bills(
@@ -318,6 +342,11 @@ def fetch_and_store_congress_bills(
     source_location: str,
     output_location: str,
     overwrite: bool,
+    cache_location: str = None,
+    cache_mode: str = "record",
+    cache_ttl: float = None,
+    cache_max_size: int = None,
+    text_version_policy: str = "all",
 ):
     source_filesystem, source_dir = init_location(source_location, is_dir=True)
 
@@ -332,6 +361,11 @@ def fetch_and_store_congress_bills(
                 source_file=s3_page_uri,
                 output_location=output_location,
                 overwrite=overwrite,
+                cache_location=cache_location,
+                cache_mode=cache_mode,
+                cache_ttl=cache_ttl,
+                cache_max_size=cache_max_size,
+                text_version_policy=text_version_policy,
             )
 
 
@@ -342,6 +376,11 @@ def fetch_and_store_congress_bills_by_status(
     source_location: str,
     output_location: str,
     overwrite: bool,
+    cache_location: str = None,
+    cache_mode: str = "record",
+    cache_ttl: float = None,
+    cache_max_size: int = None,
+    text_version_policy: str = "all",
 ):
     source_filesystem, source_dir = init_location(source_location, is_dir=True)
     source_pages = source_filesystem.glob(f"{source_dir}{congress}_*.json")
@@ -362,6 +401,11 @@ def fetch_and_store_congress_bills_by_status(
                 output_location=output_location,
                 overwrite=overwrite,
                 status_data=status_data,
+                cache_location=cache_location,
+                cache_mode=cache_mode,
+                cache_ttl=cache_ttl,
+                cache_max_size=cache_max_size,
+                text_version_policy=text_version_policy,
             )
 
 
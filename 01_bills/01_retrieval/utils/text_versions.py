@@ -0,0 +1,75 @@
+TEXT_TYPES = ["Formatted Text", "Formatted XML"]
+
+
+def dated_versions(text_versions: list) -> list:
+    """
+    Returns the text versions with a date, from the oldest to the most recent
+    """
+    return sorted(
+        filter(lambda x: x.get("date"), text_versions), key=lambda d: d["date"]
+    )
+
+
+def latest_versions(text_versions: list) -> list:
+    """
+    The most recent (dated) text version
+    """
+    return dated_versions(text_versions)[-1:]
+
+
+def introduced_versions(text_versions: list) -> list:
+    """
+    The text versions as introduced (e.g. "Introduced in House")
+    """
+    return [v for v in text_versions if "Introduced in" in (v.get("type") or "")]
+
+
+def enrolled_versions(text_versions: list) -> list:
+    """
+    The text versions as enrolled (e.g. "Enrolled Bill"), passed by both chambers
+    """
+    return [v for v in text_versions if "Enrolled" in (v.get("type") or "")]
+
+
+def all_versions(text_versions: list) -> list:
+    """
+    Every text version, from the most recent (undated versions last)
+    """
+    return dated_versions(text_versions)[::-1] + [
+        v for v in text_versions if not v.get("date")
+    ]
+
+
+# each policy returns the text versions to use, in order of preference
+TEXT_VERSION_POLICIES = {
+    "latest": latest_versions,
+    "introduced": introduced_versions,
+    "enrolled": enrolled_versions,
+    "all": all_versions,
+}
+
+
+def select_text_versions(text_json: dict, policy="latest") -> list:
+    """
+    Returns the text versions of a text.json selected by a policy (a name of TEXT_VERSION_POLICIES,
+    or a function of the list of text versions)
+    """
+    select = policy if callable(policy) else TEXT_VERSION_POLICIES[policy]
+    return select(text_json.get("textVersions") or [])
+
+
+def select_text_urls(
+    text_json: dict, policy="latest", text_types: list = TEXT_TYPES
+) -> list:
+    """
+    Returns the urls of the formats (of the text types) of the text versions selected by a policy,
+    in order of preference
+    """
+    urls = []
+    for text_version in select_text_versions(text_json, policy):
+        for text_format in text_version.get("formats") or []:
+            url = text_format.get("url")
+            text_type = (text_format.get("type") or "").strip()
+            if text_type in text_types and url not in urls:
+                urls.append(url)
+    return urls
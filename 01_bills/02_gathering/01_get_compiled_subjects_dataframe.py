@@ -4,19 +4,32 @@ import logging
 from pathlib import Path
 from typing_extensions import Annotated
 from utils.dataframe import fetch_and_populate_subject_dataframe_from_source_data
+from utils.source import BATCH_SIZE, PREFETCH
 
 import pandas as pd
 
 
 def get_compiled_subjects_dataframe(
     source_directory: Annotated[
-        Path,
-        typer.Option(help="Location to retrieve source data fetched from the API."),
-    ] = Path("../../local_data/01_bills/source_bills"),
+        str,
+        typer.Option(
+            help="Location to retrieve source data fetched from the API. Can be a s3 uri (e.g. s3://loc-responsible-datasets-source-data/01_bills/source_bills) or a directory path."
+        ),
+    ] = "../../local_data/01_bills/source_bills",
     output_path: Annotated[
         Path,
         typer.Option(help="Location to dataframe created."),
     ] = Path("../../local_data/01_bills/generated_data/full_compiled_subjects.csv.gz"),
+    batch_size: Annotated[
+        int,
+        typer.Option(help="Number of bills whose files are fetched concurrently."),
+    ] = BATCH_SIZE,
+    prefetch: Annotated[
+        int,
+        typer.Option(
+            help="Number of batches fetched ahead (0 to fetch one at a time)."
+        ),
+    ] = PREFETCH,
     log_level: Annotated[
         str,
         typer.Option(
@@ -42,7 +55,10 @@ def get_compiled_subjects_dataframe(
     logging.getLogger("charset_normalizer").setLevel(logging.WARNING)
 
     fetch_and_populate_subject_dataframe_from_source_data(
-        source_directory=source_directory, output_path=output_path
+        source_directory=source_directory,
+        output_path=output_path,
+        batch_size=batch_size,
+        prefetch=prefetch,
     )
 
 
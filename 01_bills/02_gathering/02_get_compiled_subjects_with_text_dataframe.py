@@ -6,15 +6,20 @@ from typing_extensions import Annotated
 from utils.dataframe import (
     fetch_and_populate_subject_bill_text_dataframe_from_source_data,
 )
+from utils.source import BATCH_SIZE, PREFETCH
+from utils.text_versions import TEXT_VERSION_POLICIES
+from utils.token_store import TOKENIZERS, TokenStoreWriter
 
 import pandas as pd
 
 
 def get_compiled_subjects_dataframe(
     source_directory: Annotated[
-        Path,
-        typer.Option(help="Location to retrieve source data fetched from the API."),
-    ] = Path("../../local_data/01_bills/source_bills"),
+        str,
+        typer.Option(
+            help="Location to retrieve source data fetched from the API. Can be a s3 uri (e.g. s3://loc-responsible-datasets-source-data/01_bills/source_bills) or a directory path."
+        ),
+    ] = "../../local_data/01_bills/source_bills",
     output_path: Annotated[
         Path,
         typer.Option(help="Location to dataframe created."),
@@ -25,6 +30,46 @@ def get_compiled_subjects_dataframe(
         str,
         typer.Option(help="Glob pattern used to loop through source directory."),
     ] = "*/*/*",
+    batch_size: Annotated[
+        int,
+        typer.Option(help="Number of bills whose files are fetched concurrently."),
+    ] = BATCH_SIZE,
+    prefetch: Annotated[
+        int,
+        typer.Option(
+            help="Number of batches fetched ahead (0 to fetch one at a time)."
+        ),
+    ] = PREFETCH,
+    summaries: Annotated[
+        bool,
+        typer.Option(
+            help="Include the latest summary of each bill (from summaries.json, HTML stripped) as a summary column."
+        ),
+    ] = False,
+    token_store_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location to write a memory mapped token store of the bill texts (tokens.bin, offsets.npy), not written if not given."
+        ),
+    ] = None,
+    tokenizer: Annotated[
+        str,
+        typer.Option(
+            help="Tokenizer of the token store: word (ids from a vocabulary saved with the store) or hashing (hashed ids)."
+        ),
+    ] = "word",
+    text_version_policy: Annotated[
+        str,
+        typer.Option(
+            help="Text version read as the billText of each bill (latest, introduced, enrolled or all for the latest with a text)."
+        ),
+    ] = "latest",
+    checkpoint_directory: Annotated[
+        Path,
+        typer.Option(
+            help="Directory to checkpoint each gathered congress/billType to (with a manifest.json and errors.csv), resuming from it if present. Not checkpointed if not given."
+        ),
+    ] = None,
     log_level: Annotated[
         str,
         typer.Option(
@@ -41,6 +86,10 @@ def get_compiled_subjects_dataframe(
     level_enum = getattr(logging, log_level, None)
     if not isinstance(level_enum, int):
         raise typer.BadParameter(f"Invalid log level: {log_level}")
+    if text_version_policy not in TEXT_VERSION_POLICIES:
+        raise typer.BadParameter(f"Unknown text version policy: {text_version_policy}")
+    if tokenizer not in TOKENIZERS:
+        raise typer.BadParameter(f"Unknown tokenizer: {tokenizer}")
     logging.basicConfig(
         level=level_enum,
         format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
@@ -49,11 +98,24 @@ def get_compiled_subjects_dataframe(
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("charset_normalizer").setLevel(logging.WARNING)
 
+    token_store = (
+        TokenStoreWriter(token_store_location, TOKENIZERS[tokenizer]())
+        if token_store_location
+        else None
+    )
     fetch_and_populate_subject_bill_text_dataframe_from_source_data(
         source_directory=source_directory,
         output_path=output_path,
         glob_pattern=glob_pattern,
+        batch_size=batch_size,
+        prefetch=prefetch,
+        with_summaries=summaries,
+        text_version_policy=text_version_policy,
+        token_store=token_store,
+        checkpoint_directory=checkpoint_directory,
     )
+    if token_store is not None:
+        token_store.close()
 
 
 if __name__ == "__main__":
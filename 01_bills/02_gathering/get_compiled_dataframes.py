@@ -0,0 +1,124 @@
+import typer
+import logging
+
+from pathlib import Path
+from typing_extensions import Annotated
+from utils.dataframe import fetch_and_populate_compiled_dataframes_from_source_data
+from utils.source import BATCH_SIZE, PREFETCH
+from utils.text_versions import TEXT_VERSION_POLICIES
+from utils.token_store import TOKENIZERS, TokenStoreWriter
+
+
+def get_compiled_dataframes(
+    source_directory: Annotated[
+        str,
+        typer.Option(
+            help="Location to retrieve source data fetched from the API. Can be a s3 uri (e.g. s3://loc-responsible-datasets-source-data/01_bills/source_bills) or a directory path."
+        ),
+    ] = "../../local_data/01_bills/source_bills",
+    subjects_output_path: Annotated[
+        Path,
+        typer.Option(help="Location of the subjects dataframe created."),
+    ] = Path("../../local_data/01_bills/generated_data/full_compiled_subjects.csv.gz"),
+    subjects_with_text_output_path: Annotated[
+        Path,
+        typer.Option(help="Location of the subjects with text dataframe created."),
+    ] = Path(
+        "../../local_data/01_bills/generated_data/full_compiled_subjects_with_text.csv.gz"
+    ),
+    glob_pattern: Annotated[
+        str,
+        typer.Option(help="Glob pattern used to loop through source directory."),
+    ] = "*/*/*",
+    batch_size: Annotated[
+        int,
+        typer.Option(help="Number of bills whose files are fetched concurrently."),
+    ] = BATCH_SIZE,
+    prefetch: Annotated[
+        int,
+        typer.Option(
+            help="Number of batches fetched ahead (0 to fetch one at a time)."
+        ),
+    ] = PREFETCH,
+    summaries: Annotated[
+        bool,
+        typer.Option(
+            help="Include the latest summary of each bill (from summaries.json, HTML stripped) as a summary column."
+        ),
+    ] = False,
+    token_store_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location to write a memory mapped token store of the bill texts (tokens.bin, offsets.npy), not written if not given."
+        ),
+    ] = None,
+    tokenizer: Annotated[
+        str,
+        typer.Option(
+            help="Tokenizer of the token store: word (ids from a vocabulary saved with the store) or hashing (hashed ids)."
+        ),
+    ] = "word",
+    text_version_policy: Annotated[
+        str,
+        typer.Option(
+            help="Text version read as the billText of each bill (latest, introduced, enrolled or all for the latest with a text)."
+        ),
+    ] = "latest",
+    checkpoint_directory: Annotated[
+        Path,
+        typer.Option(
+            help="Directory to checkpoint each gathered congress/billType to (with a manifest.json and errors.csv), resuming from it if present. Not checkpointed if not given."
+        ),
+    ] = None,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Runs through all subject.json and text.json files within a directory once,
+    creating both the dataframes of 01_get_compiled_subjects_dataframe.py and
+    02_get_compiled_subjects_with_text_dataframe.py
+    Saves dataframes to the output paths
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    if text_version_policy not in TEXT_VERSION_POLICIES:
+        raise typer.BadParameter(f"Unknown text version policy: {text_version_policy}")
+    if tokenizer not in TOKENIZERS:
+        raise typer.BadParameter(f"Unknown tokenizer: {tokenizer}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("requests").setLevel(logging.WARNING)
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+    logging.getLogger("charset_normalizer").setLevel(logging.WARNING)
+
+    token_store = (
+        TokenStoreWriter(token_store_location, TOKENIZERS[tokenizer]())
+        if token_store_location
+        else None
+    )
+    fetch_and_populate_compiled_dataframes_from_source_data(
+        source_directory=source_directory,
+        subjects_output_path=subjects_output_path,
+        subjects_with_text_output_path=subjects_with_text_output_path,
+        glob_pattern=glob_pattern,
+        batch_size=batch_size,
+        prefetch=prefetch,
+        with_summaries=summaries,
+        text_version_policy=text_version_policy,
+        token_store=token_store,
+        checkpoint_directory=checkpoint_directory,
+    )
+    if token_store is not None:
+        token_store.close()
+
+
+if __name__ == "__main__":
+    typer.run(get_compiled_dataframes)
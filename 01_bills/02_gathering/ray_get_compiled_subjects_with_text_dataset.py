@@ -0,0 +1,84 @@
+import typer
+import ray
+import logging
+
+from typing import List
+from typing_extensions import Annotated
+from utils.distributed import (
+    BATCH_SIZE,
+    SOURCE_LOCATION,
+    ray_gather_bill_records,
+)
+from utils.text_versions import TEXT_VERSION_POLICIES
+
+
+def get_compiled_subjects_with_text_dataset(
+    source_location: Annotated[
+        str,
+        typer.Option(
+            help="Location of the source bills fetched from the API ({congress}/{billType}/{billNumber}/). Can be a s3 uri or a directory path."
+        ),
+    ] = SOURCE_LOCATION,
+    output_location: Annotated[
+        str,
+        typer.Option(
+            help="Location to store the Parquet dataset, partitioned by congress. Can be a s3 uri or a directory path."
+        ),
+    ] = "s3://loc-responsible-datasets-source-data/01_bills/generated_data/compiled_subjects_with_text",
+    congresses: Annotated[
+        List[str],
+        typer.Option(help="Congresses to gather (all congresses if not given)."),
+    ] = None,
+    batch_size: Annotated[
+        int, typer.Option(help="Number of bills read by each Ray Data task.")
+    ] = BATCH_SIZE,
+    summaries: Annotated[
+        bool,
+        typer.Option(
+            help="Include the latest summary of each bill (from summaries.json, HTML stripped) as a summary column."
+        ),
+    ] = False,
+    text_version_policy: Annotated[
+        str,
+        typer.Option(
+            help="Text version read as the billText of each bill (latest, introduced, enrolled or all for the latest with a text)."
+        ),
+    ] = "latest",
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Ray Data version of `02_get_compiled_subjects_with_text_dataframe.py` and `03_concatenate_dataframes.py`.
+    Reads the subjects.json, text.json and latest text HTML of every bill on the cluster, directly from the
+    source location, and saves a single Parquet dataset partitioned by congress.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    if text_version_policy not in TEXT_VERSION_POLICIES:
+        raise typer.BadParameter(f"Unknown text version policy: {text_version_policy}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    ray.init()
+
+    n_rows = ray_gather_bill_records(
+        source_location=source_location,
+        output_location=output_location,
+        congresses=congresses,
+        batch_size=batch_size,
+        with_summaries=summaries,
+        text_version_policy=text_version_policy,
+    )
+    print(f"Saved {n_rows} bills to: {output_location=}")
+
+
+if __name__ == "__main__":
+    typer.run(get_compiled_subjects_with_text_dataset)
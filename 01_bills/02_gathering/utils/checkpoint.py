@@ -0,0 +1,167 @@
+import os
+import json
+import logging
+
+from pathlib import Path
+
+import pandas as pd
+
+from .records import BillRecords
+from .source import BATCH_SIZE, PREFETCH, prefetch_batches
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+ERRORS_FILE = "errors.csv"
+# datasets of `fetch_bill_datasets`, in the order of its results
+DATASETS = ["subjects", "subjects_with_text"]
+ERROR_COLUMNS = ["partition", "bill_dir", "exception"]
+
+
+def bill_partition(bill_dir: str) -> str:
+    """
+    Returns the partition ({congress}/{billType}) of a bill directory
+    """
+    return "/".join(bill_dir.split("/")[-3:-1])
+
+
+def partition_bill_directories(bill_dirs: list) -> dict:
+    """
+    Returns the bill directories by partition, in the order of the bill directories
+    """
+    partitions = {}
+    for bill_dir in bill_dirs:
+        partitions.setdefault(bill_partition(bill_dir), []).append(bill_dir)
+    return partitions
+
+
+class GatheringCheckpoint(object):
+    """
+    Checkpoint of a gathering run in a directory: the records of each completed partition (congress/billType)
+    are written to partial files ({dataset}/{congress}_{billType}.csv.gz) and the partition committed to
+    manifest.json, such that a run which dies is resumed from the partitions which were not committed.
+    Bills which fail to parse are written to errors.csv instead of aborting the run.
+    The settings (e.g. source directory, text version policy) are stored in the manifest, and a checkpoint
+    cannot be resumed with different settings.
+    """
+
+    def __init__(self, checkpoint_directory: Path, settings: dict):
+        self.checkpoint_directory = Path(checkpoint_directory)
+        self.settings = settings
+        self.manifest_path = self.checkpoint_directory / MANIFEST_FILE
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+            if self.manifest["settings"] != settings:
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint_directory} was written with different settings "
+                    f"({self.manifest['settings']}), use another checkpoint directory"
+                )
+            logger.info(
+                f"Resuming from: {self.manifest_path} ({len(self.manifest['partitions'])} partitions committed)"
+            )
+        else:
+            self.checkpoint_directory.mkdir(parents=True, exist_ok=True)
+            self.manifest = {"settings": settings, "partitions": {}}
+
+    def is_committed(self, partition: str) -> bool:
+        return partition in self.manifest["partitions"]
+
+    def partial_path(self, dataset: str, partition: str) -> Path:
+        return (
+            self.checkpoint_directory
+            / dataset
+            / f"{partition.replace('/', '_')}.csv.gz"
+        )
+
+    def commit(self, partition: str, n_bills: int, datasets: dict, errors: list):
+        """
+        Writes the records (BillRecords) of each dataset of a partition to its partial file, then commits
+        the partition (and its errors) to the manifest
+        """
+        status = {"n_bills": n_bills, "n_errors": len(errors), "records": {}}
+        for dataset, records in datasets.items():
+            partial_path = self.partial_path(dataset, partition)
+            partial_path.parent.mkdir(parents=True, exist_ok=True)
+            records.to_csv(partial_path, compression="gzip", index=False)
+            status["records"][dataset] = len(records)
+        status["errors"] = errors
+        self.manifest["partitions"][partition] = status
+        self.write_manifest()
+        self.write_errors()
+
+    def write_manifest(self):
+        # replaced at once, such that a run dying while writing it leaves the previous manifest
+        temporary_path = self.manifest_path.with_suffix(".json.tmp")
+        temporary_path.write_text(json.dumps(self.manifest, indent=2))
+        os.replace(temporary_path, self.manifest_path)
+
+    def write_errors(self):
+        errors = [
+            {"partition": partition, **error}
+            for partition, status in self.manifest["partitions"].items()
+            for error in status["errors"]
+        ]
+        pd.DataFrame(errors, columns=ERROR_COLUMNS).to_csv(
+            self.checkpoint_directory / ERRORS_FILE, index=False
+        )
+
+    def gather(
+        self,
+        fetch_batch,
+        bill_dirs: list,
+        batch_size: int = BATCH_SIZE,
+        prefetch: int = PREFETCH,
+    ):
+        """
+        Fetches the partitions of the bill directories which are not committed, batch by batch with
+        fetch_batch(batch, errors=errors) (e.g. `fetch_bill_datasets`), committing each partition once complete
+        """
+        partitions = partition_bill_directories(bill_dirs)
+        for i, (partition, partition_bill_dirs) in enumerate(partitions.items()):
+            if self.is_committed(partition):
+                logger.debug(f"Partition already committed: {partition}")
+                continue
+            errors = []
+            datasets = {dataset: BillRecords() for dataset in DATASETS}
+            for results in prefetch_batches(
+                lambda batch: fetch_batch(batch, errors=errors),
+                partition_bill_dirs,
+                batch_size,
+                prefetch,
+            ):
+                for dataset, records in zip(DATASETS, results):
+                    datasets[dataset].extend(records)
+            self.commit(partition, len(partition_bill_dirs), datasets, errors)
+            logger.info(
+                f"Committed partition {partition} ({i + 1}/{len(partitions)}): "
+                f"{len(partition_bill_dirs)} bills, {len(errors)} errors"
+            )
+
+    def combine(self, dataset: str, output_path: Path, token_store=None):
+        """
+        Writes the partial files of a dataset, in the order of the partitions, to the output path one
+        partition at a time. If a token_store (TokenStoreWriter) is given, the tokens of each billText
+        are written to it in the order of the rows.
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        header = True
+        for partition in sorted(self.manifest["partitions"]):
+            if not self.manifest["partitions"][partition]["records"][dataset]:
+                # an empty dataframe is written without columns
+                continue
+            # lists are kept encoded, and empty values (e.g. summaries) as empty strings
+            partial = pd.read_csv(
+                self.partial_path(dataset, partition), dtype=str, keep_default_na=False
+            )
+            partial.to_csv(
+                output_path,
+                mode="w" if header else "a",
+                header=header,
+                compression="gzip",
+                index=False,
+            )
+            header = False
+            if token_store is not None:
+                token_store.add_records(partial.to_dict("records"))
+        if header:
+            pd.DataFrame().to_csv(output_path, compression="gzip", index=False)
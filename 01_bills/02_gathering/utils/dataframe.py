@@ -1,19 +1,51 @@
+import re
+import html
 import json
 import logging
-import collections
+import functools
 
 from pathlib import Path
+import fsspec
 import pandas as pd
 
+from .checkpoint import GatheringCheckpoint
+from .list_codec import write_csv_with_lists
+from .records import BillRecords
+from .schema import (
+    REQUIRED_COLUMNS,
+    concat_with_schema,
+    missing_required,
+    read_csv_with_schema,
+)
+from .source import (
+    BATCH_SIZE,
+    PREFETCH,
+    cat_files,
+    init_source,
+    list_bill_directories,
+    list_files,
+    prefetch_batches,
+)
+from .text_versions import select_text_urls
+
 logger = logging.getLogger(__name__)
 
+BILL_HTML_TYPE = "Formatted Text"
+HTML_TAG = re.compile(r"<[^>]*>")
+WHITESPACE = re.compile(r"\s+")
 
-def format_dataframe(dataframe: pd.DataFrame):
-    dataframe = dataframe.dropna(how="any", axis=0)
-    for col in list(dataframe.columns):
-        if isinstance(dataframe.iloc[0][col], float):
-            dataframe[col] = dataframe[col].astype(int)
 
+def format_dataframe(dataframe: pd.DataFrame):
+    """
+    Drops the rows missing a bill identifier (`REQUIRED_COLUMNS`), logging how many. The dtypes of the
+    columns are those declared in `COLUMN_DTYPES`, applied when the dataframe is read (`read_csv_with_schema`).
+    """
+    missing = missing_required(dataframe)
+    if missing.any():
+        logger.warning(
+            f"Dropping {missing.sum()} rows without one of {REQUIRED_COLUMNS}"
+        )
+        dataframe = dataframe[~missing]
     return dataframe
 
 
@@ -22,16 +54,18 @@ def concat_dataframes(source_directory: Path, dataframe_file: str):
     for df_file in source_directory.glob(f"**/{dataframe_file}"):
         logger.info(f"Processing: {df_file}")
         try:
-            df = pd.read_csv(df_file, compression="gzip")
+            df = read_csv_with_schema(df_file, compression="gzip")
             formatted_df = format_dataframe(df)
             dataframes.append(formatted_df)
         except Exception as e:
             print(e)
 
-    full_dataframe = pd.concat(dataframes)
+    full_dataframe = concat_with_schema(dataframes)
 
     full_dataframe_path = source_directory / f"concat_{dataframe_file}"
-    full_dataframe.to_csv(full_dataframe_path, compression="gzip", index=False)
+    write_csv_with_lists(
+        full_dataframe, full_dataframe_path, compression="gzip", index=False
+    )
     return full_dataframe
 
 
@@ -40,35 +74,49 @@ def flatten_dictionary_list(dictionary_list: list, key: str):
     return flattened_list
 
 
-def fetch_and_populate_subject_dataframe_from_source_data(
-    source_directory: Path, output_path: Path
-):
-    data_for_df = collections.defaultdict(list)
-
-    for json_file in source_directory.glob("**/subjects.json"):
-        data = json.load(json_file.open("r", encoding="utf-8"))
-        logger.info(f"Reading: {json_file}")
+def subject_record(data: dict) -> dict:
+    """
+    Returns the bill identifiers (from the request), legislativeSubjects and policyArea of a subjects.json
+    """
+    legislative_subjects, policy_area = parse_subjects(data)
+    return {
+        "congress": data.get("request", {}).get("congress"),
+        "billNumber": data.get("request", {}).get("billNumber"),
+        "billType": data.get("request", {}).get("billType"),
+        "legislativeSubjects": legislative_subjects,
+        "policyArea": policy_area,
+    }
 
-        data_for_df["congress"].append(data.get("request", {}).get("congress"))
-        data_for_df["billNumber"].append(data.get("request", {}).get("billNumber"))
-        data_for_df["billType"].append(data.get("request", {}).get("billType"))
 
-        subjects = data.get("subjects", {})
-        legislative_subjects = subjects.get("legislativeSubjects", [])
-        legislative_subjects = flatten_dictionary_list(legislative_subjects, "name")
-        policy_area = subjects.get("policyArea", {}).get("name", "")
-
-        data_for_df["legislativeSubjects"].append(legislative_subjects)
-        data_for_df["policyArea"].append(policy_area)
+def fetch_and_populate_subject_dataframe_from_source_data(
+    source_directory: str,
+    output_path: Path,
+    batch_size: int = BATCH_SIZE,
+    prefetch: int = PREFETCH,
+):
+    """
+    The source directory can be a s3 uri or a directory path. The subjects.json files are fetched
+    in concurrent batches of batch_size, prefetching up to `prefetch` batches ahead.
+    """
+    subject_records = BillRecords()
+
+    fs, root = init_source(source_directory)
+    subjects_paths = list_files(fs, root, "subjects.json")
+    for contents in prefetch_batches(
+        functools.partial(cat_files, fs), subjects_paths, batch_size, prefetch
+    ):
+        logger.info(f"Reading: {len(contents)} subjects.json files")
+        for subjects_path in sorted(contents):
+            if contents[subjects_path] is not None:
+                subject_records.append(
+                    subject_record(json.loads(contents[subjects_path]))
+                )
 
-    df = pd.DataFrame.from_dict(data_for_df)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, compression="gzip", index=False)
-
+    subject_records.to_csv(output_path, compression="gzip", index=False)
 
-def read_subjects(subjects_path: Path):
-    data = json.load(subjects_path.open("r", encoding="utf-8"))
 
+def parse_subjects(data: dict):
     subjects = data.get("subjects", {})
     legislativeSubjects = subjects.get("legislativeSubjects", [])
     legislativeSubjects = flatten_dictionary_list(legislativeSubjects, "name")
@@ -77,47 +125,69 @@ def read_subjects(subjects_path: Path):
     return legislativeSubjects, policyArea
 
 
-def read_summaries(summaries_path: Path):
+def read_subjects(subjects_path: Path):
+    data = json.load(subjects_path.open("r", encoding="utf-8"))
+    return parse_subjects(data)
+
+
+def strip_html(text: str) -> str:
+    """
+    Returns the text of an HTML fragment (e.g. a summary), with tags removed, entities unescaped and
+    whitespace collapsed
+    """
+    text = html.unescape(HTML_TAG.sub(" ", text))
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def parse_summaries(data: dict) -> str:
+    """
+    Returns the text of the latest summary (by actionDate, then updateDate), or an empty string
+    """
+    summaries = [
+        summary for summary in data.get("summaries", []) if summary.get("text")
+    ]
+    if not summaries:
+        return ""
+    latest_summary = max(
+        summaries,
+        key=lambda d: (d.get("actionDate") or "", d.get("updateDate") or ""),
+    )
+    return strip_html(latest_summary["text"])
+
+
+def read_summaries(summaries_path: Path) -> str:
     data = json.load(summaries_path.open("r", encoding="utf-8"))
-    ### DECIDE HOW TO READ THIS
-    return
+    return parse_summaries(data)
 
 
-def read_bill_html_by_date(text_path: Path) -> str:
+def select_bill_html_file(data: dict, text_version_policy="latest") -> str:
+    """
+    Returns the file name of the Formatted Text of the first text version selected by the text version policy
+    (a name of TEXT_VERSION_POLICIES, e.g. "latest" for the most recent dated version, or "introduced"),
+    or an empty string
+    """
+    bill_html_urls = select_text_urls(data, text_version_policy, [BILL_HTML_TYPE])
+    return bill_html_urls[0].split("/")[-1] if bill_html_urls else ""
+
+
+def read_bill_html(text_path: Path, text_version_policy="latest") -> str:
     data = json.load(text_path.open("r", encoding="utf-8"))
-    textVersions = data.get("textVersions", [{}])
-    filtered_textVersions = list(filter(lambda x: x.get("date"), textVersions))
-    sorted_textVersions = sorted(filtered_textVersions, key=lambda d: d.get("date"))
+    bill_html_file = select_bill_html_file(data, text_version_policy)
 
     bill_html = ""
-    bill_html_url = ""
-    if sorted_textVersions:
-        for version in sorted_textVersions[-1]["formats"]:
-            if version.get("type") == "Formatted Text":
-                bill_html_url = version.get("url")
-                break
-
-    if bill_html_url:
-        bill_html_path = text_path.parent / f"{bill_html_url.split('/')[-1]}"
+    if bill_html_file:
+        bill_html_path = text_path.parent / bill_html_file
         if bill_html_path.exists():
             bill_html = bill_html_path.read_text(encoding="utf-8")
     return bill_html
 
 
-# def read_bill_html_by_type(text_path: Path):
-#     data = json.load(text_path.open("r", encoding="utf-8"))
-#     textVersions = data.get("textVersions", [{}])
+def read_bill_html_by_date(text_path: Path) -> str:
+    return read_bill_html(text_path, "latest")
 
-#     for version in textVersions:
-#         if "Introduced in" in version.get("type"):
-#             for format_ in version.get("formats"):
-#                 if format_.get("type") == "Formatted Text":
-#                     bill_html_url = format_.get("url")
-#                     break
 
-#     bill_html_path = text_path.parent / f"{bill_html_url.split('/')[-1]}"
-#     bill_html = bill_html_path.read_text(encoding="utf-8")
-#     return bill_html
+def read_bill_html_by_type(text_path: Path) -> str:
+    return read_bill_html(text_path, "introduced")
 
 
 def get_record(bill_dir: Path) -> dict:
@@ -150,25 +220,272 @@ def get_record(bill_dir: Path) -> dict:
     return bill_record
 
 
-def fetch_and_populate_subject_bill_text_dataframe_from_source_data(
-    source_directory: Path, output_path: Path, glob_pattern: str
-):
-    data_for_df = []
-
-    for bill_dir in source_directory.glob(glob_pattern):
-        if not bill_dir.is_dir():
+def decode_text(content: bytes) -> str:
+    """
+    Decodes a fetched text file as `Path.read_text` does (with universal newlines)
+    """
+    return content.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def bill_error(bill_dir: str, exception: Exception) -> dict:
+    logger.error(f"Failed to read: {bill_dir} ({exception!r})")
+    return {"bill_dir": bill_dir, "exception": repr(exception)}
+
+
+def fetch_bill_datasets(
+    fs: fsspec.AbstractFileSystem,
+    bill_dirs: list,
+    with_summaries: bool = False,
+    text_version_policy="latest",
+    errors: list = None,
+) -> tuple:
+    """
+    Returns the subject records (`subject_record`, for every bill with a subjects.json) and the bill records
+    (`get_record`, for bills with subjects and text) of a batch of bill directories of a fsspec filesystem (e.g. s3).
+    The subjects.json and text.json of every bill are fetched concurrently, then the latest text of every bill,
+    such that a batch takes two round trips and each file is fetched and parsed once for both datasets.
+    If with_summaries, the summaries.json of every bill is fetched along with them and the bill records have the
+    latest summary (`parse_summaries`, empty for bills without summaries).
+    The text of each bill is that of the text version policy (`select_bill_html_file`).
+    If an errors list is given, a bill whose files fail to parse is left out of both datasets and appended to it
+    ({"bill_dir": ..., "exception": ...}) instead of raising, such that one bad file does not abort a run.
+    """
+    logger.info(
+        f"Reading: {len(bill_dirs)} bills from {bill_dirs[0] if bill_dirs else ''}"
+    )
+    documents = cat_files(
+        fs,
+        [
+            f"{bill_dir}/{file_name}"
+            for bill_dir in bill_dirs
+            for file_name in ["subjects.json", "text.json"]
+            + (["summaries.json"] if with_summaries else [])
+        ],
+    )
+
+    subjects = {}
+    subject_records = {}
+    bill_html_paths = {}
+    for bill_dir in bill_dirs:
+        if (subjects_data := documents.get(f"{bill_dir}/subjects.json")) is None:
+            continue
+        try:
+            subjects[bill_dir] = json.loads(subjects_data)
+            subject_records[bill_dir] = subject_record(subjects[bill_dir])
+            if (text := documents.get(f"{bill_dir}/text.json")) is None:
+                continue
+            if bill_html_file := select_bill_html_file(
+                json.loads(text), text_version_policy
+            ):
+                bill_html_paths[bill_dir] = f"{bill_dir}/{bill_html_file}"
+        except Exception as e:
+            if errors is None:
+                raise
+            subject_records.pop(bill_dir, None)
+            errors.append(bill_error(bill_dir, e))
+    bill_htmls = cat_files(fs, list(bill_html_paths.values()))
+
+    bill_records = []
+    for bill_dir, bill_html_path in bill_html_paths.items():
+        if not (bill_html := bill_htmls.get(bill_html_path)):
             continue
+        try:
+            congress, billType, billNumber = bill_dir.split("/")[-3:]
+            legislativeSubjects, policyArea = parse_subjects(subjects[bill_dir])
+            bill_record = {
+                "congress": congress,
+                "billType": billType,
+                "billNumber": billNumber,
+                "legislativeSubjects": legislativeSubjects,
+                "policyArea": policyArea,
+                "billText": decode_text(bill_html),
+            }
+            if with_summaries:
+                summaries = documents.get(f"{bill_dir}/summaries.json")
+                bill_record["summary"] = (
+                    parse_summaries(json.loads(summaries))
+                    if summaries is not None
+                    else ""
+                )
+        except Exception as e:
+            if errors is None:
+                raise
+            subject_records.pop(bill_dir, None)
+            errors.append(bill_error(bill_dir, e))
+            continue
+        bill_records.append(bill_record)
+    return list(subject_records.values()), bill_records
+
+
+def fetch_bill_records(
+    fs: fsspec.AbstractFileSystem,
+    bill_dirs: list,
+    with_summaries: bool = False,
+    text_version_policy="latest",
+) -> list:
+    """
+    Same as `get_record` for a batch of bill directories of a fsspec filesystem (e.g. s3), see `fetch_bill_datasets`
+    """
+    _, bill_records = fetch_bill_datasets(
+        fs, bill_dirs, with_summaries, text_version_policy
+    )
+    return bill_records
+
+
+def _gather_with_checkpoint(
+    fs: fsspec.AbstractFileSystem,
+    bill_dirs: list,
+    checkpoint_directory: Path,
+    source_directory: str,
+    glob_pattern: str,
+    batch_size: int,
+    prefetch: int,
+    with_summaries: bool,
+    text_version_policy: str,
+) -> GatheringCheckpoint:
+    checkpoint = GatheringCheckpoint(
+        checkpoint_directory,
+        settings={
+            "source_directory": str(source_directory),
+            "glob_pattern": glob_pattern,
+            "with_summaries": with_summaries,
+            "text_version_policy": text_version_policy,
+        },
+    )
+    checkpoint.gather(
+        functools.partial(
+            fetch_bill_datasets,
+            fs,
+            with_summaries=with_summaries,
+            text_version_policy=text_version_policy,
+        ),
+        bill_dirs,
+        batch_size,
+        prefetch,
+    )
+    return checkpoint
+
 
-        if bill_record := get_record(bill_dir):
-            data_for_df.append(bill_record)
-        # try:
-        #     bill_record = get_record(bill_dir)
-        #     if bill_record:
-        #         data_for_df.append(bill_record)
-        #     else:
-        #         logger.info("Issue")
-        # except Exception as e:
-        #     logger.info(e)
-
-    df = pd.DataFrame(data_for_df)
-    df.to_csv(output_path, compression="gzip", index=False)
+def fetch_and_populate_subject_bill_text_dataframe_from_source_data(
+    source_directory: str,
+    output_path: Path,
+    glob_pattern: str,
+    batch_size: int = BATCH_SIZE,
+    prefetch: int = PREFETCH,
+    with_summaries: bool = False,
+    token_store=None,
+    text_version_policy="latest",
+    checkpoint_directory: Path = None,
+):
+    """
+    The source directory can be a s3 uri or a directory path. The bills are fetched in concurrent batches
+    of batch_size (`fetch_bill_records`), prefetching up to `prefetch` batches ahead.
+    If with_summaries, the dataframe has the latest summary of each bill.
+    The billText of each bill is that of the text version policy (e.g. "latest" or "introduced").
+    If a token_store (TokenStoreWriter) is given, the tokens of each billText are written to it in the order of the rows.
+    If a checkpoint directory is given, each congress/billType is committed to it once gathered (`GatheringCheckpoint`),
+    a run is resumed from it, and bills which fail to parse are written to its errors.csv instead of aborting the run.
+    """
+    fs, root = init_source(source_directory)
+    bill_dirs = list_bill_directories(fs, root, glob_pattern)
+    if checkpoint_directory is not None:
+        checkpoint = _gather_with_checkpoint(
+            fs,
+            bill_dirs,
+            checkpoint_directory,
+            source_directory,
+            glob_pattern,
+            batch_size,
+            prefetch,
+            with_summaries,
+            text_version_policy,
+        )
+        checkpoint.combine("subjects_with_text", output_path, token_store)
+        return
+
+    subjects_with_text = BillRecords()
+    for bill_records in prefetch_batches(
+        functools.partial(
+            fetch_bill_records,
+            fs,
+            with_summaries=with_summaries,
+            text_version_policy=text_version_policy,
+        ),
+        bill_dirs,
+        batch_size,
+        prefetch,
+    ):
+        subjects_with_text.extend(bill_records)
+        if token_store is not None:
+            token_store.add_records(bill_records)
+
+    subjects_with_text.to_csv(output_path, compression="gzip", index=False)
+
+
+def fetch_and_populate_compiled_dataframes_from_source_data(
+    source_directory: str,
+    subjects_output_path: Path,
+    subjects_with_text_output_path: Path,
+    glob_pattern: str = "*/*/*",
+    batch_size: int = BATCH_SIZE,
+    prefetch: int = PREFETCH,
+    with_summaries: bool = False,
+    token_store=None,
+    text_version_policy="latest",
+    checkpoint_directory: Path = None,
+):
+    """
+    Single pass version of `fetch_and_populate_subject_dataframe_from_source_data` and
+    `fetch_and_populate_subject_bill_text_dataframe_from_source_data`: the source directory is listed once
+    and the files of each bill fetched and parsed once (`fetch_bill_datasets`) to save both dataframes.
+    If with_summaries, the subjects with text dataframe has the latest summary of each bill.
+    The billText of each bill is that of the text version policy (e.g. "latest" or "introduced").
+    If a token_store (TokenStoreWriter) is given, the tokens of each billText are written to it in the order of the
+    rows of the subjects with text dataframe.
+    If a checkpoint directory is given, the run is checkpointed and resumed as in
+    `fetch_and_populate_subject_bill_text_dataframe_from_source_data`.
+    """
+    fs, root = init_source(source_directory)
+    bill_dirs = list_bill_directories(fs, root, glob_pattern)
+    if checkpoint_directory is not None:
+        checkpoint = _gather_with_checkpoint(
+            fs,
+            bill_dirs,
+            checkpoint_directory,
+            source_directory,
+            glob_pattern,
+            batch_size,
+            prefetch,
+            with_summaries,
+            text_version_policy,
+        )
+        checkpoint.combine("subjects", subjects_output_path)
+        checkpoint.combine(
+            "subjects_with_text", subjects_with_text_output_path, token_store
+        )
+        return
+
+    subjects = BillRecords()
+    subjects_with_text = BillRecords()
+    for subject_records, bill_records in prefetch_batches(
+        functools.partial(
+            fetch_bill_datasets,
+            fs,
+            with_summaries=with_summaries,
+            text_version_policy=text_version_policy,
+        ),
+        bill_dirs,
+        batch_size,
+        prefetch,
+    ):
+        subjects.extend(subject_records)
+        subjects_with_text.extend(bill_records)
+        if token_store is not None:
+            token_store.add_records(bill_records)
+
+    for records, output_path in [
+        (subjects, subjects_output_path),
+        (subjects_with_text, subjects_with_text_output_path),
+    ]:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        records.to_csv(output_path, compression="gzip", index=False)
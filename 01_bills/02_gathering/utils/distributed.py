@@ -0,0 +1,101 @@
+import logging
+
+from .dataframe import fetch_bill_records
+from .records import BillRecords
+from .schema import arrow_schema
+from .source import BATCH_SIZE, init_source, list_bill_directories
+
+logger = logging.getLogger(__name__)
+
+SOURCE_LOCATION = "s3://loc-responsible-datasets-source-data/01_bills/source_bills"
+PARTITION_COLUMNS = ["congress"]
+# columns of the records of `fetch_bill_records`, in their order
+RECORD_COLUMNS = [
+    "congress",
+    "billType",
+    "billNumber",
+    "legislativeSubjects",
+    "policyArea",
+    "billText",
+]
+
+
+def record_schema(with_summaries: bool = False):
+    """
+    Returns the Arrow schema of the bill records, with the declared dtypes of the columns (`COLUMN_DTYPES`)
+    as when the csv.gz datasets are read
+    """
+    return arrow_schema(RECORD_COLUMNS + (["summary"] if with_summaries else []))
+
+
+def read_bill_records(
+    batch: dict,
+    source_location: str,
+    with_summaries: bool = False,
+    text_version_policy="latest",
+):
+    """
+    Ray Data batch function: returns an Arrow table of the records of a batch of bill directories
+    (skipping bills without subjects or text), with a fixed schema so that every block matches.
+    The files of the batch are fetched concurrently (`fetch_bill_records`) and accumulated in BillRecords,
+    whose typed columns are converted to Arrow.
+    """
+    import pyarrow as pa
+
+    fs, _ = init_source(source_location)
+    records = BillRecords()
+    records.extend(
+        fetch_bill_records(
+            fs,
+            [str(bill_dir) for bill_dir in batch["bill_dir"]],
+            with_summaries,
+            text_version_policy,
+        )
+    )
+    schema = record_schema(with_summaries)
+    if not len(records):
+        return schema.empty_table()
+    # without the pandas metadata, which would conflict with the partition columns when read back
+    return pa.Table.from_pandas(
+        records.to_dataframe(), schema=schema, preserve_index=False
+    ).replace_schema_metadata()
+
+
+def ray_gather_bill_records(
+    source_location: str = SOURCE_LOCATION,
+    output_location: str = None,
+    congresses: list = None,
+    partition_columns: list = PARTITION_COLUMNS,
+    batch_size: int = BATCH_SIZE,
+    with_summaries: bool = False,
+    text_version_policy="latest",
+):
+    """
+    Ray Data pipeline reading the subjects and text (and latest summary if with_summaries) of every bill under
+    the source location on the cluster, and writing a single dataset (the equivalent of the concatenated per
+    congress dataframes) as Parquet partitioned by the partition columns ({output_location}/congress={congress}/*.parquet).
+    Returns the number of rows written (bills without subjects or text are skipped)
+    """
+    import ray
+
+    fs, root = init_source(source_location)
+    bill_directories = []
+    for congress in congresses or ["*"]:
+        bill_directories += list_bill_directories(fs, root, f"{congress}/*/*")
+    logger.info(f"Found {len(bill_directories)} bills in {source_location}")
+    dataset = ray.data.from_items(
+        [{"bill_dir": bill_dir} for bill_dir in bill_directories]
+    ).map_batches(
+        read_bill_records,
+        batch_size=batch_size,
+        batch_format="numpy",
+        fn_kwargs={
+            "source_location": source_location,
+            "with_summaries": with_summaries,
+            "text_version_policy": text_version_policy,
+        },
+    )
+    # materialized such that the bills are read once, to be written and counted
+    dataset = dataset.materialize()
+    dataset.write_parquet(output_location, partition_cols=partition_columns)
+    return dataset.count()
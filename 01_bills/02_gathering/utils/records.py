@@ -0,0 +1,164 @@
+from array import array
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .list_codec import encode_list
+from .schema import COLUMN_DTYPES
+
+
+class IntegerColumn(object):
+    """
+    Integers (e.g. congress parsed from a path) in a contiguous int64 array, None as masked
+    """
+
+    def __init__(self):
+        self.values = array("q")
+        self.mask = bytearray()
+
+    def append(self, value):
+        self.values.append(0 if value is None else int(value))
+        self.mask.append(value is None)
+
+    def to_series(self) -> pd.Series:
+        values = np.frombuffer(self.values, dtype=np.int64)
+        mask = np.frombuffer(self.mask, dtype=np.bool_)
+        return pd.Series(pd.arrays.IntegerArray(values, mask))
+
+
+class CategoricalColumn(object):
+    """
+    Values repeated across rows (e.g. billType) as int32 codes of categories, None and empty strings
+    (e.g. a bill without a policyArea) as -1, as they are read back (`read_csv_with_schema`)
+    """
+
+    def __init__(self):
+        self.codes = array("i")
+        self.categories = {}
+
+    def append(self, value):
+        self.codes.append(
+            -1
+            if value is None or value == ""
+            else self.categories.setdefault(value, len(self.categories))
+        )
+
+    def to_series(self) -> pd.Series:
+        return pd.Series(
+            pd.Categorical.from_codes(
+                np.frombuffer(self.codes, dtype=np.int32),
+                categories=list(self.categories),
+            )
+        )
+
+
+class ListColumn(object):
+    """
+    Lists of strings (e.g. legislativeSubjects) with each string interned to an id of a vocabulary:
+    the ids of every row one after the other, and the start of each row in offsets
+    """
+
+    def __init__(self):
+        self.values = array("I")
+        self.offsets = array("q", [0])
+        self.vocabulary = {}
+
+    def append(self, values: list):
+        self.values.extend(
+            self.vocabulary.setdefault(value, len(self.vocabulary))
+            for value in values or []
+        )
+        self.offsets.append(len(self.values))
+
+    def rows(self):
+        vocabulary = list(self.vocabulary)
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            yield [vocabulary[value] for value in self.values[start:end]]
+
+    def to_series(self) -> pd.Series:
+        return pd.Series(list(self.rows()), dtype=object)
+
+    def to_encoded_series(self) -> pd.Series:
+        """
+        Rows joined as by `write_csv_with_lists`, without a list per row
+        """
+        return pd.Series([encode_list(row) for row in self.rows()], dtype=object)
+
+
+class ObjectColumn(object):
+    """
+    Values without a compact representation (e.g. billText)
+    """
+
+    def __init__(self):
+        self.values = []
+
+    def append(self, value):
+        self.values.append(value)
+
+    def to_series(self) -> pd.Series:
+        return pd.Series(self.values, dtype=object)
+
+
+# columns by declared dtype (`COLUMN_DTYPES`)
+COLUMN_TYPES = {
+    "Int64": IntegerColumn,
+    "category": CategoricalColumn,
+    "list": ListColumn,
+}
+
+
+def column_for(name: str):
+    return COLUMN_TYPES.get(COLUMN_DTYPES.get(name), ObjectColumn)()
+
+
+class BillRecords(object):
+    """
+    Columnar accumulator of bill records (e.g. of `fetch_bill_datasets`), instead of a list of dicts, with the
+    declared dtypes of the columns (`COLUMN_DTYPES`): integer congress and billNumber, categorical billType and
+    policyArea, and legislativeSubjects interned to ids in an offsets and values array.
+    The columns are those of the first record, in its order.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.n_rows = 0
+
+    def append(self, record: dict):
+        if not self.columns:
+            self.columns = {name: column_for(name) for name in record}
+        for name, column in self.columns.items():
+            column.append(record.get(name))
+        self.n_rows += 1
+
+    def extend(self, records: list):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return self.n_rows
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the records with their declared dtypes and lists decoded, e.g. to be converted to the Arrow
+        batches of `read_bill_records`
+        """
+        return pd.DataFrame(
+            {name: column.to_series() for name, column in self.columns.items()}
+        )
+
+    def to_csv(self, path: Path, **kwargs):
+        """
+        Writes the records as `write_csv_with_lists` does, encoding the list columns from their ids
+        """
+        pd.DataFrame(
+            {
+                name: (
+                    column.to_encoded_series()
+                    if isinstance(column, ListColumn)
+                    else column.to_series()
+                )
+                for name, column in self.columns.items()
+            }
+        ).to_csv(path, **kwargs)
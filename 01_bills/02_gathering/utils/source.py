@@ -0,0 +1,86 @@
+import logging
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import fsspec
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 256
+PREFETCH = 4
+
+
+def init_source(location: str) -> tuple[fsspec.AbstractFileSystem, str]:
+    """
+    Returns the filesystem (s3 for s3 uris, otherwise local) and path of a source location
+    """
+    fs, root = fsspec.core.url_to_fs(str(location))
+    return fs, root.rstrip("/")
+
+
+def list_files(fs: fsspec.AbstractFileSystem, root: str, file_name: str) -> list:
+    """
+    Returns the paths of the files with the file name anywhere under the root
+    """
+    return sorted(fs.glob(f"{root}/**/{file_name}"))
+
+
+def list_bill_directories(
+    fs: fsspec.AbstractFileSystem, root: str, glob_pattern: str = "*/*/*"
+) -> list:
+    """
+    Returns the bill directories matching the glob pattern (e.g. {congress}/{billType}/{billNumber})
+    under the root which have a subjects.json. Listing the subjects.json files instead of the directories
+    avoids a request per directory on s3.
+    """
+    pattern = f"{root}/{glob_pattern.strip('/')}/subjects.json"
+    return sorted(path.rsplit("/", 1)[0] for path in fs.glob(pattern))
+
+
+def cat_files(fs: fsspec.AbstractFileSystem, paths: list) -> dict:
+    """
+    Returns the contents of the files by path (None for missing files). Files of async filesystems
+    (e.g. s3) are fetched concurrently instead of one request at a time.
+    Other errors (e.g. throttling, timeouts or permissions on s3) are raised rather than reading the file as
+    missing, such that a checkpointed run stops before committing the partition and is resumed from it.
+    """
+    if not paths:
+        return {}
+    contents = fs.cat(list(paths), on_error="return")
+    for path, content in contents.items():
+        if isinstance(content, Exception) and not isinstance(
+            content, FileNotFoundError
+        ):
+            raise content
+    return {
+        path: None if isinstance(content, FileNotFoundError) else content
+        for path, content in contents.items()
+    }
+
+
+def batches(items: list, batch_size: int = BATCH_SIZE):
+    for start in range(0, len(items), batch_size):
+        yield items[start : start + batch_size]
+
+
+def prefetch_batches(
+    fetch_batch, items: list, batch_size: int = BATCH_SIZE, prefetch: int = PREFETCH
+):
+    """
+    Yields the result of fetch_batch for each batch of items in order, fetching up to `prefetch`
+    batches ahead in threads so that the latency of each batch overlaps with the others
+    """
+    if prefetch < 1:
+        for batch in batches(items, batch_size):
+            yield fetch_batch(batch)
+        return
+
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = deque()
+        for batch in batches(items, batch_size):
+            pending.append(executor.submit(fetch_batch, batch))
+            if len(pending) > prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
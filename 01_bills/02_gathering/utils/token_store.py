@@ -0,0 +1,184 @@
+import json
+import re
+import zlib
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataframe import strip_html
+
+TOKEN_DTYPE = np.uint32
+OFFSET_DTYPE = np.int64
+TOKENS_FILE = "tokens.bin"
+OFFSETS_FILE = "offsets.npy"
+BILLS_FILE = "bills.csv.gz"
+METADATA_FILE = "token_store.json"
+VOCABULARY_FILE = "vocabulary.json"
+BILL_ID_COLUMNS = ["congress", "billType", "billNumber"]
+TOKEN_PATTERN = re.compile(r"\w+")
+N_HASHED_TOKENS = 2**20
+
+
+def word_tokens(text: str) -> list:
+    """
+    Returns the lower cased words of the text of an HTML document (e.g. billText)
+    """
+    return TOKEN_PATTERN.findall(strip_html(text).lower())
+
+
+class WordTokenizer(object):
+    """
+    Word tokens with ids from a vocabulary, grown as new words are seen (saved with the store)
+    """
+
+    def __init__(self, vocabulary: list = None):
+        self.ids = {token: i for i, token in enumerate(vocabulary or [])}
+
+    def __call__(self, text: str) -> np.ndarray:
+        return np.fromiter(
+            (self.ids.setdefault(token, len(self.ids)) for token in word_tokens(text)),
+            dtype=TOKEN_DTYPE,
+        )
+
+    @property
+    def vocabulary(self) -> list:
+        # ids are assigned in insertion order
+        return list(self.ids)
+
+    def decode(self, token_ids: np.ndarray) -> list:
+        vocabulary = self.vocabulary
+        return [vocabulary[token_id] for token_id in token_ids]
+
+    def save(self, store_location: Path):
+        (Path(store_location) / VOCABULARY_FILE).write_text(json.dumps(self.vocabulary))
+
+    @classmethod
+    def load(cls, store_location: Path) -> "WordTokenizer":
+        return cls(json.loads((Path(store_location) / VOCABULARY_FILE).read_text()))
+
+
+class HashingTokenizer(object):
+    """
+    Word tokens with ids hashed (crc32) into n_features, such that no vocabulary is needed and
+    stores written separately (e.g. per congress) share the ids
+    """
+
+    def __init__(self, n_features: int = N_HASHED_TOKENS):
+        self.n_features = n_features
+
+    def __call__(self, text: str) -> np.ndarray:
+        return np.fromiter(
+            (
+                zlib.crc32(token.encode()) % self.n_features
+                for token in word_tokens(text)
+            ),
+            dtype=TOKEN_DTYPE,
+        )
+
+
+TOKENIZERS = {"word": WordTokenizer, "hashing": HashingTokenizer}
+
+
+class TokenStoreWriter(object):
+    """
+    Writes the token ids of each bill text (by a tokenizer: any callable returning the token ids of a text)
+    into a token store, streaming the tokens to a single contiguous file:
+    - tokens.bin: the TOKEN_DTYPE token ids of every row, one after the other
+    - offsets.npy: the start of the tokens of each row, and the end of the last row
+    - bills.csv.gz: the bill identifiers of each row
+    """
+
+    def __init__(self, store_location: Path, tokenizer=None):
+        self.store_location = Path(store_location)
+        self.store_location.mkdir(parents=True, exist_ok=True)
+        self.tokenizer = tokenizer if tokenizer is not None else WordTokenizer()
+        self.tokens_file = open(self.store_location / TOKENS_FILE, "wb")
+        self.offsets = [0]
+        self.bills = []
+
+    def add(self, text: str, bill: dict = None) -> int:
+        """
+        Appends the tokens of a text and returns its row in the store
+        """
+        token_ids = np.asarray(self.tokenizer(text), dtype=TOKEN_DTYPE)
+        token_ids.tofile(self.tokens_file)
+        self.offsets.append(self.offsets[-1] + len(token_ids))
+        self.bills.append(
+            {column: (bill or {}).get(column) for column in BILL_ID_COLUMNS}
+        )
+        return len(self.bills) - 1
+
+    def add_records(self, bill_records: list, text_column: str = "billText"):
+        for bill_record in bill_records:
+            self.add(bill_record[text_column], bill_record)
+
+    def close(self):
+        self.tokens_file.close()
+        np.save(
+            self.store_location / OFFSETS_FILE,
+            np.asarray(self.offsets, dtype=OFFSET_DTYPE),
+        )
+        pd.DataFrame(self.bills, columns=BILL_ID_COLUMNS).to_csv(
+            self.store_location / BILLS_FILE, compression="gzip", index=False
+        )
+        if hasattr(self.tokenizer, "save"):
+            self.tokenizer.save(self.store_location)
+        (self.store_location / METADATA_FILE).write_text(
+            json.dumps(
+                {
+                    "n_rows": len(self.bills),
+                    "n_tokens": self.offsets[-1],
+                    "token_dtype": np.dtype(TOKEN_DTYPE).name,
+                    "tokenizer": type(self.tokenizer).__name__,
+                },
+                indent=2,
+            )
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TokenStore(object):
+    """
+    Memory mapped token store written by TokenStoreWriter: `store[row]` is a zero-copy view of the token ids
+    of a row, such that any bill can be read without loading the whole corpus into memory
+    """
+
+    def __init__(self, store_location: Path):
+        self.store_location = Path(store_location)
+        self.offsets = np.load(self.store_location / OFFSETS_FILE, mmap_mode="r")
+        # np.memmap cannot map an empty file
+        self.tokens = (
+            np.memmap(self.store_location / TOKENS_FILE, dtype=TOKEN_DTYPE, mode="r")
+            if self.offsets[-1]
+            else np.empty(0, dtype=TOKEN_DTYPE)
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        return self.tokens[self.offsets[row] : self.offsets[row + 1]]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        Number of tokens of each row
+        """
+        return np.diff(self.offsets)
+
+    @property
+    def metadata(self) -> dict:
+        return json.loads((self.store_location / METADATA_FILE).read_text())
+
+    def bills(self) -> pd.DataFrame:
+        """
+        Bill identifiers of each row, e.g. to join the store with a gathered dataframe
+        """
+        return pd.read_csv(self.store_location / BILLS_FILE, dtype=str)
@@ -0,0 +1,64 @@
+import typer
+import logging
+
+from pathlib import Path
+from typing import List
+from typing_extensions import Annotated
+from utils.sketches import save_sketches, sketch_dataset
+from utils.streaming import CHUNK_SIZE
+
+
+def build_sketches(
+    dataset_location: Annotated[
+        Path,
+        typer.Option(help="Location of the dataset (csv.gz or parquet) to sketch."),
+    ] = Path(
+        "../../local_data/01_bills/generated_data/concat_compiled_subjects_with_text.csv.gz"
+    ),
+    output_directory: Annotated[
+        Path,
+        typer.Option(help="Location to store the sketches ({group}.json per group)."),
+    ] = Path("../../local_data/01_bills/generated_data/sketches"),
+    attributes: Annotated[List[str], typer.Option(help="Attributes to sketch.")] = [
+        "legislativeSubjects",
+        "policyArea",
+    ],
+    group_by: Annotated[
+        str, typer.Option(help="Attribute to build separate sketches for.")
+    ] = "congress",
+    chunk_size: Annotated[
+        int, typer.Option(help="Number of rows read into memory at a time.")
+    ] = CHUNK_SIZE,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Local CLI Wrapper for the `sketch_dataset` function.
+    Saves mergeable (Count-Min, Space-Saving and HyperLogLog) sketches of the attributes
+    per group (e.g. per congress), to be loaded with `load_sketches` and combined with `merge_sketches`.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    sketches = sketch_dataset(
+        dataset_location, attributes, group_by=group_by, chunk_size=chunk_size
+    )
+    output_directory.mkdir(parents=True, exist_ok=True)
+    for group, attribute_sketches in sketches.items():
+        output_path = output_directory / f"{group}.json"
+        print(f"Saving to: {output_path=} ...")
+        save_sketches(attribute_sketches, output_path)
+
+
+if __name__ == "__main__":
+    typer.run(build_sketches)
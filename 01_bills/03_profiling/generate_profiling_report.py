@@ -0,0 +1,76 @@
+import typer
+import logging
+
+from pathlib import Path
+from typing import List
+from typing_extensions import Annotated
+from utils.report import REPORT_ATTRIBUTES, generate_profiling_report
+
+
+def generate_report(
+    dataset_location: Annotated[
+        Path, typer.Option(help="Location of the dataset (csv.gz) to profile.")
+    ] = Path(
+        "../../local_data/01_bills/generated_data/concat_compiled_subjects_with_text.csv.gz"
+    ),
+    output_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location to store the report (report.html, report.json and figures)."
+        ),
+    ] = Path("../../local_data/01_bills/generated_data/profiling_report"),
+    cache_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location of the statistics and figures cache (keyed by dataset hash). Defaults to {output_location}/.cache"
+        ),
+    ] = None,
+    attributes: Annotated[
+        List[str], typer.Option(help="Attributes to profile.")
+    ] = REPORT_ATTRIBUTES,
+    n_jobs: Annotated[
+        int,
+        typer.Option(
+            help="Number of processes used to compute associations and render figures."
+        ),
+    ] = 1,
+    overwrite: Annotated[
+        bool,
+        typer.Option(
+            help="Recompute statistics and figures even if cached for the dataset."
+        ),
+    ] = False,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Local CLI Wrapper for the `generate_profiling_report` function.
+    Computes the profiling statistics of the notebooks once, renders the figures headlessly
+    and saves a single HTML/JSON report.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("matplotlib").setLevel(logging.WARNING)
+
+    generate_profiling_report(
+        dataset_location=dataset_location,
+        output_location=output_location,
+        cache_location=cache_location,
+        attributes=attributes,
+        n_jobs=n_jobs,
+        overwrite=overwrite,
+    )
+
+
+if __name__ == "__main__":
+    typer.run(generate_report)
@@ -0,0 +1,81 @@
+import typer
+import logging
+
+from pathlib import Path
+from typing import List
+from typing_extensions import Annotated
+from utils.streaming import CHUNK_SIZE, STREAMING_ATTRIBUTES, profile_datasets
+
+
+def profile_dataset_streaming(
+    dataset_locations: Annotated[
+        List[Path],
+        typer.Option(
+            help="Location(s) of the dataset(s) (csv.gz or parquet) to profile, e.g. shards or per-congress files."
+        ),
+    ] = [
+        Path(
+            "../../local_data/01_bills/generated_data/concat_compiled_subjects_with_text.csv.gz"
+        )
+    ],
+    output_path: Annotated[
+        Path, typer.Option(help="Location to store the (mergeable) profile JSON.")
+    ] = Path("../../local_data/01_bills/generated_data/profile.json"),
+    attributes: Annotated[
+        List[str], typer.Option(help="Attributes to profile.")
+    ] = STREAMING_ATTRIBUTES,
+    crosstabs: Annotated[
+        List[str],
+        typer.Option(
+            help="Pairs of attributes to cross tabulate, as attr1:attr2 (e.g. policyArea:legislativeSubjects)."
+        ),
+    ] = ["policyArea:legislativeSubjects"],
+    group_by: Annotated[
+        str, typer.Option(help="Attribute to keep per group value counts for.")
+    ] = "congress",
+    chunk_size: Annotated[
+        int, typer.Option(help="Number of rows read into memory at a time.")
+    ] = CHUNK_SIZE,
+    n_jobs: Annotated[
+        int,
+        typer.Option(help="Number of processes used to profile the datasets."),
+    ] = 1,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Local CLI Wrapper for the `profile_datasets` function.
+    Streams the dataset(s) in chunks of only the needed columns and saves the accumulated
+    counts, from which the profiling statistics can be calculated with `ProfileAccumulator.load`.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    accumulator = profile_datasets(
+        dataset_locations,
+        attributes=attributes,
+        crosstabs=[pair.split(":") for pair in crosstabs],
+        group_by=group_by or None,
+        chunk_size=chunk_size,
+        n_jobs=n_jobs,
+    )
+    print(f"Rows: {accumulator.rows}")
+    print(f"Cardinality:\n{accumulator.calculate_cardinality()}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"Saving to: {output_path=} ...")
+    accumulator.save(output_path)
+
+
+if __name__ == "__main__":
+    typer.run(profile_dataset_streaming)
@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from .encoding import EncodedAttribute, get_encoded_view
+
+ASSOCIATION_STATISTICS = ["chi2", "p_value", "dof", "n", "cramers_v"]
+
+_WORKER_ATTRIBUTES = {}
+
+
+def flat_codes(encoded: EncodedAttribute):
+    """
+    Returns the row, category code and count of every (non-missing) value of an encoded attribute
+    """
+    matrix = encoded.matrix
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    return rows, matrix.indices, matrix.data
+
+
+def contingency_table(encoded1: EncodedAttribute, encoded2: EncodedAttribute):
+    """
+    Returns the contingency table (as a dense array) of two encoded attributes, equivalent
+    to `pd.crosstab` on the DataFrame exploded on both attributes, with unobserved rows and
+    columns removed. Pairs involving a non-list attribute are counted with `np.bincount`
+    over the integer codes, pairs of list attributes with a sparse product.
+    """
+    n_categories1, n_categories2 = len(encoded1.categories), len(encoded2.categories)
+    if encoded1.is_list and encoded2.is_list:
+        table = (encoded1.matrix.T @ encoded2.matrix).toarray()
+    elif encoded1.is_list:
+        return contingency_table(encoded2, encoded1).T
+    else:
+        rows, codes2, weights = flat_codes(encoded2)
+        codes1 = encoded1.codes[rows]
+        present = codes1 >= 0
+        table = np.bincount(
+            codes1[present] * n_categories2 + codes2[present],
+            weights=weights[present],
+            minlength=n_categories1 * n_categories2,
+        ).reshape(n_categories1, n_categories2)
+
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    return table
+
+
+def chi_squared_statistics(observed: np.ndarray):
+    """
+    Returns the chi-squared statistic, p-value and degrees of freedom of a contingency table,
+    as `stats.chi2_contingency` (including Yates' correction when there is one degree of freedom)
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1) if observed.size else 0
+    if dof == 0:
+        return 0.0, 1.0, 0
+
+    n = observed.sum()
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / n
+    if dof == 1:
+        difference = expected - observed
+        observed = observed + np.sign(difference) * np.minimum(0.5, np.abs(difference))
+    chi2 = float(((observed - expected) ** 2 / expected).sum())
+    return chi2, float(stats.chi2.sf(chi2, dof)), dof
+
+
+def cramers_v_statistic(chi2: float, n: float, shape: tuple) -> float:
+    k = min(shape)
+    return float(np.sqrt(chi2 / (n * (k - 1)))) if k > 1 else 0
+
+
+def pair_statistics(encoded1: EncodedAttribute, encoded2: EncodedAttribute) -> dict:
+    """
+    Returns the chi-squared test of independence and Cramer's V for two encoded attributes
+    """
+    table = contingency_table(encoded1, encoded2)
+    chi2, p_value, dof = chi_squared_statistics(table)
+    n = float(table.sum())
+    return {
+        "chi2": chi2,
+        "p_value": p_value,
+        "dof": dof,
+        "n": n,
+        "cramers_v": cramers_v_statistic(chi2, n, table.shape),
+    }
+
+
+def calculate_pair_statistics(dataframe: pd.DataFrame, attributes: list) -> dict:
+    attr1, attr2 = attributes
+    view = get_encoded_view(dataframe)
+    return pair_statistics(view.attribute(attr1), view.attribute(attr2))
+
+
+def _init_worker(encoded_attributes: dict):
+    _WORKER_ATTRIBUTES.update(encoded_attributes)
+
+
+def _worker_pair_statistics(attr1: str, attr2: str) -> dict:
+    return pair_statistics(_WORKER_ATTRIBUTES[attr1], _WORKER_ATTRIBUTES[attr2])
+
+
+def association_matrix(
+    dataframe: pd.DataFrame, attributes: list, n_jobs: int = 1
+) -> dict:
+    """
+    Returns the pairwise chi-squared statistics, p-values, degrees of freedom, number of
+    observations and Cramer's V between all attributes, as a dict of (attributes x attributes)
+    DataFrames keyed by statistic. Every attribute is encoded once; with n_jobs > 1 the pairs
+    are computed in parallel across processes (worthwhile for high cardinality attributes
+    such as legislativeSubjects).
+    """
+    view = get_encoded_view(dataframe)
+    encoded_attributes = {
+        attribute: view.attribute(attribute) for attribute in attributes
+    }
+    pairs = list(combinations(attributes, 2))
+
+    if n_jobs > 1 and len(pairs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_worker,
+            initargs=(encoded_attributes,),
+        ) as executor:
+            results = list(
+                executor.map(
+                    _worker_pair_statistics,
+                    [attr1 for attr1, _ in pairs],
+                    [attr2 for _, attr2 in pairs],
+                )
+            )
+    else:
+        results = [
+            pair_statistics(encoded_attributes[attr1], encoded_attributes[attr2])
+            for attr1, attr2 in pairs
+        ]
+
+    matrices = {
+        statistic: pd.DataFrame(np.nan, index=attributes, columns=attributes)
+        for statistic in ASSOCIATION_STATISTICS
+    }
+    for (attr1, attr2), result in zip(pairs, results):
+        for statistic, value in result.items():
+            matrices[statistic].loc[attr1, attr2] = value
+            matrices[statistic].loc[attr2, attr1] = value
+    np.fill_diagonal(matrices["cramers_v"].values, 1.0)
+    return matrices
@@ -0,0 +1,84 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+from .encoding import EncodedAttribute, get_encoded_view
+
+_COOCCURRENCE_MATRICES = weakref.WeakKeyDictionary()
+
+
+def incidence_matrix(encoded: EncodedAttribute) -> sparse.csr_matrix:
+    """
+    Returns the binary (rows x categories) incidence matrix of an encoded attribute,
+    such that a value repeated within a row is only counted once
+    """
+    matrix = encoded.matrix.copy()
+    matrix.data = np.ones_like(matrix.data, dtype=np.int32)
+    return matrix
+
+
+def cooccurrence_matrix(dataframe: pd.DataFrame, attribute: str) -> sparse.csr_matrix:
+    """
+    Returns the sparse (categories x categories) co-occurrence counts of an attribute,
+    i.e. the number of rows in which each pair of values occurs together, computed as
+    XᵀX of the binary incidence matrix X. The diagonal holds the number of rows each
+    value occurs in. Categories are those of `get_encoded_view(dataframe).attribute(attribute)`.
+    The matrix is cached for the lifetime of the encoded view.
+    """
+    encoded = get_encoded_view(dataframe).attribute(attribute)
+    if encoded not in _COOCCURRENCE_MATRICES:
+        incidence = incidence_matrix(encoded)
+        _COOCCURRENCE_MATRICES[encoded] = (incidence.T @ incidence).tocsr()
+    return _COOCCURRENCE_MATRICES[encoded]
+
+
+def top_cooccurring_pairs(
+    dataframe: pd.DataFrame, attribute: str = "legislativeSubjects", n: int = 30
+) -> pd.DataFrame:
+    """
+    Returns the n most frequently co-occurring pairs of values of an attribute,
+    with the number of rows each pair occurs in, from most to least frequent
+    """
+    encoded = get_encoded_view(dataframe).attribute(attribute)
+    pairs = sparse.triu(cooccurrence_matrix(dataframe, attribute), k=1).tocoo()
+
+    selected = np.arange(pairs.nnz)
+    if n and n < pairs.nnz:
+        selected = np.argpartition(-pairs.data, n - 1)[:n]
+    order = np.lexsort(
+        (pairs.col[selected], pairs.row[selected], -pairs.data[selected])
+    )
+    selected = selected[order]
+
+    return pd.DataFrame(
+        {
+            f"{attribute}_1": encoded.categories[pairs.row[selected]],
+            f"{attribute}_2": encoded.categories[pairs.col[selected]],
+            "count": pairs.data[selected],
+        }
+    )
+
+
+def cooccurrence_dataframe(
+    dataframe: pd.DataFrame, attribute: str, values: list = None
+) -> pd.DataFrame:
+    """
+    Returns the (dense) co-occurrence counts between the given values of an attribute,
+    or between all values if none are given
+    """
+    encoded = get_encoded_view(dataframe).attribute(attribute)
+    matrix = cooccurrence_matrix(dataframe, attribute)
+    if values is None:
+        values = encoded.categories
+    codes = encoded.categories.get_indexer(values)
+    if (codes < 0).any():
+        missing = [v for v, c in zip(values, codes) if c < 0]
+        raise KeyError(f"Values not found in {attribute}: {missing}")
+
+    return pd.DataFrame(
+        matrix[codes][:, codes].toarray(),
+        index=pd.Index(values, name=attribute),
+        columns=pd.Index(values, name=attribute),
+    )
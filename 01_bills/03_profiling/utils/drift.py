@@ -0,0 +1,256 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from .association import chi_squared_statistics, cramers_v_statistic
+from .encoding import get_encoded_view
+from .plotting import show_or_save
+
+
+def ordered_groups(groups: pd.Index) -> np.ndarray:
+    """
+    Returns the positions of groups in order, numerically if all groups are numeric
+    (e.g. congresses stored as str, such that "99" comes before "100")
+    """
+    numeric = pd.to_numeric(pd.Series(groups), errors="coerce")
+    if numeric.notna().all():
+        return np.argsort(numeric.to_numpy(), kind="stable")
+    return np.arange(len(groups))
+
+
+def grouped_count_matrix(dataframe: pd.DataFrame, attribute: str, group_by: str):
+    """
+    Returns the sparse (groups x categories) counts of an attribute per group, in group order,
+    with the group and category labels
+    """
+    view = get_encoded_view(dataframe)
+    encoded_group = view.attribute(group_by)
+    encoded = view.attribute(attribute)
+    order = ordered_groups(encoded_group.categories)
+    counts = view.contingency_matrix(group_by, attribute)[order]
+    observed = np.asarray(counts.sum(axis=1)).ravel() > 0
+    return (
+        counts[observed],
+        encoded_group.categories[order][observed],
+        encoded.categories,
+    )
+
+
+def grouped_counts(
+    dataframe: pd.DataFrame, attribute: str, group_by: str = "congress"
+) -> pd.DataFrame:
+    """
+    Returns the (groups x values) counts of an attribute (exploded if a list) per group
+    """
+    counts, groups, categories = grouped_count_matrix(dataframe, attribute, group_by)
+    observed = np.asarray(counts.sum(axis=0)).ravel() > 0
+    return pd.DataFrame(
+        counts[:, observed].toarray(),
+        index=pd.Index(groups, name=group_by),
+        columns=pd.Index(categories[observed], name=attribute),
+    )
+
+
+def grouped_class_ratios(
+    dataframe: pd.DataFrame, attribute: str, group_by: str = "congress"
+) -> pd.DataFrame:
+    """
+    Returns the (groups x values) class ratios of an attribute per group
+    """
+    counts = grouped_counts(dataframe, attribute, group_by)
+    return counts.div(counts.sum(axis=1), axis=0)
+
+
+def row_statistics(counts: sparse.csr_matrix) -> dict:
+    """
+    Returns the cardinality, gini index and (shannon - log2) entropy of each row of counts
+    """
+    counts = sparse.csr_matrix(counts, dtype=np.float64)
+    counts.eliminate_zeros()
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    ratios = counts.data / totals[rows]
+    return {
+        "cardinality": np.diff(counts.indptr),
+        "gini_index": np.round(
+            1 - np.bincount(rows, weights=ratios**2, minlength=counts.shape[0]), 4
+        ),
+        "entropy": np.round(
+            -np.bincount(
+                rows, weights=ratios * np.log2(ratios), minlength=counts.shape[0]
+            ),
+            4,
+        ),
+    }
+
+
+def grouped_profile(
+    dataframe: pd.DataFrame,
+    attributes: list = ["billType", "legislativeSubjects", "policyArea"],
+    group_by: str = "congress",
+) -> pd.DataFrame:
+    """
+    Returns the cardinality, gini index and entropy of each attribute per group
+    (e.g. per congress), as a DataFrame indexed by group with (attribute, statistic) columns
+    """
+    profiles = {}
+    for attribute in attributes:
+        counts, groups, _ = grouped_count_matrix(dataframe, attribute, group_by)
+        profiles[attribute] = pd.DataFrame(
+            row_statistics(counts), index=pd.Index(groups, name=group_by)
+        )
+    return pd.concat(profiles, axis=1)
+
+
+def grouped_association(
+    dataframe: pd.DataFrame,
+    attributes: list = ["legislativeSubjects", "policyArea"],
+    group_by: str = "congress",
+) -> pd.DataFrame:
+    """
+    Returns the chi-squared test of independence and Cramer's V between two attributes
+    within each group, from a single sparse product of the attributes offset by group
+    """
+    attr1, attr2 = attributes
+    view = get_encoded_view(dataframe)
+    encoded_group = view.attribute(group_by)
+    encoded1 = view.attribute(attr1)
+    encoded2 = view.attribute(attr2)
+    if encoded_group.is_list:
+        raise ValueError(f"Cannot group by a list attribute: {group_by}")
+
+    # (rows x groups * categories1) incidence of attr1 within the group of each row
+    n_categories1 = len(encoded1.categories)
+    matrix1 = encoded1.matrix.tocoo()
+    group_codes = encoded_group.codes[matrix1.row]
+    present = group_codes >= 0
+    grouped_matrix1 = sparse.csr_matrix(
+        (
+            matrix1.data[present],
+            (
+                matrix1.row[present],
+                group_codes[present] * n_categories1 + matrix1.col[present],
+            ),
+        ),
+        shape=(view.n_rows, len(encoded_group.categories) * n_categories1),
+    )
+    contingency = (grouped_matrix1.T @ encoded2.matrix).tocsr()
+
+    results = {}
+    for position in ordered_groups(encoded_group.categories):
+        table = contingency[
+            position * n_categories1 : (position + 1) * n_categories1
+        ].toarray()
+        table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+        if not table.size:
+            continue
+        chi2, p_value, dof = chi_squared_statistics(table)
+        n = table.sum()
+        results[encoded_group.categories[position]] = {
+            "chi2": chi2,
+            "p_value": p_value,
+            "dof": dof,
+            "n": n,
+            "cramers_v": cramers_v_statistic(chi2, n, table.shape),
+        }
+    return pd.DataFrame.from_dict(results, orient="index").rename_axis(group_by)
+
+
+def js_divergence(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Returns the Jensen-Shannon divergence (log2, between 0 and 1) between (rows of)
+    distributions p and q
+    """
+    m = (p + q) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_pm = np.where(p > 0, p * np.log2(p / m), 0).sum(axis=-1)
+        kl_qm = np.where(q > 0, q * np.log2(q / m), 0).sum(axis=-1)
+    return (kl_pm + kl_qm) / 2
+
+
+def js_divergence_matrix(
+    dataframe: pd.DataFrame, attribute: str, group_by: str = "congress"
+) -> pd.DataFrame:
+    """
+    Returns the (groups x groups) Jensen-Shannon divergence between the class ratios
+    of an attribute in each pair of groups
+    """
+    class_ratios = grouped_class_ratios(dataframe, attribute, group_by)
+    ratios = class_ratios.to_numpy()
+    divergences = js_divergence(ratios[:, None, :], ratios[None, :, :])
+    return pd.DataFrame(
+        divergences, index=class_ratios.index, columns=class_ratios.index
+    )
+
+
+def drift_report(
+    dataframe: pd.DataFrame, attribute: str, group_by: str = "congress"
+) -> pd.DataFrame:
+    """
+    Returns the drift of the distribution of an attribute between consecutive groups
+    (e.g. from one congress to the next): Jensen-Shannon divergence and the chi-squared
+    test of homogeneity of the two groups' counts
+    """
+    counts = grouped_counts(dataframe, attribute, group_by)
+    ratios = counts.div(counts.sum(axis=1), axis=0).to_numpy()
+
+    drift = []
+    for i in range(1, len(counts)):
+        table = counts.iloc[[i - 1, i]].to_numpy()
+        chi2, p_value, dof = chi_squared_statistics(table[:, table.sum(axis=0) > 0])
+        drift.append(
+            {
+                group_by: counts.index[i],
+                "previous": counts.index[i - 1],
+                "js_divergence": js_divergence(ratios[i - 1], ratios[i]),
+                "chi2": chi2,
+                "p_value": p_value,
+                "dof": dof,
+            }
+        )
+    return pd.DataFrame(
+        drift,
+        columns=[group_by, "previous", "js_divergence", "chi2", "p_value", "dof"],
+    ).set_index(group_by)
+
+
+def plot_grouped_profile(
+    dataframe: pd.DataFrame,
+    attributes: list = ["billType", "legislativeSubjects", "policyArea"],
+    group_by: str = "congress",
+    statistic: str = "entropy",
+    output_path: str = None,
+):
+    """
+    Returns a line plot of a statistic (cardinality, gini_index or entropy) of each attribute per group
+    """
+    profile = grouped_profile(dataframe, attributes, group_by).xs(
+        statistic, axis=1, level=1
+    )
+
+    plt.figure(figsize=(10, 6))
+    sns.lineplot(data=profile.set_axis(profile.index.astype(str)))
+    plt.xlabel(group_by)
+    plt.ylabel(statistic)
+    plt.title(f"{statistic} per {group_by}")
+    show_or_save(output_path)
+
+
+def plot_js_divergence_heatmap(
+    dataframe: pd.DataFrame,
+    attribute: str = "legislativeSubjects",
+    group_by: str = "congress",
+    output_path: str = None,
+):
+    """
+    Returns heat map of the Jensen-Shannon divergence of an attribute between groups
+    """
+    divergences = js_divergence_matrix(dataframe, attribute, group_by)
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(divergences, annot=True, fmt=".3f", cmap="viridis", vmin=0)
+    plt.title(f"Jensen-Shannon Divergence of {attribute} between {group_by}")
+    show_or_save(output_path)
@@ -0,0 +1,263 @@
+import itertools
+import weakref
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+_ENCODED_VIEWS = {}
+
+
+def is_list_attribute(dataframe: pd.DataFrame, attribute: str) -> bool:
+    return isinstance(dataframe.iloc[0][attribute], list)
+
+
+def factorize(values):
+    """
+    Returns integer codes (-1 for missing values) and sorted categories for an array of values
+    """
+    try:
+        codes, categories = pd.factorize(values, sort=True)
+    except TypeError:
+        # mixed types which cannot be compared, e.g. congress as both str and int
+        codes, categories = pd.factorize(values)
+    return codes, pd.Index(categories)
+
+
+class EncodedAttribute(object):
+    """
+    Integer coded representation of a single attribute of a DataFrame.
+
+    `matrix` is a sparse (rows x categories) incidence matrix holding the number of times
+    each category occurs in each row, such that for list attributes (e.g. legislativeSubjects)
+    it is equivalent to exploding the attribute without copying the DataFrame.
+    `codes` holds the category code of each row for non-list attributes (-1 when missing).
+    `explode_lengths` holds the number of rows each row becomes when the attribute is exploded.
+    `first_positions` holds the position each category is first seen at, such that ties
+    are ordered as in pandas `value_counts`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        categories: pd.Index,
+        matrix: sparse.csr_matrix,
+        explode_lengths: np.ndarray,
+        codes: np.ndarray = None,
+        first_positions: np.ndarray = None,
+    ):
+        self.name = name
+        self.categories = categories
+        self.matrix = matrix
+        self.explode_lengths = explode_lengths
+        self.codes = codes
+        self.counts = np.asarray(matrix.sum(axis=0)).ravel()
+        if first_positions is None:
+            first_positions = np.arange(len(categories))
+        self.first_positions = first_positions
+
+    @property
+    def is_list(self) -> bool:
+        return self.codes is None
+
+    @property
+    def row_lengths(self) -> np.ndarray:
+        """
+        Number of (non-missing) values in each row
+        """
+        return np.diff(self.matrix.indptr)
+
+    @classmethod
+    def from_series(cls, series: pd.Series, is_list: bool):
+        n_rows = len(series)
+        if is_list:
+            lengths = np.fromiter(
+                (len(v) if isinstance(v, list) else 0 for v in series),
+                dtype=np.int64,
+                count=n_rows,
+            )
+            flat_values = list(
+                itertools.chain.from_iterable(v for v in series if isinstance(v, list))
+            )
+            flat_codes, categories = factorize(np.array(flat_values, dtype=object))
+            rows = np.repeat(np.arange(n_rows), lengths)
+            codes = None
+            explode_lengths = np.maximum(lengths, 1)
+        else:
+            codes, categories = factorize(series.to_numpy())
+            flat_codes = codes
+            rows = np.arange(n_rows)
+            explode_lengths = np.ones(n_rows, dtype=np.int64)
+
+        present = flat_codes >= 0
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(present.sum(), dtype=np.int64),
+                (rows[present], flat_codes[present]),
+            ),
+            shape=(n_rows, len(categories)),
+        )
+        matrix.sum_duplicates()
+        first_positions = np.full(len(categories), len(flat_codes), dtype=np.int64)
+        np.minimum.at(first_positions, flat_codes[present], np.flatnonzero(present))
+        return cls(
+            name=series.name,
+            categories=categories,
+            matrix=matrix,
+            explode_lengths=explode_lengths,
+            codes=codes,
+            first_positions=first_positions,
+        )
+
+    def value_counts(self, normalize: bool = False) -> pd.Series:
+        """
+        Equivalent of `value_counts` on the (exploded) attribute
+        """
+        ranked = rank_categories(self.counts, self.first_positions)
+        values = self.counts[ranked]
+        if normalize:
+            values = values / values.sum()
+        return pd.Series(
+            values,
+            index=pd.Index(self.categories[ranked], name=self.name),
+            name="proportion" if normalize else "count",
+        )
+
+    def cardinality(self) -> int:
+        return int((self.counts > 0).sum())
+
+
+class EncodedDataFrame(object):
+    """
+    Cached, integer coded view of a DataFrame used for profiling.
+    Attributes are encoded on first use and reused by subsequent calls,
+    such that statistics are computed with NumPy/SciPy operations rather than
+    copying and exploding the DataFrame each time.
+    """
+
+    def __init__(self, dataframe: pd.DataFrame):
+        self._dataframe = weakref.ref(dataframe)
+        self.n_rows = len(dataframe)
+        self.columns = list(dataframe.columns)
+        self._attributes = {}
+
+    def attribute(self, name: str) -> EncodedAttribute:
+        if name not in self._attributes:
+            dataframe = self._dataframe()
+            self._attributes[name] = EncodedAttribute.from_series(
+                dataframe[name], is_list=is_list_attribute(dataframe, name)
+            )
+        return self._attributes[name]
+
+    def exploded_counts(self, attribute: str, other: str) -> np.ndarray:
+        """
+        Counts of each category of `attribute` in the DataFrame exploded on both attributes
+        """
+        encoded = self.attribute(attribute)
+        return encoded.matrix.T @ self.attribute(other).explode_lengths
+
+    def contingency_matrix(self, attr1: str, attr2: str) -> sparse.csr_matrix:
+        """
+        Sparse (categories1 x categories2) co-occurrence counts of two attributes,
+        equivalent to a crosstab of the DataFrame exploded on both attributes
+        """
+        return (self.attribute(attr1).matrix.T @ self.attribute(attr2).matrix).tocsr()
+
+    def crosstab(
+        self,
+        attr1: str,
+        attr2: str,
+        n1: int = None,
+        n2: int = None,
+        values1: list = None,
+        values2: list = None,
+    ) -> pd.DataFrame:
+        """
+        Equivalent of `pd.crosstab` on the DataFrame exploded on both attributes,
+        optionally limited to the n1/n2 most frequent values of attr1/attr2,
+        or to the given values1/values2.
+        """
+        encoded1 = self.attribute(attr1)
+        encoded2 = self.attribute(attr2)
+        if values1 is not None:
+            rows = selected_categories(encoded1.categories, values1)
+        else:
+            rows = top_categories(
+                self.exploded_counts(attr1, attr2), n1, encoded1.first_positions
+            )
+        if values2 is not None:
+            columns = selected_categories(encoded2.categories, values2)
+        else:
+            columns = top_categories(
+                self.exploded_counts(attr2, attr1), n2, encoded2.first_positions
+            )
+
+        contingency = self.contingency_matrix(attr1, attr2)[rows][:, columns]
+        contingency = contingency.toarray()
+        observed_rows = contingency.sum(axis=1) > 0
+        observed_columns = contingency.sum(axis=0) > 0
+        return pd.DataFrame(
+            contingency[observed_rows][:, observed_columns],
+            index=pd.Index(encoded1.categories[rows][observed_rows], name=attr1),
+            columns=pd.Index(
+                encoded2.categories[columns][observed_columns], name=attr2
+            ),
+        )
+
+
+def rank_categories(
+    counts: np.ndarray, first_positions: np.ndarray = None
+) -> np.ndarray:
+    """
+    Returns the codes of the observed categories from most to least frequent.
+    Categories are ordered by first_positions before sorting by count, as pandas
+    `value_counts` does, so that ties are ranked in the same order.
+    """
+    observed = np.flatnonzero(counts > 0)
+    if first_positions is not None:
+        observed = observed[np.argsort(first_positions[observed], kind="stable")]
+    order = pd.Series(counts[observed]).sort_values(ascending=False).index
+    return observed[order.to_numpy()]
+
+
+def top_categories(
+    counts: np.ndarray, n: int = None, first_positions: np.ndarray = None
+) -> np.ndarray:
+    """
+    Returns the (sorted) codes of the n most frequent categories, or all observed categories
+    """
+    if n:
+        return np.sort(rank_categories(counts, first_positions)[:n])
+    return np.flatnonzero(counts > 0)
+
+
+def selected_categories(categories: pd.Index, values: list) -> np.ndarray:
+    """
+    Returns the (sorted) codes of the given values, ignoring values not in categories
+    """
+    codes = categories.get_indexer(values)
+    return np.sort(codes[codes >= 0])
+
+
+def get_encoded_view(dataframe: pd.DataFrame) -> EncodedDataFrame:
+    """
+    Returns the EncodedDataFrame for a DataFrame, building it on first use.
+    Views are cached for the lifetime of the DataFrame; call `clear_encoded_views`
+    if a DataFrame is modified in place.
+    """
+    key = id(dataframe)
+    view = _ENCODED_VIEWS.get(key)
+    if (
+        view is None
+        or view._dataframe() is not dataframe
+        or view.n_rows != len(dataframe)
+        or view.columns != list(dataframe.columns)
+    ):
+        view = EncodedDataFrame(dataframe)
+        _ENCODED_VIEWS[key] = view
+        weakref.finalize(dataframe, _ENCODED_VIEWS.pop, key, None)
+    return view
+
+
+def clear_encoded_views():
+    _ENCODED_VIEWS.clear()
@@ -2,88 +2,144 @@ import numpy as np
 import pandas as pd
 import collections
 
-from typing import Union
-from itertools import combinations
-from collections import Counter
-
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-
-def get_dataframe_copy(dataframe: pd.DataFrame, attributes: Union[str, list]):
-    """
-    Returns a deep copy of an input DataFrame such that the original dataframe is preserved and untouched.
-    Modifications are to be applied to returned deep copy.
-    """
-    if isinstance(attributes, str):
-        if isinstance(dataframe.iloc[0][attributes], list):
-            dataframe_copy = dataframe.explode(attributes, ignore_index=True)
-            return dataframe_copy
-        else:
-            dataframe_copy = dataframe.copy(deep=True)
-            return dataframe_copy
-
-    else:
-        for attribute in attributes:
-            dataframe_copy = get_dataframe_copy(dataframe, attribute)
-            dataframe = dataframe_copy
-
-    return dataframe_copy
+from .cooccurrence import top_cooccurring_pairs
+from .encoding import get_encoded_view, is_list_attribute
+from .plotting import show_or_save
+from .sketches import get_sketch
 
 
 def count_bar_plot(
-    dataframe: pd.DataFrame, attribute: str, n: int = None, figsize: tuple = (10, 6)
+    dataframe: pd.DataFrame,
+    attribute: str,
+    n: int = None,
+    figsize: tuple = (10, 6),
+    output_path: str = None,
+    approximate: bool = False,
+    sketches: dict = None,
 ):
     """
     Returns a bar plot for the counts for the given attribute in a DataFrame
+    If approximate, the top n counts are estimated from a sketch of the attribute
+    (from sketches, e.g. merged per congress sketches, if given)
     """
-    dataframe_copy = get_dataframe_copy(dataframe=dataframe, attributes=attribute)
-    count_df = pd.DataFrame(dataframe_copy[attribute].value_counts())
+    if approximate:
+        sketch = get_sketch(dataframe, attribute, sketches)
+        count_df = pd.DataFrame(sketch.value_counts(n))
+        print(
+            f"Approximate counts of {attribute}, overestimated by at most: {sketch.error_bounds(n)['top_count']}"
+        )
+    else:
+        count_df = pd.DataFrame(
+            get_encoded_view(dataframe).attribute(attribute).value_counts()
+        )
     if n:
         count_df = count_df.iloc[:n]
 
+    draw_count_bar_plot(count_df, attribute, figsize=figsize, output_path=output_path)
+
+
+def draw_count_bar_plot(
+    count_df: pd.DataFrame,
+    attribute: str,
+    figsize: tuple = (10, 6),
+    output_path: str = None,
+):
+    """
+    Plots the counts (a DataFrame of `value_counts` indexed by attribute)
+    """
     # Plot bar plot
     plt.figure(figsize=figsize)
     sns.barplot(x="count", y=attribute, data=count_df, palette="viridis", hue=attribute)
     plt.xlabel("Number of Bills")
     plt.ylabel(attribute)
     plt.title(f"Count of Bills per {attribute}")  # Counts of Categorical Values
-    plt.show()
+    show_or_save(output_path)
 
 
 def calculate_count_distribution(
-    dataframe: pd.DataFrame, attribute: str, n: int = None
+    dataframe: pd.DataFrame,
+    attribute: str,
+    n: int = None,
+    approximate: bool = False,
+    sketches: dict = None,
 ):
     """
     Returns simple summary statistics for the count distribution of an attribute
     If n is given then it also returns the top n more common categories
+    If approximate, these are estimated from a sketch of the attribute, with error bounds
     """
-    dataframe_copy = get_dataframe_copy(dataframe, attribute)
+    if approximate:
+        sketch = get_sketch(dataframe, attribute, sketches)
+        value_counts = sketch.value_counts(n or 1)
+        summary_stats = pd.Series(
+            {
+                "count": sketch.total,
+                "unique": sketch.cardinality(),
+                "top": value_counts.index[0] if len(value_counts) else np.nan,
+                "freq": value_counts.iloc[0] if len(value_counts) else np.nan,
+            },
+            name=attribute,
+            dtype=object,
+        )
+        print(f"Approximate Summary Stats for {attribute}:\n{summary_stats}\n")
+        print(f"Error bounds: {sketch.error_bounds(n or 1)}\n")
+        if n:
+            print(f"Top {n} Most Frequent: {value_counts}\n")
+        return
 
-    series = dataframe_copy[attribute]
-    summary_stats = series.describe()
+    encoded = get_encoded_view(dataframe).attribute(attribute)
+    value_counts = encoded.value_counts()
+
+    if encoded.is_list:
+        summary_stats = pd.Series(
+            {
+                "count": encoded.counts.sum(),
+                "unique": len(value_counts),
+                "top": value_counts.index[0] if len(value_counts) else np.nan,
+                "freq": value_counts.iloc[0] if len(value_counts) else np.nan,
+            },
+            name=attribute,
+            dtype=object,
+        )
+    else:
+        summary_stats = dataframe[attribute].describe()
     print(f"Summary Stats for {attribute}:\n{summary_stats}\n")
 
     if n:
-        top_n_values = series.value_counts()[:n]
+        top_n_values = value_counts[:n]
         print(f"Top {n} Most Frequent: {top_n_values}\n")
 
 
-def frequency_bar_plot(dataframe: pd.DataFrame, attribute: str = "legislativeSubjects"):
+def frequency_bar_plot(
+    dataframe: pd.DataFrame,
+    attribute: str = "legislativeSubjects",
+    output_path: str = None,
+):
     """
     Returns a bar plot for the frequency of counts of a attribute which has values in the form of a list
     """
-    if type(dataframe.iloc[0][attribute]) != list:
+    if not is_list_attribute(dataframe, attribute):
         print(f"No frequencies to calculate for {attribute}")
         return
 
     frequency_attribute = f"frequency_{attribute}"
-    dataframe_copy = dataframe.copy(deep=True)
-    dataframe_copy[frequency_attribute] = dataframe_copy[attribute].apply(
-        lambda x: len(x)
+    row_lengths = get_encoded_view(dataframe).attribute(attribute).row_lengths
+    count_df = pd.DataFrame(
+        pd.Series(row_lengths, name=frequency_attribute).value_counts()
     )
+    draw_frequency_bar_plot(count_df, attribute, output_path=output_path)
 
-    count_df = pd.DataFrame(dataframe_copy[frequency_attribute].value_counts())
+
+def draw_frequency_bar_plot(
+    count_df: pd.DataFrame, attribute: str, output_path: str = None
+):
+    """
+    Plots the number of bills (a DataFrame of `value_counts` indexed by frequency_{attribute})
+    """
+    frequency_attribute = f"frequency_{attribute}"
 
     # Plot bar plot
     plt.figure(figsize=(10, 6))
@@ -97,21 +153,19 @@ def frequency_bar_plot(dataframe: pd.DataFrame, attribute: str = "legislativeSub
     plt.ylabel("Number of Bills")
     plt.xlabel(f"Number of {attribute}")
     plt.title(f"Frequency of {attribute}")
-    plt.show()
+    show_or_save(output_path)
 
 
 def calculate_frequency_distribution(dataframe: pd.DataFrame, attribute: str):
     """
     Returns summary statistics for frequency distribution
     """
-    if type(dataframe.iloc[0][attribute]) != list:
+    if not is_list_attribute(dataframe, attribute):
         print(f"No frequency distribution to calculate for {attribute}")
         return
-    dataframe_copy = get_dataframe_copy(dataframe, attribute)
-
-    series = dataframe_copy[attribute]
+    value_counts = get_encoded_view(dataframe).attribute(attribute).value_counts()
 
-    frequency_summary_stats = series.value_counts().describe()
+    frequency_summary_stats = value_counts.describe()
     print(f"Summary Stats for Counts for {attribute}:\n{frequency_summary_stats}\n")
 
 
@@ -121,66 +175,85 @@ def cross_tabulation_heatmap(
     n1: int = None,
     n2: int = None,
     figsize: tuple = (10, 10),
+    output_path: str = None,
+    approximate: bool = False,
+    sketches: dict = None,
 ):
     """
     Returns a heatmap to display the cross tabulation (pairwise analysis) between two attributes
+    If approximate, the n1/n2 most frequent values are selected from sketches of the attributes
+    (by their own counts) rather than exact counts
     """
-    dataframe_copy = get_dataframe_copy(dataframe, attributes)
+    attr1, attr2 = attributes
+
+    values1 = values2 = None
+    if approximate and n1:
+        values1 = list(get_sketch(dataframe, attr1, sketches).value_counts(n1).index)
+    if approximate and n2:
+        values2 = list(get_sketch(dataframe, attr2, sketches).value_counts(n2).index)
+    frequency_matrix = get_encoded_view(dataframe).crosstab(
+        attr1, attr2, n1=n1, n2=n2, values1=values1, values2=values2
+    )
+    draw_cross_tabulation_heatmap(
+        frequency_matrix, attributes, figsize=figsize, output_path=output_path
+    )
 
+
+def draw_cross_tabulation_heatmap(
+    frequency_matrix: pd.DataFrame,
+    attributes: list,
+    figsize: tuple = (10, 10),
+    output_path: str = None,
+):
+    """
+    Plots a cross tabulation (attr1 x attr2 DataFrame of counts)
+    """
     attr1, attr2 = attributes
 
-    if n1 and n2:
-        top_attr1 = dataframe_copy[attr1].value_counts()[:n1].index
-        top_attr2 = dataframe_copy[attr2].value_counts()[:n2].index
-        dataframe_copy = dataframe_copy[
-            dataframe_copy[attr1].isin(top_attr1)
-            & dataframe_copy[attr2].isin(top_attr2)
-        ]
-
-    elif n1:
-        top_attr1 = dataframe_copy[attr1].value_counts()[:n1].index
-        top_attr2 = dataframe_copy[attr2].value_counts().index
-        dataframe_copy = dataframe_copy[
-            dataframe_copy[attr1].isin(top_attr1)
-            & dataframe_copy[attr2].isin(top_attr2)
-        ]
-
-    elif n2:
-        top_attr1 = dataframe_copy[attr1].value_counts().index
-        top_attr2 = dataframe_copy[attr2].value_counts()[:n2].index
-        dataframe_copy = dataframe_copy[
-            dataframe_copy[attr1].isin(top_attr1)
-            & dataframe_copy[attr2].isin(top_attr2)
-        ]
-
-    frequency_matrix = pd.crosstab(dataframe_copy[attr1], dataframe_copy[attr2])
     # Plot heatmap
     plt.figure(figsize=figsize)
     sns.heatmap(frequency_matrix, cmap="viridis", annot=True, fmt="d")
     plt.title(f"{attr1} vs. {attr2} Co-occurence Heatmap")
     plt.xlabel(f"{attr2}")
     plt.ylabel(f"{attr1}")
-    plt.show()
+    show_or_save(output_path)
 
 
 def frequent_combination_heatmap(
-    dataframe: pd.DataFrame, attribute: str = "legislativeSubjects", top_n: int = 30
+    dataframe: pd.DataFrame,
+    attribute: str = "legislativeSubjects",
+    top_n: int = 30,
+    output_path: str = None,
 ):
-    pairs = []
-    for values in dataframe[attribute]:
-        if isinstance(values, list) and len(values) > 2:
-            pairs.extend(combinations(values, 2))
-    pair_counts = Counter(pairs)
-
-    most_common_pairs = pair_counts.most_common(top_n)
-    unique_subjects = list(set([s for pair, _ in most_common_pairs for s in pair]))
+    """
+    Returns a heatmap of the top_n most frequently co-occurring pairs of values of an attribute
+    """
+    most_common_pairs = top_cooccurring_pairs(dataframe, attribute, n=top_n)
+    draw_frequent_combination_heatmap(
+        most_common_pairs, attribute, top_n=top_n, output_path=output_path
+    )
+
+
+def draw_frequent_combination_heatmap(
+    most_common_pairs: pd.DataFrame,
+    attribute: str,
+    top_n: int = 30,
+    output_path: str = None,
+):
+    """
+    Plots co-occurrence counts of pairs (as returned by `top_cooccurring_pairs`)
+    """
+    value1, value2 = most_common_pairs.columns[:2]
+    unique_subjects = list(
+        pd.unique(most_common_pairs[[value1, value2]].to_numpy().ravel())
+    )
     co_occurrence_matrix = pd.DataFrame(
         np.zeros((len(unique_subjects), len(unique_subjects))),
         index=unique_subjects,
         columns=unique_subjects,
     )
 
-    for (subj1, subj2), count in most_common_pairs:
+    for subj1, subj2, count in most_common_pairs.itertuples(index=False):
         co_occurrence_matrix.loc[subj1, subj2] = count
         co_occurrence_matrix.loc[subj2, subj1] = count
 
@@ -190,4 +263,4 @@ def frequent_combination_heatmap(
         co_occurrence_matrix, annot=True, cmap="viridis", fmt=".0f", linewidths=0.5
     )
     plt.title(f"Top {top_n} Frequent Co-Occurrences in {attribute}")
-    plt.show()
+    show_or_save(output_path)
@@ -0,0 +1,121 @@
+import ast
+import json
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+LIST_COLUMNS = ["legislativeSubjects"]
+# delimiter of the list values of datasets written before the JSON encoding
+LEGACY_LIST_DELIMITER = "|"
+
+
+def encode_list(values: list) -> str:
+    """
+    Returns the values of a list as a JSON array of strings (e.g. '["Health", "Taxation"]', an empty list as "[]"),
+    which `decode_list` reads back whatever the values contain
+    """
+    return json.dumps([str(value) for value in values], ensure_ascii=False)
+
+
+def is_string_list(values) -> bool:
+    return isinstance(values, list) and all(isinstance(value, str) for value in values)
+
+
+def decode_list(value: str) -> list:
+    """
+    Returns the list of an encoded value (`encode_list`), missing and empty values as empty lists.
+    Values of datasets written before are also read: python lists (e.g. "['a', 'b']", with ast.literal_eval)
+    and values joined by LEGACY_LIST_DELIMITER (e.g. "a|b").
+    """
+    if not isinstance(value, str) or not value:
+        return []
+    try:
+        values = json.loads(value)
+    except ValueError:
+        values = None
+    if is_string_list(values):
+        return values
+    if value.startswith("["):
+        try:
+            values = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            values = None
+        if is_string_list(values):
+            return values
+    return value.split(LEGACY_LIST_DELIMITER)
+
+
+def encode_lists(values: pd.Series) -> pd.Series:
+    """
+    Returns the encoded values of a list column
+    """
+    return pd.Series(
+        [encode_list(value) for value in values],
+        index=values.index,
+        dtype=object,
+    )
+
+
+def decode_lists(values: pd.Series) -> pd.Series:
+    """
+    Returns the lists of an encoded column in one pass: the column is factorized and each distinct value
+    decoded once (`decode_list`), such that repeated values (e.g. empty lists) are not parsed again.
+    Each row gets its own list.
+    """
+    codes, uniques = pd.factorize(values.where(values.notna(), ""))
+    decoded = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        decoded[i] = decode_list(value)
+    return pd.Series(
+        [list(value) for value in decoded[codes]], index=values.index, dtype=object
+    )
+
+
+# per value converters for pd.read_csv, prefer `read_csv_with_lists` which decodes each column in one pass
+LIST_CONVERTERS = {column: decode_list for column in LIST_COLUMNS}
+
+
+def decode_list_columns(
+    dataframe: pd.DataFrame, list_columns: list = LIST_COLUMNS
+) -> pd.DataFrame:
+    """
+    Decodes the list columns of a dataframe read with them as str (`decode_lists`)
+    """
+    for column in list_columns:
+        if column in dataframe.columns:
+            dataframe[column] = decode_lists(dataframe[column])
+    return dataframe
+
+
+def read_csv_with_lists(path: Path, list_columns: list = LIST_COLUMNS, **kwargs):
+    """
+    Reads a csv(.gz) written by `write_csv_with_lists` (or in a format read by `decode_list`), with list columns as lists.
+    The list columns are read as str and decoded in one pass per column. With chunksize (or iterator),
+    yields the decoded chunks instead.
+    """
+    dtype = {column: str for column in list_columns}
+    dtype.update(kwargs.pop("dtype", {}))
+    if kwargs.get("chunksize") or kwargs.get("iterator"):
+        return (
+            decode_list_columns(chunk, list_columns)
+            for chunk in pd.read_csv(path, dtype=dtype, **kwargs)
+        )
+    return decode_list_columns(pd.read_csv(path, dtype=dtype, **kwargs), list_columns)
+
+
+def write_csv_with_lists(
+    dataframe: pd.DataFrame, path: Path, list_columns: list = LIST_COLUMNS, **kwargs
+):
+    """
+    Writes a dataframe to csv(.gz) with list columns encoded by `encode_list`
+    """
+    encoded = dataframe.assign(
+        **{
+            column: encode_lists(dataframe[column])
+            for column in list_columns
+            if column in dataframe.columns
+        }
+    )
+    encoded.to_csv(path, **kwargs)
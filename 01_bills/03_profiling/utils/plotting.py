@@ -0,0 +1,13 @@
+import matplotlib.pyplot as plt
+
+
+def show_or_save(output_path: str = None):
+    """
+    Shows the current figure, or saves it to output_path (and closes it) when given,
+    such that plots can be rendered headlessly
+    """
+    if output_path is None:
+        plt.show()
+        return
+    plt.savefig(output_path, bbox_inches="tight")
+    plt.close()
@@ -0,0 +1,505 @@
+import html
+import json
+import logging
+import shutil
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from .association import association_matrix
+from .cooccurrence import top_cooccurring_pairs
+from .encoding import get_encoded_view, is_list_attribute
+from .general import (
+    draw_count_bar_plot,
+    draw_cross_tabulation_heatmap,
+    draw_frequency_bar_plot,
+    draw_frequent_combination_heatmap,
+)
+from .hashing import dataset_hash
+from .schema import read_csv_with_schema
+from .streaming import PROFILING_DTYPES
+from .statistical import (
+    calculate_entropy,
+    calculate_gini_index,
+    draw_bias_crosstab,
+    draw_cramers_v_heatmap,
+    draw_entropies,
+    draw_gini_indexes,
+    find_association,
+)
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 3
+
+REPORT_ATTRIBUTES = [
+    "congress",
+    "billType",
+    "billNumber",
+    "legislativeSubjects",
+    "policyArea",
+]
+# attributes profiled individually (count plots, class ratios, gini index and entropy)
+COUNT_ATTRIBUTES = ["congress", "billType", "legislativeSubjects", "policyArea"]
+TOP_N = 30
+CLASS_RATIO_N = 5
+
+# as in 01_general_profiling_visualization.ipynb
+CROSS_TABULATIONS = [
+    {"attributes": ["policyArea", "congress"], "n1": None, "n2": None},
+    {"attributes": ["policyArea", "billType"], "n1": None, "n2": None},
+    {"attributes": ["legislativeSubjects", "congress"], "n1": 15, "n2": 19},
+    {"attributes": ["legislativeSubjects", "billType"], "n1": 30, "n2": None},
+    {"attributes": ["legislativeSubjects", "policyArea"], "n1": 20, "n2": 20},
+]
+# as in 02_stastistical_profiling_visualization.ipynb
+BIAS_CROSSTABS = [
+    {"attributes": ["policyArea", "congress"], "n": None, "figsize": (20, 20)},
+    {"attributes": ["policyArea", "billType"], "n": None, "figsize": (10, 10)},
+    {"attributes": ["legislativeSubjects", "congress"], "n": 20, "figsize": (20, 20)},
+    {
+        "attributes": ["legislativeSubjects", "policyArea"],
+        "n": 20,
+        "figsize": (20, 20),
+    },
+    {"attributes": ["legislativeSubjects", "billType"], "n": 30, "figsize": (10, 10)},
+]
+
+
+def to_json_value(value):
+    """
+    `default` for json.dump, converting NumPy values
+    """
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def frame_to_dict(dataframe: pd.DataFrame) -> dict:
+    return {
+        "index": dataframe.index.tolist(),
+        "columns": dataframe.columns.tolist(),
+        "index_name": dataframe.index.name,
+        "columns_name": dataframe.columns.name,
+        "data": dataframe.astype(object).where(dataframe.notna(), None).values.tolist(),
+    }
+
+
+def frame_from_dict(frame: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        frame["data"],
+        index=pd.Index(frame["index"], name=frame["index_name"]),
+        columns=pd.Index(frame["columns"], name=frame["columns_name"]),
+    )
+
+
+def series_to_dict(series: pd.Series) -> dict:
+    return {
+        "name": series.name,
+        "index_name": series.index.name,
+        "index": series.index.tolist(),
+        "values": series.tolist(),
+    }
+
+
+def series_from_dict(series: dict) -> pd.Series:
+    return pd.Series(
+        series["values"],
+        index=pd.Index(series["index"], name=series["index_name"]),
+        name=series["name"],
+    )
+
+
+def read_dataset(dataset_location: Path) -> pd.DataFrame:
+    return read_csv_with_schema(dataset_location, dtypes=PROFILING_DTYPES)
+
+
+def report_settings(attributes: list) -> dict:
+    return {
+        "version": REPORT_VERSION,
+        "attributes": list(attributes),
+        "top_n": TOP_N,
+        "cross_tabulations": CROSS_TABULATIONS,
+        "bias_crosstabs": BIAS_CROSSTABS,
+    }
+
+
+def compute_statistics(
+    dataset: pd.DataFrame, attributes: list = REPORT_ATTRIBUTES, n_jobs: int = 1
+) -> dict:
+    """
+    Computes all statistics of the report from the dataset (once, from its encoded view)
+    as a JSON serializable dict
+    """
+    start = time.perf_counter()
+    view = get_encoded_view(dataset)
+    count_attributes = [a for a in COUNT_ATTRIBUTES if a in attributes]
+    list_attributes = [a for a in attributes if is_list_attribute(dataset, a)]
+
+    statistics = {
+        "settings": report_settings(attributes),
+        "rows": len(dataset),
+        "columns": list(dataset.columns),
+        "cardinality": {a: view.attribute(a).cardinality() for a in attributes},
+        "value_counts": {
+            a: series_to_dict(view.attribute(a).value_counts()) for a in attributes
+        },
+        "frequencies": {
+            a: series_to_dict(
+                pd.Series(
+                    view.attribute(a).row_lengths, name=f"frequency_{a}"
+                ).value_counts()
+            )
+            for a in list_attributes
+        },
+        "gini_indexes": {a: calculate_gini_index(dataset, a) for a in count_attributes},
+        "entropies": {a: calculate_entropy(dataset, a) for a in count_attributes},
+        "association": {
+            statistic: frame_to_dict(matrix)
+            for statistic, matrix in association_matrix(
+                dataset, attributes, n_jobs=n_jobs
+            ).items()
+        },
+        "cross_tabulations": [],
+        "bias_crosstabs": [],
+        "frequent_combinations": {
+            a: frame_to_dict(top_cooccurring_pairs(dataset, a, n=TOP_N))
+            for a in list_attributes
+        },
+    }
+
+    for cross_tabulation in CROSS_TABULATIONS:
+        attr1, attr2 = cross_tabulation["attributes"]
+        if attr1 not in attributes or attr2 not in attributes:
+            continue
+        table = view.crosstab(
+            attr1, attr2, n1=cross_tabulation["n1"], n2=cross_tabulation["n2"]
+        )
+        statistics["cross_tabulations"].append(
+            {**cross_tabulation, "table": frame_to_dict(table)}
+        )
+
+    for bias_crosstab in BIAS_CROSSTABS:
+        attr1, attr2 = bias_crosstab["attributes"]
+        if attr1 not in attributes or attr2 not in attributes:
+            continue
+        table = view.crosstab(
+            attr1, attr2, n1=bias_crosstab["n"], n2=bias_crosstab["n"]
+        )
+        table = table / table.sum().sum()
+        table = table.div(table.sum(axis=1), axis=0)
+        statistics["bias_crosstabs"].append(
+            {**bias_crosstab, "table": frame_to_dict(table)}
+        )
+
+    logger.info(f"Computed statistics in {time.perf_counter() - start:.2f}s")
+    return statistics
+
+
+def figure_specs(statistics: dict) -> list:
+    """
+    Returns the figures of the report as (file name, kind, data) tuples
+    """
+    settings = statistics["settings"]
+    figures = []
+    for attribute in COUNT_ATTRIBUTES:
+        if attribute not in statistics["value_counts"]:
+            continue
+        n = TOP_N if attribute in statistics["frequencies"] else None
+        figures.append(
+            (
+                f"count_{attribute}.png",
+                "count",
+                {"value_counts": statistics["value_counts"][attribute], "n": n},
+            )
+        )
+    for attribute, frequencies in statistics["frequencies"].items():
+        figures.append(
+            (
+                f"frequency_{attribute}.png",
+                "frequency",
+                {"attribute": attribute, "frequencies": frequencies},
+            )
+        )
+    for cross_tabulation in statistics["cross_tabulations"]:
+        attr1, attr2 = cross_tabulation["attributes"]
+        figures.append((f"crosstab_{attr1}_{attr2}.png", "crosstab", cross_tabulation))
+    for bias_crosstab in statistics["bias_crosstabs"]:
+        attr1, attr2 = bias_crosstab["attributes"]
+        figures.append((f"bias_{attr1}_{attr2}.png", "bias_crosstab", bias_crosstab))
+    if statistics["gini_indexes"]:
+        figures.append(("gini_indexes.png", "gini", statistics["gini_indexes"]))
+        figures.append(("entropies.png", "entropy", statistics["entropies"]))
+    if len(settings["attributes"]) > 1:
+        figures.append(
+            ("cramers_v.png", "cramers_v", statistics["association"]["cramers_v"])
+        )
+    for attribute, pairs in statistics["frequent_combinations"].items():
+        figures.append(
+            (
+                f"frequent_combinations_{attribute}.png",
+                "frequent_combinations",
+                {"attribute": attribute, "pairs": pairs},
+            )
+        )
+    return figures
+
+
+def render_figure(kind: str, data, output_path: Path):
+    """
+    Draws a single figure of the report (from its cached statistics) to output_path
+    """
+    if kind == "count":
+        count_df = pd.DataFrame(series_from_dict(data["value_counts"]))
+        if data["n"]:
+            count_df = count_df.iloc[: data["n"]]
+        draw_count_bar_plot(count_df, count_df.index.name, output_path=output_path)
+    elif kind == "frequency":
+        count_df = pd.DataFrame(series_from_dict(data["frequencies"]))
+        draw_frequency_bar_plot(count_df, data["attribute"], output_path=output_path)
+    elif kind == "crosstab":
+        draw_cross_tabulation_heatmap(
+            frame_from_dict(data["table"]).astype(int),
+            data["attributes"],
+            output_path=output_path,
+        )
+    elif kind == "bias_crosstab":
+        draw_bias_crosstab(
+            frame_from_dict(data["table"]).astype(float),
+            data["attributes"],
+            figsize=tuple(data["figsize"]),
+            output_path=output_path,
+        )
+    elif kind == "gini":
+        draw_gini_indexes(data, output_path=output_path)
+    elif kind == "entropy":
+        draw_entropies(data, output_path=output_path)
+    elif kind == "cramers_v":
+        draw_cramers_v_heatmap(
+            frame_from_dict(data).astype(float), output_path=output_path
+        )
+    elif kind == "frequent_combinations":
+        pairs = frame_from_dict(data["pairs"])
+        draw_frequent_combination_heatmap(
+            pairs, data["attribute"], top_n=len(pairs), output_path=output_path
+        )
+    else:
+        raise ValueError(f"Unknown figure: {kind}")
+    return output_path
+
+
+def _init_renderer():
+    matplotlib.use("Agg")
+
+
+def render_figures(
+    statistics: dict, figures_directory: Path, n_jobs: int = 1, overwrite: bool = False
+) -> list:
+    """
+    Renders the figures of the report (headlessly) into figures_directory,
+    in parallel processes if n_jobs > 1. Existing figures are kept unless overwrite.
+    Returns the paths of all figures.
+    """
+    figures_directory.mkdir(parents=True, exist_ok=True)
+    figures = [
+        (figures_directory / file_name, kind, data)
+        for file_name, kind, data in figure_specs(statistics)
+    ]
+    to_render = [f for f in figures if overwrite or not f[0].exists()]
+    logger.info(f"Rendering figures: {len(to_render)} of {len(figures)}")
+
+    if n_jobs > 1 and len(to_render) > 1:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_renderer
+        ) as executor:
+            futures = [
+                executor.submit(render_figure, kind, data, path)
+                for path, kind, data in to_render
+            ]
+            for future in futures:
+                future.result()
+    else:
+        _init_renderer()
+        for path, kind, data in to_render:
+            render_figure(kind, data, path)
+
+    return [path for path, _, _ in figures]
+
+
+def html_table(dataframe: pd.DataFrame, float_format: str = "{:.4f}") -> str:
+    return dataframe.to_html(
+        border=0, classes="table", float_format=float_format.format, na_rep=""
+    )
+
+
+def write_html_report(
+    statistics: dict, figures: list, output_path: Path, title: str
+) -> Path:
+    """
+    Writes a single page HTML report of the statistics and figures
+    (figures are referenced relative to output_path)
+    """
+    attributes = statistics["settings"]["attributes"]
+    sections = []
+
+    overview = pd.DataFrame(
+        {
+            "Cardinality": statistics["cardinality"],
+            "Gini Index": statistics["gini_indexes"],
+            "Entropy": statistics["entropies"],
+        }
+    ).reindex(attributes)
+    sections.append(("Attributes", html_table(overview)))
+
+    class_ratios = []
+    for attribute in statistics["gini_indexes"]:
+        ratios = series_from_dict(statistics["value_counts"][attribute])
+        ratios = (ratios / ratios.sum()).rename("proportion")
+        if len(ratios) < 2:
+            continue
+        class_ratios.append(
+            f"<h3>{html.escape(attribute)}</h3>"
+            f"<p>Overall Imbalance Ratio: {ratios.iloc[-1] / ratios.iloc[0]:.5f}</p>"
+            + html_table(
+                pd.concat(
+                    {
+                        "Most dominant": ratios.iloc[:CLASS_RATIO_N].reset_index(),
+                        "Least dominant": ratios.iloc[-CLASS_RATIO_N:].reset_index(),
+                    },
+                    axis=1,
+                ),
+                float_format="{:.6f}",
+            )
+        )
+    sections.append(("Class Ratios", "".join(class_ratios)))
+
+    association = {
+        statistic: frame_from_dict(matrix)
+        for statistic, matrix in statistics["association"].items()
+    }
+    cramers_v = association["cramers_v"].astype(float)
+    labels = cramers_v.map(lambda v: f"{v:.2f} ({find_association(v)})")
+    sections.append(
+        (
+            "Association",
+            "<h3>Cramér's V</h3>"
+            + html_table(labels)
+            + "<h3>Chi-squared p-values</h3>"
+            + html_table(association["p_value"].astype(float)),
+        )
+    )
+
+    for attribute, pairs in statistics["frequent_combinations"].items():
+        sections.append(
+            (
+                f"Top {TOP_N} Co-Occurrences in {attribute}",
+                html_table(frame_from_dict(pairs)),
+            )
+        )
+
+    sections.append(
+        (
+            "Figures",
+            "".join(
+                f'<figure><img src="{html.escape(figure.relative_to(output_path.parent).as_posix())}">'
+                f"<figcaption>{html.escape(figure.stem)}</figcaption></figure>"
+                for figure in figures
+            ),
+        )
+    )
+
+    body = "".join(
+        f"<section><h2>{html.escape(heading)}</h2>{content}</section>"
+        for heading, content in sections
+    )
+    output_path.write_text(
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title>"
+        "<style>body{font-family:sans-serif;margin:2em}"
+        "table{border-collapse:collapse}td,th{padding:2px 8px;text-align:right}"
+        "figure{display:inline-block;margin:1em}img{max-width:800px}</style>"
+        f"</head><body><h1>{html.escape(title)}</h1>"
+        f"<p>Rows: {statistics['rows']} &middot; Dataset hash: {statistics['hash']}</p>"
+        f"{body}</body></html>",
+        encoding="utf-8",
+    )
+    return output_path
+
+
+def generate_profiling_report(
+    dataset_location: Path,
+    output_location: Path,
+    cache_location: Path = None,
+    attributes: list = REPORT_ATTRIBUTES,
+    n_jobs: int = 1,
+    overwrite: bool = False,
+) -> dict:
+    """
+    Generates a profiling report (report.html, report.json and figures) for a dataset in
+    output_location. Statistics and figures are cached under cache_location by the hash of
+    the dataset, so re-running on an unchanged dataset does not read it again.
+    """
+    output_location = Path(output_location)
+    cache_location = Path(cache_location or output_location / ".cache")
+
+    source_hash = dataset_hash(dataset_location, cache_location)
+    results_location = cache_location / source_hash
+    statistics_path = results_location / "stats.json"
+    settings = json.loads(json.dumps(report_settings(attributes)))
+
+    statistics = None
+    if statistics_path.exists() and not overwrite:
+        statistics = json.loads(statistics_path.read_text())
+        if statistics["settings"] != settings:
+            logger.info("Report settings changed, recomputing statistics")
+            statistics = None
+            overwrite = True
+        else:
+            logger.info(f"Using cached statistics: {statistics_path}")
+
+    if statistics is None:
+        logger.info(f"Reading dataset: {dataset_location}")
+        dataset = read_dataset(dataset_location)
+        statistics = compute_statistics(dataset, attributes=attributes, n_jobs=n_jobs)
+        statistics["hash"] = source_hash
+        statistics["dataset"] = str(dataset_location)
+        results_location.mkdir(parents=True, exist_ok=True)
+        statistics_path.write_text(json.dumps(statistics, default=to_json_value))
+        statistics = json.loads(statistics_path.read_text())
+
+    cached_figures = render_figures(
+        statistics, results_location / "figures", n_jobs=n_jobs, overwrite=overwrite
+    )
+
+    figures_directory = output_location / "figures"
+    figures_directory.mkdir(parents=True, exist_ok=True)
+    figures = []
+    for cached_figure in cached_figures:
+        figure = figures_directory / cached_figure.name
+        shutil.copy2(cached_figure, figure)
+        figures.append(figure)
+
+    report = {
+        **statistics,
+        "figures": [str(figure.relative_to(output_location)) for figure in figures],
+    }
+    (output_location / "report.json").write_text(
+        json.dumps(report, indent=2, default=to_json_value)
+    )
+    write_html_report(
+        statistics,
+        figures,
+        output_location / "report.html",
+        title=f"Profiling Report: {Path(dataset_location).name}",
+    )
+    logger.info(f"Saved report to: {output_location / 'report.html'}")
+    return report
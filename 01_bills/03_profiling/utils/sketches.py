@@ -0,0 +1,488 @@
+import base64
+import itertools
+import json
+import logging
+import weakref
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .encoding import get_encoded_view, is_list_attribute
+from .streaming import CHUNK_SIZE, iter_chunks
+
+logger = logging.getLogger(__name__)
+
+COUNT_MIN_WIDTH = 2048
+COUNT_MIN_DEPTH = 5
+SPACE_SAVING_SIZE = 1000
+HYPERLOGLOG_PRECISION = 12
+
+_DATAFRAME_SKETCHES = weakref.WeakKeyDictionary()
+
+
+def hash_values(values: np.ndarray, seed: int = 0) -> np.ndarray:
+    """
+    Returns stable (across processes and runs) 64 bit hashes of values
+    """
+    return pd.util.hash_array(
+        np.asarray(values, dtype=object), hash_key=f"{seed:016d}", categorize=False
+    )
+
+
+def encode_array(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+
+def decode_array(data: str, dtype, shape: tuple) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype).reshape(shape).copy()
+
+
+def aggregate(values, counts=None):
+    """
+    Returns the distinct values and their (summed) counts
+    """
+    values = np.asarray(values, dtype=object)
+    if counts is None:
+        counts = np.ones(len(values), dtype=np.int64)
+    codes, uniques = pd.factorize(values)
+    return uniques, np.bincount(codes, weights=counts, minlength=len(uniques)).astype(
+        np.int64
+    )
+
+
+class CountMinSketch(object):
+    """
+    Count-Min sketch (Cormode & Muthukrishnan) of value frequencies.
+    Estimates never undercount, and overcount by at most `epsilon * total`
+    with probability `1 - delta`.
+    """
+
+    def __init__(
+        self, width: int = COUNT_MIN_WIDTH, depth: int = COUNT_MIN_DEPTH, seed: int = 0
+    ):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.total = 0
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    @property
+    def epsilon(self) -> float:
+        return float(np.e / self.width)
+
+    @property
+    def delta(self) -> float:
+        return float(np.exp(-self.depth))
+
+    def _columns(self, values) -> np.ndarray:
+        return np.stack(
+            [
+                (hash_values(values, seed=self.seed + row) % np.uint64(self.width))
+                for row in range(self.depth)
+            ]
+        ).astype(np.int64)
+
+    def update(self, values, counts=None):
+        values, counts = aggregate(values, counts)
+        columns = self._columns(values)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+        self.total += int(counts.sum())
+        return self
+
+    def estimate(self, values) -> np.ndarray:
+        columns = self._columns(values)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch"):
+        if (self.width, self.depth, self.seed) != (
+            other.width,
+            other.depth,
+            other.seed,
+        ):
+            raise ValueError("Cannot merge Count-Min sketches of different shapes")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "seed": self.seed,
+            "total": self.total,
+            "table": encode_array(self.table),
+        }
+
+    @classmethod
+    def from_dict(cls, sketch: dict) -> "CountMinSketch":
+        count_min = cls(
+            width=sketch["width"], depth=sketch["depth"], seed=sketch["seed"]
+        )
+        count_min.total = sketch["total"]
+        count_min.table = decode_array(
+            sketch["table"], np.int64, (count_min.depth, count_min.width)
+        )
+        return count_min
+
+
+class SpaceSaving(object):
+    """
+    Space-Saving (Metwally et al.) summary of the `size` most frequent values.
+    Each count overestimates the true count by at most its `error` (itself at most
+    total / size), and every value more frequent than total / size is retained.
+    Merged as in Agarwal et al., "Mergeable Summaries".
+    """
+
+    def __init__(self, size: int = SPACE_SAVING_SIZE):
+        self.size = size
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+
+    @property
+    def minimum(self) -> int:
+        if len(self.counts) < self.size:
+            return 0
+        return min(self.counts.values())
+
+    def update(self, values, counts=None):
+        """
+        Adds values by merging the (exact) summary of their counts, truncated to `size`
+        """
+        values, counts = aggregate(values, counts)
+        retained = np.argsort(-counts, kind="stable")[: self.size]
+        summary = SpaceSaving(size=self.size)
+        summary.total = int(counts.sum())
+        summary.counts = dict(zip(values[retained], counts[retained].tolist()))
+        summary.errors = dict.fromkeys(summary.counts, 0)
+        return self.merge(summary)
+
+    def merge(self, other: "SpaceSaving"):
+        minimum, other_minimum = self.minimum, other.minimum
+        counts, errors = {}, {}
+        for value in itertools.chain(self.counts, other.counts):
+            if value in counts:
+                continue
+            counts[value] = self.counts.get(value, minimum) + other.counts.get(
+                value, other_minimum
+            )
+            errors[value] = self.errors.get(value, minimum) + other.errors.get(
+                value, other_minimum
+            )
+        size = max(self.size, other.size)
+        retained = sorted(counts, key=counts.get, reverse=True)[:size]
+        self.size = size
+        self.total += other.total
+        self.counts = {value: counts[value] for value in retained}
+        self.errors = {value: errors[value] for value in retained}
+        return self
+
+    def top(self, n: int = None) -> pd.DataFrame:
+        """
+        Returns the n most frequent values with their estimated count and maximum overestimate
+        """
+        top = pd.DataFrame(
+            {"count": pd.Series(self.counts), "error": pd.Series(self.errors)}
+        ).sort_values("count", ascending=False, kind="stable")
+        return top.iloc[:n] if n else top
+
+    def to_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "total": self.total,
+            "items": [
+                [value, count, self.errors[value]]
+                for value, count in self.counts.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, sketch: dict) -> "SpaceSaving":
+        space_saving = cls(size=sketch["size"])
+        space_saving.total = sketch["total"]
+        for value, count, error in sketch["items"]:
+            space_saving.counts[value] = count
+            space_saving.errors[value] = error
+        return space_saving
+
+
+class HyperLogLog(object):
+    """
+    HyperLogLog (Flajolet et al.) estimate of the number of distinct values,
+    with a relative standard error of 1.04 / sqrt(2 ** precision)
+    """
+
+    def __init__(self, precision: int = HYPERLOGLOG_PRECISION, seed: int = 0):
+        self.precision = precision
+        self.seed = seed
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return float(1.04 / np.sqrt(len(self.registers)))
+
+    def update(self, values):
+        hashes = hash_values(pd.unique(np.asarray(values, dtype=object)), self.seed)
+        remaining_bits = 64 - self.precision
+        indexes = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        remainders = hashes & np.uint64((1 << remaining_bits) - 1)
+        ranks = remaining_bits - bit_lengths(remainders) + 1
+        np.maximum.at(self.registers, indexes, ranks.astype(np.uint8))
+        return self
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m**2 / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            # small range correction (linear counting)
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+    def merge(self, other: "HyperLogLog"):
+        if (self.precision, self.seed) != (other.precision, other.seed):
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "precision": self.precision,
+            "seed": self.seed,
+            "registers": encode_array(self.registers),
+        }
+
+    @classmethod
+    def from_dict(cls, sketch: dict) -> "HyperLogLog":
+        hyperloglog = cls(precision=sketch["precision"], seed=sketch["seed"])
+        hyperloglog.registers = decode_array(
+            sketch["registers"], np.uint8, (2**hyperloglog.precision,)
+        )
+        return hyperloglog
+
+
+def bit_lengths(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `int.bit_length` of unsigned 64 bit integers
+    """
+    values = values.astype(np.uint64)
+    lengths = np.zeros(len(values), dtype=np.int64)
+    nonzero = values > 0
+    lengths[nonzero] = np.floor(np.log2(values[nonzero].astype(np.float64))) + 1
+    # correct float rounding near powers of two
+    too_long = nonzero & ((values >> np.maximum(lengths - 1, 0).astype(np.uint64)) == 0)
+    lengths[too_long] -= 1
+    too_short = (
+        nonzero
+        & ((values >> np.minimum(lengths, 63).astype(np.uint64)) > 0)
+        & (lengths < 64)
+    )
+    lengths[too_short] += 1
+    return lengths
+
+
+class AttributeSketch(object):
+    """
+    Approximate profile of a single (list) attribute: frequencies (Count-Min),
+    the most frequent values (Space-Saving) and the number of distinct values (HyperLogLog).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        count_min: CountMinSketch = None,
+        space_saving: SpaceSaving = None,
+        hyperloglog: HyperLogLog = None,
+        rows: int = 0,
+    ):
+        self.name = name
+        self.count_min = count_min or CountMinSketch()
+        self.space_saving = space_saving or SpaceSaving()
+        self.hyperloglog = hyperloglog or HyperLogLog()
+        self.rows = rows
+
+    @property
+    def total(self) -> int:
+        return self.count_min.total
+
+    def update(self, series: pd.Series):
+        """
+        Adds the values of a column (exploding lists)
+        """
+        values = series.to_numpy(dtype=object)
+        if len(values) and is_list_attribute(series.to_frame(), series.name):
+            values = np.array(
+                list(
+                    itertools.chain.from_iterable(
+                        v for v in values if isinstance(v, list)
+                    )
+                ),
+                dtype=object,
+            )
+        values = values[~pd.isna(values)] if len(values) else values
+        values, counts = aggregate(values)
+        self.count_min.update(values, counts)
+        self.space_saving.update(values, counts)
+        self.hyperloglog.update(values)
+        self.rows += len(series)
+        return self
+
+    def merge(self, other: "AttributeSketch"):
+        self.count_min.merge(other.count_min)
+        self.space_saving.merge(other.space_saving)
+        self.hyperloglog.merge(other.hyperloglog)
+        self.rows += other.rows
+        return self
+
+    def cardinality(self) -> int:
+        return int(round(self.hyperloglog.estimate()))
+
+    def value_counts(self, n: int = None) -> pd.Series:
+        """
+        Approximate `value_counts` of the n most frequent values (at most the Space-Saving size)
+        """
+        top = self.space_saving.top(n)
+        return pd.Series(
+            top["count"].to_numpy(),
+            index=pd.Index(top.index, name=self.name),
+            name="count",
+        )
+
+    def estimate_counts(self, values) -> pd.Series:
+        return pd.Series(
+            self.count_min.estimate(values),
+            index=pd.Index(values, name=self.name),
+            name="count",
+        )
+
+    def error_bounds(self, n: int = None) -> dict:
+        """
+        Bounds on the error of the estimates:
+        cardinality - relative standard error of the number of distinct values;
+        count - maximum overestimate of any Count-Min count (with probability `count_probability`);
+        top_count - maximum overestimate of the counts of the n most frequent values
+        """
+        top = self.space_saving.top(n)
+        return {
+            "cardinality": self.hyperloglog.relative_error,
+            "count": self.count_min.epsilon * self.total,
+            "count_probability": 1 - self.count_min.delta,
+            "top_count": int(top["error"].max()) if len(top) else 0,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "count_min": self.count_min.to_dict(),
+            "space_saving": self.space_saving.to_dict(),
+            "hyperloglog": self.hyperloglog.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, sketch: dict) -> "AttributeSketch":
+        return cls(
+            name=sketch["name"],
+            count_min=CountMinSketch.from_dict(sketch["count_min"]),
+            space_saving=SpaceSaving.from_dict(sketch["space_saving"]),
+            hyperloglog=HyperLogLog.from_dict(sketch["hyperloglog"]),
+            rows=sketch["rows"],
+        )
+
+
+def get_attribute_sketch(dataframe: pd.DataFrame, attribute: str) -> AttributeSketch:
+    """
+    Returns the sketch of an attribute of a DataFrame, building it on first use
+    (cached for the lifetime of the DataFrame's encoded view)
+    """
+    view = get_encoded_view(dataframe)
+    sketches = _DATAFRAME_SKETCHES.setdefault(view, {})
+    if attribute not in sketches:
+        sketches[attribute] = AttributeSketch(attribute).update(dataframe[attribute])
+    return sketches[attribute]
+
+
+def get_sketch(
+    dataframe: pd.DataFrame, attribute: str, sketches: dict = None
+) -> AttributeSketch:
+    """
+    Returns the sketch of an attribute from sketches (e.g. loaded and merged per congress)
+    if given, otherwise of the DataFrame
+    """
+    if sketches and attribute in sketches:
+        return sketches[attribute]
+    return get_attribute_sketch(dataframe, attribute)
+
+
+def sketch_dataframe(
+    dataframe: pd.DataFrame, attributes: list, group_by: str = "congress"
+) -> dict:
+    """
+    Returns {group: {attribute: AttributeSketch}} for each value of group_by
+    (or {None: ...} if group_by is None)
+    """
+    groups = dataframe.groupby(group_by, sort=True) if group_by else [(None, dataframe)]
+    return {
+        group: {
+            attribute: AttributeSketch(attribute).update(group_dataframe[attribute])
+            for attribute in attributes
+        }
+        for group, group_dataframe in groups
+    }
+
+
+def sketch_dataset(
+    dataset_location: Path,
+    attributes: list,
+    group_by: str = "congress",
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """
+    Streams a dataset in chunks into {group: {attribute: AttributeSketch}}
+    """
+    columns = sorted(set(attributes) | ({group_by} if group_by else set()))
+    sketches = {}
+    for chunk in iter_chunks(dataset_location, columns, chunk_size=chunk_size):
+        for group, attribute_sketches in sketch_dataframe(
+            chunk, attributes, group_by=group_by
+        ).items():
+            if group in sketches:
+                for attribute, sketch in attribute_sketches.items():
+                    sketches[group][attribute].merge(sketch)
+            else:
+                sketches[group] = attribute_sketches
+    return sketches
+
+
+def merge_sketches(sketches: list) -> dict:
+    """
+    Merges {attribute: AttributeSketch} dicts (e.g. of several congresses) into one
+    """
+    merged = {}
+    for attribute_sketches in sketches:
+        for attribute, sketch in attribute_sketches.items():
+            if attribute in merged:
+                merged[attribute].merge(sketch)
+            else:
+                merged[attribute] = AttributeSketch.from_dict(sketch.to_dict())
+    return merged
+
+
+def save_sketches(sketches: dict, output_path: Path):
+    Path(output_path).write_text(
+        json.dumps(
+            {attribute: sketch.to_dict() for attribute, sketch in sketches.items()},
+            default=int,
+        )
+    )
+
+
+def load_sketches(sketch_path: Path) -> dict:
+    return {
+        attribute: AttributeSketch.from_dict(sketch)
+        for attribute, sketch in json.loads(Path(sketch_path).read_text()).items()
+    }
@@ -1,45 +1,49 @@
 import numpy as np
 import pandas as pd
 
-from typing import Union
 from itertools import combinations
 
-import scipy.stats as stats
-
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-
-def get_dataframe_copy(dataframe: pd.DataFrame, attributes: Union[str, list]):
-    """
-    Returns a deep copy of an input DataFrame such that the original dataframe is preserved and untouched.
-    Modifications are to be applied to returned deep copy.
-    """
-    if isinstance(attributes, str):
-        if isinstance(dataframe.iloc[0][attributes], list):
-            dataframe_copy = dataframe.explode(attributes, ignore_index=True)
-            return dataframe_copy
-        else:
-            dataframe_copy = dataframe.copy(deep=True)
-            return dataframe_copy
-
-    else:
-        for attribute in attributes:
-            dataframe_copy = get_dataframe_copy(dataframe, attribute)
-            dataframe = dataframe_copy
-
-    return dataframe_copy
+from .association import association_matrix, calculate_pair_statistics
+from .encoding import get_encoded_view
+from .plotting import show_or_save
+from .sketches import get_sketch
 
 
 def calculate_cardinality(
     dataframe: pd.DataFrame,
     attributes: list = ["billType", "legislativeSubjects", "policyArea"],
+    approximate: bool = False,
+    sketches: dict = None,
 ):
     """
     Takes in dataframe and returns cardinality (number of unique values for each column)
+    List attributes (e.g. legislativeSubjects) are counted by their individual values
+    If approximate, cardinalities of attributes are estimated (HyperLogLog) from sketches
     """
-    dataframe_copy = get_dataframe_copy(dataframe, attributes)
-    cardinality = dataframe_copy.nunique()
+    if approximate:
+        attribute_sketches = {
+            attribute: get_sketch(dataframe, attribute, sketches)
+            for attribute in attributes
+        }
+        relative_errors = {
+            attribute: round(sketch.error_bounds()["cardinality"], 4)
+            for attribute, sketch in attribute_sketches.items()
+        }
+        print(f"Approximate cardinality, relative standard error: {relative_errors}")
+        return pd.Series(
+            {
+                attribute: sketch.cardinality()
+                for attribute, sketch in attribute_sketches.items()
+            }
+        )
+
+    view = get_encoded_view(dataframe)
+    cardinality = pd.Series(
+        {column: view.attribute(column).cardinality() for column in dataframe.columns}
+    )
     return cardinality
 
 
@@ -49,12 +53,10 @@ def calculate_class_ratio(dataframe: pd.DataFrame, attribute: str, n: int = 3):
     Returns class ratios (proportion of each value), most and least dominant values
 
     """
-    dataframe_copy = dataframe.copy(deep=True)
-    if isinstance(dataframe.iloc[0][attribute], list):
-        dataframe_copy = dataframe_copy.explode(attribute, ignore_index=True)
-
     # class ratio (proportion of each value)
-    class_ratio = dataframe_copy[attribute].value_counts(normalize=True)
+    class_ratio = (
+        get_encoded_view(dataframe).attribute(attribute).value_counts(normalize=True)
+    )
 
     print(f"Most dominant values in {attribute}:\n{class_ratio[:n]}\n")
     print(f"Least dominant values in {attribute}:\n{class_ratio[-n:]}")
@@ -81,32 +83,38 @@ def analyze_bias_crosstab(
     n: int = None,
     normalize: bool = True,
     figsize: tuple = (10, 10),
+    output_path: str = None,
 ):
-    dataframe_copy = get_dataframe_copy(dataframe, attributes)
-
     attr1, attr2 = attributes
 
-    if n:
-        top_attr1 = dataframe_copy[attr1].value_counts()[:n].index
-        top_attr2 = dataframe_copy[attr2].value_counts()[:n].index
-        dataframe_copy = dataframe_copy[
-            dataframe_copy[attr1].isin(top_attr1)
-            & dataframe_copy[attr2].isin(top_attr2)
-        ]
-
-    frequency_matrix = pd.crosstab(
-        dataframe_copy[attr1], dataframe_copy[attr2], normalize=True
-    )
+    frequency_matrix = get_encoded_view(dataframe).crosstab(attr1, attr2, n1=n, n2=n)
+    frequency_matrix = frequency_matrix / frequency_matrix.sum().sum()
     if normalize:
         frequency_matrix = frequency_matrix.div(frequency_matrix.sum(axis=1), axis=0)
 
+    draw_bias_crosstab(
+        frequency_matrix, attributes, figsize=figsize, output_path=output_path
+    )
+
+
+def draw_bias_crosstab(
+    frequency_matrix: pd.DataFrame,
+    attributes: list,
+    figsize: tuple = (10, 10),
+    output_path: str = None,
+):
+    """
+    Plots a (normalized) cross tabulation between two attributes
+    """
+    attr1, attr2 = attributes
+
     # Plot heatmap
     plt.figure(figsize=figsize)
     sns.heatmap(frequency_matrix, cmap="viridis", annot=True)
     plt.title(f"{attr1} vs. {attr2} Co-occurence Heatmap")
     plt.xlabel(f"{attr2}")
     plt.ylabel(f"{attr1}")
-    plt.show()
+    show_or_save(output_path)
 
 
 def calculate_gini_index(dataframe: pd.DataFrame, attribute: str):
@@ -115,22 +123,29 @@ def calculate_gini_index(dataframe: pd.DataFrame, attribute: str):
     0 -> pure distribution (only one category)
     1 -> high impurity (randomly distributed across various classes)
     """
-    dataframe_copy = get_dataframe_copy(dataframe, attribute)
-
-    class_ratios = dataframe_copy[attribute].value_counts(normalize=True)
+    counts = get_encoded_view(dataframe).attribute(attribute).counts
+    class_ratios = counts[counts > 0] / counts.sum()
 
-    gini_index = 1 - sum(class_ratios**2)
+    gini_index = 1 - np.sum(class_ratios**2)
 
     return round(gini_index, 4)
 
 
-def plot_gini_indexes(dataframe: pd.DataFrame, attributes: list):
+def plot_gini_indexes(
+    dataframe: pd.DataFrame, attributes: list, output_path: str = None
+):
     """
     Plot bar chart of gini indexes for all attributes given
     """
 
     gini_indexes = {attr: calculate_gini_index(dataframe, attr) for attr in attributes}
+    draw_gini_indexes(gini_indexes, output_path=output_path)
 
+
+def draw_gini_indexes(gini_indexes: dict, output_path: str = None):
+    """
+    Plot bar chart of gini indexes (keyed by attribute)
+    """
     gini_df = pd.DataFrame(
         list(gini_indexes.items()), columns=["Attribute", "Gini Index"]
     )
@@ -144,7 +159,7 @@ def plot_gini_indexes(dataframe: pd.DataFrame, attributes: list):
     plt.title("Gini Index for Categorical Attributes")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    show_or_save(output_path)
 
 
 def calculate_entropy(dataframe: pd.DataFrame, attribute: str):
@@ -153,20 +168,25 @@ def calculate_entropy(dataframe: pd.DataFrame, attribute: str):
     Higher entropy -> more diverse distribution
     Lower entropy -> more dominated by a single category
     """
-    dataframe_copy = get_dataframe_copy(dataframe, attribute)
+    counts = get_encoded_view(dataframe).attribute(attribute).counts
+    value_counts = counts[counts > 0] / counts.sum()
 
-    value_counts = dataframe_copy[attribute].value_counts(normalize=True)
-
-    entropy = -sum(value_counts * np.log2(value_counts))
+    entropy = -np.sum(value_counts * np.log2(value_counts))
     return round(entropy, 4)
 
 
-def plot_entropies(dataframe: pd.DataFrame, attributes: list):
+def plot_entropies(dataframe: pd.DataFrame, attributes: list, output_path: str = None):
     """
     Returns bar chart to display (Shannon) entropies for all attributes givens
     """
     entropies = {attr: calculate_entropy(dataframe, attr) for attr in attributes}
+    draw_entropies(entropies, output_path=output_path)
+
 
+def draw_entropies(entropies: dict, output_path: str = None):
+    """
+    Plot bar chart of (Shannon) entropies (keyed by attribute)
+    """
     entropy_df = pd.DataFrame(list(entropies.items()), columns=["Attribute", "Entropy"])
 
     # Plot
@@ -178,7 +198,7 @@ def plot_entropies(dataframe: pd.DataFrame, attributes: list):
     plt.ylabel("Entropy")
     plt.title("Shannon Entropy for Categorical Attributes")
     plt.xticks(rotation=45)
-    plt.show()
+    show_or_save(output_path)
 
 
 def chi_squared_test(dataframe: pd.DataFrame, attributes: list):
@@ -187,17 +207,12 @@ def chi_squared_test(dataframe: pd.DataFrame, attributes: list):
     If chi-squares stat is high and p-value 0: reject null H0 (meaning attributes are strongely dependent)
     Large DoF suggest test is applied to complex dataset with many categories
     """
-    dataframe_copy = get_dataframe_copy(dataframe, attributes)
-
-    attr1, attr2 = attributes
-    contingency_table = pd.crosstab(dataframe_copy[attr1], dataframe_copy[attr2])
-
-    chi2_stat, p_value, dof, expected = stats.chi2_contingency(contingency_table)
+    statistics = calculate_pair_statistics(dataframe, attributes)
 
     return {
-        "Chi2 Statistic": round(chi2_stat, 4),
-        "P-value": round(p_value, 4),
-        "Degrees of Freedom": round(dof, 4),
+        "Chi2 Statistic": round(statistics["chi2"], 4),
+        "P-value": round(statistics["p_value"], 4),
+        "Degrees of Freedom": round(statistics["dof"], 4),
         # "Expected Frequencies": expected,
     }
 
@@ -231,20 +246,8 @@ def calculate_cramers_v(
     0.51 - 0.99 -> Strong association
     1.00 -> Perfect association
     """
-    dataframe_copy = dataframe.copy(deep=True)
-    for attribute in attributes:
-        if isinstance(dataframe.iloc[0][attribute], list):
-            dataframe_copy = dataframe_copy.explode(attribute, ignore_index=True)
-
     attr1, attr2 = attributes
-    contingency_table = pd.crosstab(dataframe_copy[attr1], dataframe_copy[attr2])
-
-    chi2_stat, _, _, _ = stats.chi2_contingency(contingency_table)
-
-    N = contingency_table.sum().sum()
-    k = min(contingency_table.shape)
-
-    cramers_v = np.sqrt(chi2_stat / (N * (k - 1))) if k > 1 else 0
+    cramers_v = calculate_pair_statistics(dataframe, attributes)["cramers_v"]
     association = find_association(cramers_v)
 
     if print_statement:
@@ -256,27 +259,35 @@ def calculate_cramers_v(
     return cramers_v, association
 
 
-def plot_cramers_v_heatmap(dataframe, attributes):
+def plot_cramers_v_heatmap(
+    dataframe, attributes, n_jobs: int = 1, output_path: str = None
+):
     """
     Returns heat map to display Cramer's V and relationship strength between all attributes
+    With n_jobs > 1 the attribute pairs are computed in parallel processes
     """
-    cramers_v_matrix = pd.DataFrame(index=attributes, columns=attributes)
+    cramers_v_matrix = association_matrix(dataframe, attributes, n_jobs=n_jobs)[
+        "cramers_v"
+    ]
+    draw_cramers_v_heatmap(cramers_v_matrix, output_path=output_path)
+
+
+def draw_cramers_v_heatmap(cramers_v_matrix: pd.DataFrame, output_path: str = None):
+    """
+    Plots a (attributes x attributes) matrix of Cramer's V with association labels
+    """
+    attributes = list(cramers_v_matrix.index)
     label_matrix = pd.DataFrame(index=attributes, columns=attributes, dtype=str)
 
     for attr1, attr2 in combinations(attributes, 2):
-        cramers_v, association = calculate_cramers_v(
-            dataframe, [attr1, attr2], print_statement=False
-        )
-        cramers_v_matrix.loc[attr1, attr2] = cramers_v
-        cramers_v_matrix.loc[attr2, attr1] = cramers_v  # Mirror the matrix
+        cramers_v = cramers_v_matrix.loc[attr1, attr2]
+        association = find_association(cramers_v)
 
         label_text = f"{cramers_v:.2f}\n({association})"
         label_matrix.loc[attr1, attr2] = label_text
         label_matrix.loc[attr2, attr1] = label_text
 
-    np.fill_diagonal(cramers_v_matrix.values, 1.0)
     np.fill_diagonal(label_matrix.values, "1.00\n(Perfect)")
-    cramers_v_matrix = cramers_v_matrix.astype(float)
 
     # Plot heatmap
     plt.figure(figsize=(10, 8))
@@ -290,4 +301,4 @@ def plot_cramers_v_heatmap(dataframe, attributes):
         linewidths=0.5,
     )
     plt.title("Cramér's V Heatmap with Association Labels")
-    plt.show()
+    show_or_save(output_path)
@@ -0,0 +1,452 @@
+import json
+import logging
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+from .association import chi_squared_statistics, cramers_v_statistic
+from .cooccurrence import incidence_matrix
+from .encoding import get_encoded_view, is_list_attribute
+from .schema import COLUMN_DTYPES, read_csv_with_schema
+
+logger = logging.getLogger(__name__)
+
+STREAMING_ATTRIBUTES = [
+    "congress",
+    "billType",
+    "billNumber",
+    "legislativeSubjects",
+    "policyArea",
+]
+CHUNK_SIZE = 10_000
+# congress is profiled as str, as in the profiles and sketches written before (e.g. to merge with them)
+PROFILING_DTYPES = {**COLUMN_DTYPES, "congress": str}
+
+
+def iter_chunks(dataset_location: Path, columns: list, chunk_size: int = CHUNK_SIZE):
+    """
+    Yields DataFrames of chunk_size rows of the given columns from a compiled
+    dataset (CSV, optionally compressed, or Parquet), without reading the rest
+    of the columns (e.g. billText) or the whole file into memory
+    """
+    dataset_location = Path(dataset_location)
+    if dataset_location.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        import pyarrow.types as pa_types
+
+        parquet_file = pq.ParquetFile(dataset_location)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield pd.DataFrame(
+                {
+                    field.name: (
+                        batch.column(i).to_pylist()
+                        if pa_types.is_list(field.type)
+                        or pa_types.is_large_list(field.type)
+                        else batch.column(i).to_pandas()
+                    )
+                    for i, field in enumerate(batch.schema)
+                }
+            )
+    else:
+        yield from read_csv_with_schema(
+            dataset_location,
+            columns=columns,
+            dtypes=PROFILING_DTYPES,
+            chunksize=chunk_size,
+        )
+
+
+def counter_to_list(counter: Counter) -> list:
+    return [[key, count] for key, count in counter.items()]
+
+
+def counter_from_list(items: list) -> Counter:
+    return Counter({(tuple(k) if isinstance(k, list) else k): v for k, v in items})
+
+
+class ProfileAccumulator(object):
+    """
+    Mergeable accumulator of the counts needed for profiling statistics:
+    value counts and list lengths of each attribute, co-occurrences of list attributes,
+    crosstabs between pairs of attributes and value counts per group (e.g. per congress).
+
+    Chunks are added with `update`, accumulators (e.g. from other processes or files)
+    combined with `merge`, and serialized with `to_dict`/`from_dict`.
+    Values are kept in order of first appearance such that ties are ranked as pandas would.
+    """
+
+    def __init__(
+        self,
+        attributes: list = STREAMING_ATTRIBUTES,
+        crosstabs: list = None,
+        group_by: str = "congress",
+    ):
+        self.attributes = list(attributes)
+        self.crosstabs = [tuple(pair) for pair in (crosstabs or [])]
+        self.group_by = group_by
+        self.rows = 0
+        self.list_attributes = set()
+        self.value_counts = {attribute: Counter() for attribute in self.attributes}
+        self.row_lengths = {attribute: Counter() for attribute in self.attributes}
+        self.cooccurrences = {attribute: Counter() for attribute in self.attributes}
+        self.crosstab_counts = {pair: Counter() for pair in self.crosstabs}
+        # counts of each attribute of a crosstab when exploded on both attributes
+        self.crosstab_margins = {
+            pair: (Counter(), Counter()) for pair in self.crosstabs
+        }
+        self.group_value_counts = {}
+
+    @property
+    def columns(self) -> list:
+        columns = set(self.attributes)
+        columns.update(attribute for pair in self.crosstabs for attribute in pair)
+        if self.group_by:
+            columns.add(self.group_by)
+        return sorted(columns)
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Adds the counts of a chunk of the dataset
+        """
+        if chunk.empty:
+            return self
+        view = get_encoded_view(chunk)
+        self.rows += len(chunk)
+
+        for attribute in self.attributes:
+            encoded = view.attribute(attribute)
+            if is_list_attribute(chunk, attribute):
+                self.list_attributes.add(attribute)
+                self.row_lengths[attribute].update(
+                    dict(zip(*np.unique(encoded.row_lengths, return_counts=True)))
+                )
+                self._update_cooccurrences(attribute, encoded)
+            self.value_counts[attribute].update(chunk_counts(encoded))
+
+        for attr1, attr2 in self.crosstabs:
+            encoded1 = view.attribute(attr1)
+            encoded2 = view.attribute(attr2)
+            contingency = view.contingency_matrix(attr1, attr2).tocoo()
+            margins = self.crosstab_margins[(attr1, attr2)]
+            margins[0].update(
+                chunk_counts(encoded1, view.exploded_counts(attr1, attr2))
+            )
+            margins[1].update(
+                chunk_counts(encoded2, view.exploded_counts(attr2, attr1))
+            )
+            self.crosstab_counts[(attr1, attr2)].update(
+                dict(
+                    zip(
+                        zip(
+                            encoded1.categories[contingency.row],
+                            encoded2.categories[contingency.col],
+                        ),
+                        contingency.data.tolist(),
+                    )
+                )
+            )
+
+        if self.group_by:
+            for group, group_chunk in chunk.groupby(self.group_by, sort=False):
+                group_counts = self.group_value_counts.setdefault(
+                    group, {attribute: Counter() for attribute in self.attributes}
+                )
+                group_view = get_encoded_view(group_chunk)
+                for attribute in self.attributes:
+                    group_counts[attribute].update(
+                        chunk_counts(group_view.attribute(attribute))
+                    )
+        return self
+
+    def _update_cooccurrences(self, attribute: str, encoded):
+        incidence = incidence_matrix(encoded)
+        pairs = sparse.triu(incidence.T @ incidence, k=1).tocoo()
+        self.cooccurrences[attribute].update(
+            dict(
+                zip(
+                    zip(encoded.categories[pairs.row], encoded.categories[pairs.col]),
+                    pairs.data.tolist(),
+                )
+            )
+        )
+
+    def merge(self, other: "ProfileAccumulator"):
+        """
+        Adds the counts of another accumulator (of the same attributes)
+        """
+        self.rows += other.rows
+        self.list_attributes.update(other.list_attributes)
+        for attribute in self.attributes:
+            self.value_counts[attribute].update(other.value_counts[attribute])
+            self.row_lengths[attribute].update(other.row_lengths[attribute])
+            self.cooccurrences[attribute].update(other.cooccurrences[attribute])
+        for pair in self.crosstabs:
+            self.crosstab_counts[pair].update(other.crosstab_counts[pair])
+            for margin, other_margin in zip(
+                self.crosstab_margins[pair], other.crosstab_margins[pair]
+            ):
+                margin.update(other_margin)
+        for group, counts in other.group_value_counts.items():
+            group_counts = self.group_value_counts.setdefault(
+                group, {attribute: Counter() for attribute in self.attributes}
+            )
+            for attribute in self.attributes:
+                group_counts[attribute].update(counts[attribute])
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "attributes": self.attributes,
+            "crosstabs": [list(pair) for pair in self.crosstabs],
+            "group_by": self.group_by,
+            "rows": self.rows,
+            "list_attributes": sorted(self.list_attributes),
+            "value_counts": {
+                a: counter_to_list(c) for a, c in self.value_counts.items()
+            },
+            "row_lengths": {a: counter_to_list(c) for a, c in self.row_lengths.items()},
+            "cooccurrences": {
+                a: counter_to_list(c) for a, c in self.cooccurrences.items()
+            },
+            "crosstab_counts": [
+                [
+                    list(pair),
+                    counter_to_list(c),
+                    [counter_to_list(m) for m in self.crosstab_margins[pair]],
+                ]
+                for pair, c in self.crosstab_counts.items()
+            ],
+            "group_value_counts": [
+                [group, {a: counter_to_list(c) for a, c in counts.items()}]
+                for group, counts in self.group_value_counts.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, profile: dict) -> "ProfileAccumulator":
+        accumulator = cls(
+            attributes=profile["attributes"],
+            crosstabs=profile["crosstabs"],
+            group_by=profile["group_by"],
+        )
+        accumulator.rows = profile["rows"]
+        accumulator.list_attributes = set(profile["list_attributes"])
+        for attribute in accumulator.attributes:
+            accumulator.value_counts[attribute] = counter_from_list(
+                profile["value_counts"][attribute]
+            )
+            accumulator.row_lengths[attribute] = counter_from_list(
+                profile["row_lengths"][attribute]
+            )
+            accumulator.cooccurrences[attribute] = counter_from_list(
+                profile["cooccurrences"][attribute]
+            )
+        for pair, items, margins in profile["crosstab_counts"]:
+            accumulator.crosstab_counts[tuple(pair)] = counter_from_list(items)
+            accumulator.crosstab_margins[tuple(pair)] = tuple(
+                counter_from_list(m) for m in margins
+            )
+        for group, counts in profile["group_value_counts"]:
+            accumulator.group_value_counts[group] = {
+                a: counter_from_list(items) for a, items in counts.items()
+            }
+        return accumulator
+
+    def save(self, output_path: Path):
+        Path(output_path).write_text(json.dumps(self.to_dict(), default=int))
+
+    @classmethod
+    def load(cls, profile_path: Path) -> "ProfileAccumulator":
+        return cls.from_dict(json.loads(Path(profile_path).read_text()))
+
+    # Statistics, as calculated by `general` and `statistical` on the full DataFrame
+
+    def get_value_counts(
+        self, attribute: str, normalize: bool = False, group: str = None
+    ) -> pd.Series:
+        counter = (
+            self.value_counts[attribute]
+            if group is None
+            else self.group_value_counts[group][attribute]
+        )
+        value_counts = pd.Series(
+            list(counter.values()),
+            index=pd.Index(list(counter.keys()), name=attribute),
+            dtype=np.int64,
+            name="count",
+        ).sort_values(ascending=False)
+        if normalize:
+            value_counts = (value_counts / value_counts.sum()).rename("proportion")
+        return value_counts
+
+    def calculate_cardinality(self) -> pd.Series:
+        return pd.Series(
+            {
+                attribute: len(self.value_counts[attribute])
+                for attribute in self.attributes
+            }
+        )
+
+    def calculate_class_ratio(self, attribute: str, group: str = None) -> pd.Series:
+        return self.get_value_counts(attribute, normalize=True, group=group)
+
+    def calculate_gini_index(self, attribute: str, group: str = None) -> float:
+        class_ratios = self.calculate_class_ratio(attribute, group=group).to_numpy()
+        return round(1 - np.sum(class_ratios**2), 4)
+
+    def calculate_entropy(self, attribute: str, group: str = None) -> float:
+        class_ratios = self.calculate_class_ratio(attribute, group=group).to_numpy()
+        return round(-np.sum(class_ratios * np.log2(class_ratios)), 4)
+
+    def calculate_count_distribution(self, attribute: str) -> pd.Series:
+        value_counts = self.get_value_counts(attribute)
+        return pd.Series(
+            {
+                "count": value_counts.sum(),
+                "unique": len(value_counts),
+                "top": value_counts.index[0] if len(value_counts) else np.nan,
+                "freq": value_counts.iloc[0] if len(value_counts) else np.nan,
+            },
+            name=attribute,
+            dtype=object,
+        )
+
+    def calculate_frequency_distribution(self, attribute: str) -> pd.Series:
+        return self.get_value_counts(attribute).describe()
+
+    def get_row_lengths(self, attribute: str) -> pd.Series:
+        counter = self.row_lengths[attribute]
+        return pd.Series(
+            list(counter.values()),
+            index=pd.Index(list(counter.keys()), name=f"frequency_{attribute}"),
+            name="count",
+        ).sort_values(ascending=False)
+
+    def top_cooccurring_pairs(self, attribute: str, n: int = 30) -> pd.DataFrame:
+        pairs = self.cooccurrences[attribute].most_common(n)
+        return pd.DataFrame(
+            [(value1, value2, count) for (value1, value2), count in pairs],
+            columns=[f"{attribute}_1", f"{attribute}_2", "count"],
+        )
+
+    def crosstab(self, attributes: list, n1: int = None, n2: int = None):
+        """
+        Equivalent of `EncodedDataFrame.crosstab` from the accumulated counts
+        """
+        attr1, attr2 = attributes
+        counter = self.crosstab_counts[(attr1, attr2)]
+        margin1, margin2 = self.crosstab_margins[(attr1, attr2)]
+        counts = pd.Series(
+            list(counter.values()),
+            index=pd.MultiIndex.from_tuples(list(counter.keys()), names=[attr1, attr2]),
+            dtype=np.int64,
+        )
+        table = counts.unstack(fill_value=0).sort_index().sort_index(axis=1)
+        if n1:
+            table = table.loc[table.index.isin(top_values(margin1, n1))]
+        if n2:
+            table = table.loc[:, table.columns.isin(top_values(margin2, n2))]
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        return table
+
+    def chi_squared_test(self, attributes: list) -> dict:
+        chi2, p_value, dof = chi_squared_statistics(self.crosstab(attributes).values)
+        return {
+            "Chi2 Statistic": round(chi2, 4),
+            "P-value": round(p_value, 4),
+            "Degrees of Freedom": round(dof, 4),
+        }
+
+    def calculate_cramers_v(self, attributes: list) -> float:
+        table = self.crosstab(attributes).values
+        chi2, _, _ = chi_squared_statistics(table)
+        return cramers_v_statistic(chi2, table.sum(), table.shape)
+
+
+def chunk_counts(encoded, counts: np.ndarray = None) -> dict:
+    """
+    Returns the counts (by default `encoded.counts`) of the observed values of an
+    encoded attribute, in order of first appearance
+    """
+    if counts is None:
+        counts = encoded.counts
+    observed = np.flatnonzero(counts > 0)
+    observed = observed[np.argsort(encoded.first_positions[observed], kind="stable")]
+    return dict(zip(encoded.categories[observed], counts[observed].tolist()))
+
+
+def top_values(counter: Counter, n: int) -> list:
+    """
+    Returns the n most common values of a counter, with ties ranked as in pandas `value_counts`
+    """
+    counts = pd.Series(list(counter.values()), dtype=np.int64)
+    order = counts.sort_values(ascending=False).index[:n]
+    values = list(counter.keys())
+    return [values[i] for i in order]
+
+
+def profile_dataset(
+    dataset_location: Path,
+    attributes: list = STREAMING_ATTRIBUTES,
+    crosstabs: list = None,
+    group_by: str = "congress",
+    chunk_size: int = CHUNK_SIZE,
+) -> ProfileAccumulator:
+    """
+    Streams a dataset in chunks into a ProfileAccumulator
+    """
+    accumulator = ProfileAccumulator(
+        attributes=attributes, crosstabs=crosstabs, group_by=group_by
+    )
+    for i, chunk in enumerate(
+        iter_chunks(dataset_location, accumulator.columns, chunk_size=chunk_size)
+    ):
+        accumulator.update(chunk)
+        logger.debug(f"Profiled chunk {i} of {dataset_location}: {accumulator.rows=}")
+    logger.info(f"Profiled {dataset_location}: {accumulator.rows} rows")
+    return accumulator
+
+
+def _profile_dataset_to_dict(*args, **kwargs) -> dict:
+    return profile_dataset(*args, **kwargs).to_dict()
+
+
+def profile_datasets(
+    dataset_locations: list,
+    attributes: list = STREAMING_ATTRIBUTES,
+    crosstabs: list = None,
+    group_by: str = "congress",
+    chunk_size: int = CHUNK_SIZE,
+    n_jobs: int = 1,
+) -> ProfileAccumulator:
+    """
+    Profiles one or more datasets (e.g. shards or per-congress files) into a single
+    ProfileAccumulator, streaming each in chunks and, with n_jobs > 1, profiling
+    the datasets in parallel processes before merging their accumulators
+    """
+    kwargs = dict(
+        attributes=attributes,
+        crosstabs=crosstabs,
+        group_by=group_by,
+        chunk_size=chunk_size,
+    )
+    accumulator = ProfileAccumulator(
+        attributes=attributes, crosstabs=crosstabs, group_by=group_by
+    )
+    if n_jobs > 1 and len(dataset_locations) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(_profile_dataset_to_dict, location, **kwargs)
+                for location in dataset_locations
+            ]
+            for future in futures:
+                accumulator.merge(ProfileAccumulator.from_dict(future.result()))
+    else:
+        for location in dataset_locations:
+            accumulator.merge(profile_dataset(location, **kwargs))
+    return accumulator
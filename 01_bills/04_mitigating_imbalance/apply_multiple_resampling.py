@@ -2,10 +2,13 @@ import typer
 import logging
 import functools
 
-from config import ARGUMENTS
+from config import ARGUMENTS, RESAMPLING_TYPES
+from typing import List
 from typing_extensions import Annotated
 from pathlib import Path
-from utils.resampler import Resampler
+from utils.list_codec import read_csv_with_lists, write_csv_with_lists
+from utils.hashing import dataset_hash
+from utils.pipeline import ResamplingCache, ResamplingPipeline
 
 import pandas as pd
 
@@ -21,21 +24,17 @@ def apply_sampling(
     output_directory: Annotated[
         Path, typer.Option(help="Location to store the resampling dataset.")
     ] = Path("../../local_data/01_bills/generated_data/resampled_data"),
-    resampling_type1: Annotated[
-        str,
+    resampling_types: Annotated[
+        List[str],
         typer.Option(
-            help="First resampling technique to be applied to original dataset (random_undersampling, random_oversampling, knn_undersampling, near_miss_undersampling)"
+            help="Resampling techniques to be applied in order to original dataset (random_undersampling, random_oversampling, knn_undersampling, near_miss_undersampling, ml_random_undersampling, ml_random_oversampling, label_random_undersampling, label_random_oversampling). Defaults to RESAMPLING_TYPES of arguments in config.py"
         ),
-    ] = "random_undersampling",
-    resampling_type2: Annotated[
+    ] = None,
+    arguments: Annotated[
         str,
         typer.Option(
-            help="Second resampling technique to be applied to original dataset (random_undersampling, random_oversampling, knn_undersampling, near_miss_undersampling)"
+            help="Key to access correct ARGUMENTS in config.py (a list of arguments, one per resampling technique)"
         ),
-    ] = "random_oversampling",
-    arguments: Annotated[
-        str,
-        typer.Option(help="Key to access correct ARGUMENTS in config.py"),
     ] = "rus_ros",
     attribute_to_balance: Annotated[
         str,
@@ -47,6 +46,18 @@ def apply_sampling(
             help="Random state used when applying resampling techniques for repeatability"
         ),
     ] = 42,
+    cache_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location of the cache of intermediate resampled indices (keyed by dataset hash and steps), not cached if not given"
+        ),
+    ] = None,
+    cache_size: Annotated[
+        int,
+        typer.Option(
+            help="Maximum size of the cache in MB, least recently used entries are evicted"
+        ),
+    ] = 1024,
     log_level: Annotated[
         str,
         typer.Option(
@@ -55,7 +66,7 @@ def apply_sampling(
     ] = "INFO",
 ):
     """
-    Takes dataset and applies relevant resampling technique and arguments given in config.py
+    Takes dataset and applies relevant resampling techniques, in order, and arguments given in config.py
     Saves dataframe to output_directory under file name {attribute_to_balance}_{arguments}.csv.gz
     """
 
@@ -68,20 +79,32 @@ def apply_sampling(
         format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
     )
 
-    dataset = pd.read_csv(
-        source_df_path, compression="gzip", converters={"legislativeSubjects": pd.eval}
-    )
-    for i, resampling_type in enumerate([resampling_type1, resampling_type2]):
-        resampler = Resampler(dataset=dataset, random_state=random_state)
-        resampling_method = getattr(resampler, resampling_type)
-        resampled_data = resampling_method(
-            attribute_to_balance=attribute_to_balance, **ARGUMENTS.get(arguments)[i]
+    resampling_types = resampling_types or RESAMPLING_TYPES.get(arguments)
+    step_arguments = ARGUMENTS.get(arguments)
+    if not isinstance(resampling_types, list) or len(resampling_types) != len(
+        step_arguments
+    ):
+        raise typer.BadParameter(
+            f"{arguments} requires one resampling type per step: {step_arguments}"
         )
-        dataset = resampled_data
+
+    dataset = read_csv_with_lists(source_df_path, compression="gzip")
+    cache, dataset_key = None, None
+    if cache_location:
+        cache = ResamplingCache(cache_location, max_size=cache_size * 2**20)
+        dataset_key = dataset_hash(source_df_path, cache_location)
+
+    pipeline = ResamplingPipeline(
+        steps=list(zip(resampling_types, step_arguments)),
+        attribute_to_balance=attribute_to_balance,
+        random_state=random_state,
+        cache=cache,
+    )
+    resampled_data = pipeline.run(dataset, dataset_key=dataset_key)
 
     output_path = output_directory / f"{attribute_to_balance}_{arguments}.csv.gz"
     print(f"Saving to: {output_path=} ...")
-    resampled_data.to_csv(output_path, compression="gzip", index=False)
+    write_csv_with_lists(resampled_data, output_path, compression="gzip", index=False)
 
 
 if __name__ == "__main__":
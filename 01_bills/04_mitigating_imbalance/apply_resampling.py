@@ -1,10 +1,12 @@
 import typer
+import inspect
 import logging
 import functools
 
 from config import ARGUMENTS
 from typing_extensions import Annotated
 from pathlib import Path
+from utils.list_codec import read_csv_with_lists, write_csv_with_lists
 from utils.resampler import Resampler
 
 import pandas as pd
@@ -24,7 +26,7 @@ def apply_sampling(
     resampling_type: Annotated[
         str,
         typer.Option(
-            help="Type of resampling technique to be applied to original dataset (random_undersampling, random_oversampling, knn_undersampling, near_miss_undersampling)"
+            help="Type of resampling technique to be applied to original dataset (random_undersampling, random_oversampling, knn_undersampling, near_miss_undersampling, ml_random_undersampling, ml_random_oversampling, label_random_undersampling, label_random_oversampling)"
         ),
     ] = "random_undersampling",
     arguments: Annotated[
@@ -41,6 +43,12 @@ def apply_sampling(
             help="Random state used when applying resampling techniques for repeatability"
         ),
     ] = 42,
+    index_only: Annotated[
+        bool,
+        typer.Option(
+            help="Only resample row indices and save an index file referencing source_df_path ({attribute_to_balance}_{arguments}.index.json.gz) instead of a copy of the dataset"
+        ),
+    ] = False,
     log_level: Annotated[
         str,
         typer.Option(
@@ -51,6 +59,7 @@ def apply_sampling(
     """
     Takes dataset and applies relevant resampling technique and arguments given in config.py
     Saves dataframe to output_directory under file name {attribute_to_balance}_{arguments}.csv.gz
+    (or the resampled row indices under {attribute_to_balance}_{arguments}.index.json.gz if index_only)
     """
 
     log_level = log_level.upper()
@@ -62,19 +71,34 @@ def apply_sampling(
         format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
     )
 
-    dataset = pd.read_csv(
-        source_df_path, compression="gzip", converters={"legislativeSubjects": pd.eval}
-    )
+    dataset = read_csv_with_lists(source_df_path, compression="gzip")
     resampler = Resampler(dataset=dataset, random_state=random_state)
     resampling_method = getattr(resampler, resampling_type)
 
+    if index_only:
+        if "index_only" not in inspect.signature(resampling_method).parameters:
+            raise typer.BadParameter(
+                f"{resampling_type} does not support index only resampling"
+            )
+        resampled_index = resampling_method(
+            attribute_to_balance=attribute_to_balance,
+            index_only=True,
+            **ARGUMENTS.get(arguments),
+        )
+        output_path = (
+            output_directory / f"{attribute_to_balance}_{arguments}.index.json.gz"
+        )
+        print(f"Saving to: {output_path=} ...")
+        resampled_index.save(output_path, source_path=source_df_path.resolve())
+        return
+
     resampled_data = resampling_method(
         attribute_to_balance=attribute_to_balance, **ARGUMENTS.get(arguments)
     )
 
     output_path = output_directory / f"{attribute_to_balance}_{arguments}.csv.gz"
     print(f"Saving to: {output_path=} ...")
-    resampled_data.to_csv(output_path, compression="gzip", index=False)
+    write_csv_with_lists(resampled_data, output_path, compression="gzip", index=False)
 
 
 if __name__ == "__main__":
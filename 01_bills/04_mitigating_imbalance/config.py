@@ -50,4 +50,61 @@ ARGUMENTS = {
             "min_count": 50,
         },
     ],
+    "ml_random_undersampling": {
+        "percentage": 10,
+    },
+    "ml_random_oversampling": {
+        "percentage": 10,
+    },
+    "label_random_undersampling": {
+        "min_count": 50,
+    },
+    "label_random_oversampling": {
+        "max_count": 5,
+    },
+    "label_rus_ros": [
+        {
+            "min_count": 50,
+        },
+        {
+            "max_count": 5,
+        },
+    ],
+    "sparse_knn_undersampling": {
+        "sampling_strategy": "auto",
+        "n_neighbors": 3,
+        "features_to_remove": ["billNumber"],
+        "sparse_features": True,
+        "text_feature": "billText",
+        "n_jobs": -1,
+        "neighbors_backend": "auto",
+    },
+    "sparse_near_miss_undersampling": {
+        "sampling_strategy": "auto",
+        "n_neighbors": 3,
+        "features_to_remove": ["billNumber"],
+        "sparse_features": True,
+        "text_feature": "billText",
+        "n_jobs": -1,
+        "neighbors_backend": "auto",
+    },
+}
+
+# Resampler method(s) applied with each ARGUMENTS key (a list for chains, applied in order)
+RESAMPLING_TYPES = {
+    "basic_random_undersampling": "random_undersampling",
+    "basic_knn_undersampling": "knn_undersampling",
+    "knn_undersampling_with_associated_features": "knn_undersampling",
+    "basic_near_miss_undersampling": "near_miss_undersampling",
+    "near_miss_undersampling_with_associated_features": "near_miss_undersampling",
+    "basic_random_oversampling": "random_oversampling",
+    "rus_ros": ["random_undersampling", "random_oversampling"],
+    "ros_rus": ["random_oversampling", "random_undersampling"],
+    "ml_random_undersampling": "ml_random_undersampling",
+    "ml_random_oversampling": "ml_random_oversampling",
+    "label_random_undersampling": "label_random_undersampling",
+    "label_random_oversampling": "label_random_oversampling",
+    "label_rus_ros": ["label_random_undersampling", "label_random_oversampling"],
+    "sparse_knn_undersampling": "knn_undersampling",
+    "sparse_near_miss_undersampling": "near_miss_undersampling",
 }
@@ -0,0 +1,96 @@
+import typer
+import ray
+import logging
+
+from config import ARGUMENTS, RESAMPLING_TYPES
+from typing_extensions import Annotated
+from utils.distributed import LABEL_ONLY_RESAMPLING_TYPES, ray_resample_dataset
+
+
+def apply_sampling(
+    source_location: Annotated[
+        str,
+        typer.Option(
+            help="Location of the Parquet dataset (e.g. from 02_gathering/ray_get_compiled_subjects_with_text_dataset.py). Can be a s3 uri or a directory path."
+        ),
+    ] = "s3://loc-responsible-datasets-source-data/01_bills/generated_data/compiled_subjects_with_text",
+    output_directory: Annotated[
+        str,
+        typer.Option(
+            help="Location to store the resampled Parquet dataset. Can be a s3 uri or a directory path."
+        ),
+    ] = "s3://loc-responsible-datasets-source-data/01_bills/generated_data/resampled_data",
+    arguments: Annotated[
+        str,
+        typer.Option(
+            help="Key of ARGUMENTS in config.py, applied with the technique(s) of the key in RESAMPLING_TYPES"
+        ),
+    ] = "basic_random_undersampling",
+    attribute_to_balance: Annotated[
+        str,
+        typer.Option(help="Attribute that the dataset will be balanced on"),
+    ] = "legislativeSubjects",
+    random_state: Annotated[
+        int,
+        typer.Option(
+            help="Random state used when applying resampling techniques for repeatability"
+        ),
+    ] = 42,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Ray Data version of `apply_resampling.py`, for the random techniques resampling the labels only
+    (random_undersampling, random_oversampling and the multi-label methods) and chains of them.
+    Saves the resampled dataset to output_directory under {attribute_to_balance}_{arguments}/,
+    as Parquet partitioned by congress.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    if arguments not in RESAMPLING_TYPES:
+        raise typer.BadParameter(f"No resampling type configured for: {arguments}")
+    resampling_types = RESAMPLING_TYPES[arguments]
+    steps = (
+        list(zip(resampling_types, ARGUMENTS[arguments]))
+        if isinstance(resampling_types, list)
+        else [(resampling_types, ARGUMENTS[arguments])]
+    )
+    unsupported = [
+        resampling_type
+        for resampling_type, _ in steps
+        if resampling_type not in LABEL_ONLY_RESAMPLING_TYPES
+    ]
+    if unsupported:
+        raise typer.BadParameter(
+            f"Only {LABEL_ONLY_RESAMPLING_TYPES} can be distributed: {unsupported}"
+        )
+
+    ray.init()
+
+    output_location = (
+        f"{output_directory.rstrip('/')}/{attribute_to_balance}_{arguments}"
+    )
+    print(f"Saving to: {output_location=} ...")
+    n_rows = ray_resample_dataset(
+        source_location=source_location,
+        output_location=output_location,
+        steps=steps,
+        attribute_to_balance=attribute_to_balance,
+        random_state=random_state,
+    )
+    print(f"Resampled dataset of {n_rows} rows")
+
+
+if __name__ == "__main__":
+    typer.run(apply_sampling)
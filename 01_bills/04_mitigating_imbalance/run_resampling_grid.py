@@ -0,0 +1,87 @@
+import typer
+import logging
+
+from config import ARGUMENTS, RESAMPLING_TYPES
+from typing import List
+from typing_extensions import Annotated
+from pathlib import Path
+from utils.grid import run_resampling_grid
+
+
+def run_grid(
+    source_df_path: Annotated[
+        Path, typer.Option(help="Location to load in original dataset from.")
+    ] = Path(
+        "../../local_data/01_bills/generated_data/concat_compiled_subjects_with_text.csv.gz"
+    ),
+    output_directory: Annotated[
+        Path,
+        typer.Option(help="Location to store the resampled datasets and manifests."),
+    ] = Path("../../local_data/01_bills/generated_data/resampled_data"),
+    arguments: Annotated[
+        List[str],
+        typer.Option(
+            help="Keys of ARGUMENTS in config.py to apply (all keys of RESAMPLING_TYPES if not given)"
+        ),
+    ] = None,
+    random_states: Annotated[
+        List[int],
+        typer.Option(
+            help="Random states used when applying resampling techniques (each key is run with each random state)"
+        ),
+    ] = [42],
+    attribute_to_balance: Annotated[
+        str,
+        typer.Option(help="Attribute that the dataset will be balanced on"),
+    ] = "legislativeSubjects",
+    n_jobs: Annotated[
+        int,
+        typer.Option(help="Number of processes to run the resampling grid in."),
+    ] = 1,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Local CLI Wrapper for the `run_resampling_grid` function.
+    Loads the dataset once and applies every configured resampling technique (and chain) with each random state,
+    saving each dataframe to output_directory under {attribute_to_balance}_{arguments}_{random_state}.csv.gz
+    along with a manifest of its parameters and timings.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    arguments = arguments or list(RESAMPLING_TYPES)
+    unknown = [key for key in arguments if key not in RESAMPLING_TYPES]
+    if unknown:
+        raise typer.BadParameter(f"No resampling type configured for: {unknown}")
+
+    manifests = run_resampling_grid(
+        source_df_path=source_df_path,
+        output_directory=output_directory,
+        arguments_keys=arguments,
+        resampling_types=RESAMPLING_TYPES,
+        arguments=ARGUMENTS,
+        random_states=random_states,
+        attribute_to_balance=attribute_to_balance,
+        n_jobs=n_jobs,
+    )
+    failed = [manifest["name"] for manifest in manifests if "error" in manifest]
+    print(
+        f"Saved {len(manifests) - len(failed)} resampled datasets to: {output_directory=}"
+    )
+    if failed:
+        print(f"Failed: {failed}")
+
+
+if __name__ == "__main__":
+    typer.run(run_grid)
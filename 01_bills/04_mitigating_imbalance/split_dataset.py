@@ -0,0 +1,85 @@
+import typer
+import logging
+
+from typing import List
+from typing_extensions import Annotated
+from pathlib import Path
+from utils.split import CHUNK_SIZE, SPLIT_NAMES, SPLIT_RATIOS, split_dataset
+
+
+def split(
+    source_df_path: Annotated[
+        Path, typer.Option(help="Location to load in the (resampled) dataset from.")
+    ] = Path(
+        "../../local_data/01_bills/generated_data/resampled_data/legislativeSubjects_rus_ros.csv.gz"
+    ),
+    output_directory: Annotated[
+        Path,
+        typer.Option(
+            help="Location to store the splits ({split}/part-*.parquet) and split_summary.json."
+        ),
+    ] = Path("../../local_data/01_bills/generated_data/splits"),
+    attribute_to_balance: Annotated[
+        str,
+        typer.Option(help="Attribute that the splits will be stratified on"),
+    ] = "legislativeSubjects",
+    ratios: Annotated[
+        List[float], typer.Option(help="Ratio of each split (in order of split names)")
+    ] = SPLIT_RATIOS,
+    split_names: Annotated[
+        List[str], typer.Option(help="Name of each split")
+    ] = SPLIT_NAMES,
+    group_by: Annotated[
+        str,
+        typer.Option(
+            help="Keep rows with the same value (e.g. congress) in the same split. Rows of the same bill are always kept together."
+        ),
+    ] = None,
+    chunk_size: Annotated[
+        int, typer.Option(help="Number of rows read and written at a time.")
+    ] = CHUNK_SIZE,
+    random_state: Annotated[
+        int,
+        typer.Option(help="Random state used when splitting for repeatability"),
+    ] = 42,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Local CLI Wrapper for the `split_dataset` function.
+    Splits a dataset into train/validation/test Parquet shards, with multi-label iterative stratification.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+    if len(ratios) != len(split_names):
+        raise typer.BadParameter(f"One ratio per split is required: {split_names}")
+
+    summary = split_dataset(
+        source_df_path=source_df_path,
+        output_directory=output_directory,
+        attribute_to_balance=attribute_to_balance,
+        ratios=ratios,
+        split_names=split_names,
+        group_by=group_by,
+        random_state=random_state,
+        chunk_size=chunk_size,
+    )
+    print(f"Saving to: {output_directory=} ...")
+    for name, split_summary in summary["splits"].items():
+        print(
+            f"{name}: {split_summary['n_rows']} rows, {split_summary['n_labels']} labels"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(split)
@@ -0,0 +1,123 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import ResamplingPipeline
+from .schema import arrow_schema
+from .split import BILL_ID_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ["congress"]
+# techniques resampling the labels only (as index_only), without the other columns as features
+LABEL_ONLY_RESAMPLING_TYPES = [
+    "random_undersampling",
+    "random_oversampling",
+    "ml_random_undersampling",
+    "ml_random_oversampling",
+    "label_random_undersampling",
+    "label_random_oversampling",
+]
+
+
+def read_label_columns(
+    source_location: str, attribute_to_balance: str = "legislativeSubjects"
+) -> pd.DataFrame:
+    """
+    Reads the bill identifiers and attribute of a Parquet dataset (e.g. written by
+    `ray_gather_bill_records`), without its other columns (e.g. billText)
+    """
+    import pyarrow.dataset as ds
+
+    labels = pd.read_parquet(
+        source_location,
+        columns=BILL_ID_COLUMNS + [attribute_to_balance],
+        # the partition columns with their declared dtypes, rather than categoricals of the directory names
+        partitioning=ds.partitioning(arrow_schema(PARTITION_COLUMNS), flavor="hive"),
+    )
+    # list columns are read as arrays
+    labels[attribute_to_balance] = labels[attribute_to_balance].apply(
+        lambda x: x.tolist() if isinstance(x, np.ndarray) else x
+    )
+    return labels
+
+
+def resampled_keys(
+    labels: pd.DataFrame,
+    steps: list,
+    attribute_to_balance: str = "legislativeSubjects",
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Applies the resampling steps (resampling type and its arguments) to the labels, and returns the bill
+    identifiers of the resampled rows (repeated when oversampled) with their resampled attribute
+    """
+    unsupported = [
+        resampling_type
+        for resampling_type, _ in steps
+        if resampling_type not in LABEL_ONLY_RESAMPLING_TYPES
+    ]
+    if unsupported:
+        raise ValueError(f"Cannot resample the labels only with: {unsupported}")
+    pipeline = ResamplingPipeline(
+        steps, attribute_to_balance=attribute_to_balance, random_state=random_state
+    )
+    return pipeline.run(labels)
+
+
+def take_resampled_rows(
+    batch: pd.DataFrame,
+    keys: pd.DataFrame,
+    attribute_to_balance: str = "legislativeSubjects",
+):
+    """
+    Ray Data batch function: returns the rows of the batch in the resampled keys, as many times as they are
+    in the keys and with their resampled attribute, as an Arrow table with the declared dtypes of the columns
+    (as written by gathering)
+    """
+    import pyarrow as pa
+
+    columns = list(batch.columns)
+    rows = batch.drop(columns=[attribute_to_balance]).merge(
+        keys, on=BILL_ID_COLUMNS, how="inner"
+    )[columns]
+    return pa.Table.from_pandas(
+        rows, schema=arrow_schema(columns), preserve_index=False
+    ).replace_schema_metadata()
+
+
+def ray_resample_dataset(
+    source_location: str,
+    output_location: str,
+    steps: list,
+    attribute_to_balance: str = "legislativeSubjects",
+    random_state: int = 42,
+    partition_columns: list = PARTITION_COLUMNS,
+) -> int:
+    """
+    Ray Data pipeline resampling a Parquet dataset on the cluster: only the bill identifiers and attribute are
+    read to resample them (with a ResamplingPipeline of LABEL_ONLY_RESAMPLING_TYPES), then every block of the dataset is
+    filtered (and repeated) by the resampled keys and written as Parquet partitioned by the partition columns.
+    Returns the number of resampled rows.
+    """
+    import ray
+
+    from ray.data.datasource import Partitioning
+
+    labels = read_label_columns(source_location, attribute_to_balance)
+    keys = resampled_keys(labels, steps, attribute_to_balance, random_state)
+    logger.info(f"Resampled {len(labels)} rows to {len(keys)} rows")
+
+    dataset = ray.data.read_parquet(
+        source_location,
+        partitioning=Partitioning(
+            "hive", field_types={column: int for column in PARTITION_COLUMNS}
+        ),
+    ).map_batches(
+        take_resampled_rows,
+        batch_format="pandas",
+        fn_kwargs={"keys": keys, "attribute_to_balance": attribute_to_balance},
+    )
+    dataset.write_parquet(output_location, partition_cols=partition_columns)
+    return len(keys)
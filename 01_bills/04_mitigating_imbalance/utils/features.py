@@ -0,0 +1,198 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+from sklearn.base import BaseEstimator
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.preprocessing import MaxAbsScaler, MultiLabelBinarizer, OneHotEncoder
+
+logger = logging.getLogger(__name__)
+
+N_TEXT_FEATURES = 2**18
+
+
+def encode_feature(values: pd.Series) -> sparse.csr_matrix:
+    """
+    Returns the sparse encoding of a feature: multi-hot for list features, scaled (max abs) for
+    numeric features and one-hot otherwise
+    """
+    if isinstance(values.iloc[0], list):
+        return sparse.csr_matrix(
+            MultiLabelBinarizer(sparse_output=True).fit_transform(values)
+        )
+    if pd.api.types.is_numeric_dtype(values):
+        return sparse.csr_matrix(
+            MaxAbsScaler().fit_transform(values.fillna(0).to_numpy().reshape(-1, 1))
+        )
+    return sparse.csr_matrix(
+        OneHotEncoder(handle_unknown="ignore").fit_transform(
+            values.astype(str).to_numpy().reshape(-1, 1)
+        )
+    )
+
+
+def encode_text(
+    texts: pd.Series, n_features: int = N_TEXT_FEATURES
+) -> sparse.csr_matrix:
+    """
+    Returns hashed TF-IDF features of a text feature (no vocabulary is kept in memory)
+    """
+    vectorizer = HashingVectorizer(
+        n_features=n_features, alternate_sign=False, norm=None, stop_words="english"
+    )
+    counts = vectorizer.transform(texts.fillna("").astype(str))
+    return sparse.csr_matrix(TfidfTransformer(sublinear_tf=True).fit_transform(counts))
+
+
+def build_features(
+    dataset: pd.DataFrame,
+    features: list,
+    text_feature: str = None,
+    n_text_features: int = N_TEXT_FEATURES,
+) -> sparse.csr_matrix:
+    """
+    Returns the sparse (bills x features) matrix of one-hot/scaled features and,
+    if text_feature is given, its hashed TF-IDF features
+    """
+    matrices = [
+        encode_feature(dataset[feature])
+        for feature in features
+        if feature != text_feature
+    ]
+    if text_feature:
+        matrices.append(encode_text(dataset[text_feature], n_text_features))
+    if not matrices:
+        raise ValueError("No features to build")
+
+    matrix = sparse.hstack(matrices, format="csr")
+    logger.debug(f"Built features {matrix.shape} ({matrix.nnz} non zero)")
+    return matrix
+
+
+class ApproximateNearestNeighbors(BaseEstimator):
+    """
+    KNeighbors-like wrapper of pynndescent's NNDescent, usable as the `n_neighbors` of imblearn samplers
+    """
+
+    def __init__(
+        self,
+        n_neighbors: int = 3,
+        metric: str = "cosine",
+        n_jobs: int = None,
+        random_state: int = 42,
+    ):
+        self.n_neighbors = n_neighbors
+        self.metric = metric
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        from pynndescent import NNDescent
+
+        self.index_ = NNDescent(
+            X,
+            metric=self.metric,
+            n_neighbors=max(30, self.n_neighbors + 1),
+            n_jobs=self.n_jobs,
+            random_state=self.random_state,
+        )
+        self.n_samples_fit_ = X.shape[0]
+        return self
+
+    def kneighbors(self, X=None, n_neighbors: int = None, return_distance: bool = True):
+        n_neighbors = n_neighbors or self.n_neighbors
+        if X is None:
+            # neighbours of the fitted samples, excluding themselves as sklearn does: a sample is not
+            # necessarily its own first neighbour (e.g. duplicated rows at distance 0), so its index is
+            # removed wherever it is, or the last neighbour if it is not among them
+            indices, distances = self.index_.neighbor_graph
+            indices, distances = (
+                indices[:, : n_neighbors + 1],
+                distances[:, : n_neighbors + 1],
+            )
+            is_self = indices == np.arange(len(indices))[:, None]
+            kept = np.argsort(is_self, axis=1, kind="stable")[:, :n_neighbors]
+            indices, distances = (
+                np.take_along_axis(indices, kept, axis=1),
+                np.take_along_axis(distances, kept, axis=1),
+            )
+        else:
+            indices, distances = self.index_.query(X, k=n_neighbors)
+        return (distances, indices) if return_distance else indices
+
+    def kneighbors_graph(
+        self, X=None, n_neighbors: int = None, mode: str = "connectivity"
+    ):
+        n_neighbors = n_neighbors or self.n_neighbors
+        distances, indices = self.kneighbors(X, n_neighbors)
+        data = distances.ravel() if mode == "distance" else np.ones(indices.size)
+        return sparse.csr_matrix(
+            (
+                data,
+                indices.ravel(),
+                np.arange(0, indices.size + 1, indices.shape[1]),
+            ),
+            shape=(indices.shape[0], self.n_samples_fit_),
+        )
+
+
+class ApproximateNeighborsClassifier(ApproximateNearestNeighbors):
+    """
+    Majority vote of the NNDescent neighbours (as KNeighborsClassifier with uniform weights), usable as the
+    `n_neighbors` of imblearn's NeighbourhoodCleaningRule, which also predicts with it
+    """
+
+    def fit(self, X, y=None):
+        super().fit(X, y)
+        self.classes_, self._y = np.unique(y, return_inverse=True)
+        return self
+
+    def predict(self, X):
+        votes = self._y[self.kneighbors(X, return_distance=False)]
+        counts = np.zeros((len(votes), len(self.classes_)), dtype=np.int64)
+        np.add.at(counts, (np.arange(len(votes))[:, None], votes), 1)
+        # ties go to the first class, as in KNeighborsClassifier
+        return self.classes_[counts.argmax(axis=1)]
+
+
+def get_neighbors_estimator(
+    n_neighbors: int,
+    backend: str = "auto",
+    metric: str = "cosine",
+    n_jobs: int = None,
+    random_state: int = 42,
+    classifier: bool = False,
+):
+    """
+    Returns the nearest neighbours estimator of a backend:
+    'pynndescent': approximate (NNDescent), 'sklearn': exact (brute force on sparse features),
+    'auto': pynndescent if installed, otherwise sklearn.
+    If classifier, the estimator also predicts the majority label of the neighbours.
+    """
+    if backend == "auto":
+        try:
+            import pynndescent  # noqa: F401
+
+            backend = "pynndescent"
+        except ImportError:
+            backend = "sklearn"
+
+    if backend == "pynndescent":
+        return (
+            ApproximateNeighborsClassifier
+            if classifier
+            else ApproximateNearestNeighbors
+        )(
+            n_neighbors=n_neighbors,
+            metric=metric,
+            n_jobs=n_jobs,
+            random_state=random_state,
+        )
+    if backend == "sklearn":
+        return (KNeighborsClassifier if classifier else NearestNeighbors)(
+            n_neighbors=n_neighbors, metric=metric, algorithm="brute", n_jobs=n_jobs
+        )
+    raise ValueError(f"Unknown nearest neighbours backend: {backend}")
@@ -0,0 +1,214 @@
+import json
+import logging
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .list_codec import read_csv_with_lists, write_csv_with_lists
+from .resampler import Resampler
+from .split import BILL_ID_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+_WORKER_DATASET = {}
+
+
+def write_arrow_dataset(dataset: pd.DataFrame, arrow_path: Path) -> Path:
+    """
+    Writes the dataset as an uncompressed Arrow IPC file, such that processes can memory map it
+    instead of each re-reading (and re-parsing) the csv.gz
+    """
+    feather.write_feather(dataset, arrow_path, compression="uncompressed")
+    return arrow_path
+
+
+def read_arrow_dataset(
+    arrow_path: Path, attribute_to_balance: str = "legislativeSubjects"
+) -> pd.DataFrame:
+    """
+    Reads a dataset written by `write_arrow_dataset` from a memory map. Only the attribute to balance (as lists)
+    and the bill identifier and numeric columns are converted to pandas, the other string and list columns
+    (e.g. billText) are kept in the memory mapped Arrow buffers (pd.ArrowDtype), such that the processes share
+    them rather than each holding a copy
+    """
+    table = pa.ipc.open_file(pa.memory_map(str(arrow_path))).read_all()
+    arrow_columns = [
+        field.name
+        for field in table.schema
+        if field.name != attribute_to_balance
+        and field.name not in BILL_ID_COLUMNS
+        and (
+            pa.types.is_string(field.type)
+            or pa.types.is_large_string(field.type)
+            or pa.types.is_list(field.type)
+        )
+    ]
+    dataset = table.drop_columns(arrow_columns + [attribute_to_balance]).to_pandas()
+    for column in arrow_columns:
+        dataset[column] = pd.arrays.ArrowExtensionArray(table.column(column))
+    dataset[attribute_to_balance] = table.column(attribute_to_balance).to_pylist()
+    return dataset[table.column_names]
+
+
+def _init_worker(arrow_path: Path, attribute_to_balance: str):
+    _WORKER_DATASET["dataset"] = read_arrow_dataset(arrow_path, attribute_to_balance)
+
+
+def grid_tasks(
+    arguments_keys: list,
+    resampling_types: dict,
+    arguments: dict,
+    random_states: list,
+) -> list:
+    """
+    Returns one task (arguments key, resampling steps with their arguments, random state)
+    per configured strategy or chain and random state
+    """
+    tasks = []
+    for key in arguments_keys:
+        types = resampling_types[key]
+        steps = (
+            list(zip(types, arguments[key]))
+            if isinstance(types, list)
+            else [(types, arguments[key])]
+        )
+        for random_state in random_states:
+            tasks.append(
+                {"arguments": key, "steps": steps, "random_state": random_state}
+            )
+    return tasks
+
+
+def run_task(
+    task: dict,
+    attribute_to_balance: str,
+    output_directory: Path,
+    dataset: pd.DataFrame = None,
+) -> dict:
+    """
+    Applies the resampling steps of a task to the dataset (the worker's dataset if not given),
+    saves the result and its manifest ({name}.json) and returns the manifest
+    (with the error instead of the result if a step fails)
+    """
+    if dataset is None:
+        dataset = _WORKER_DATASET["dataset"]
+    name = f"{attribute_to_balance}_{task['arguments']}_{task['random_state']}"
+
+    manifest = {
+        "name": name,
+        "attribute_to_balance": attribute_to_balance,
+        "arguments": task["arguments"],
+        "steps": [
+            {"resampling_type": resampling_type, "arguments": step_arguments}
+            for resampling_type, step_arguments in task["steps"]
+        ],
+        "random_state": task["random_state"],
+        "n_rows": len(dataset),
+    }
+
+    start = time.perf_counter()
+    step_timings = []
+    resampled_data = dataset
+    try:
+        for resampling_type, step_arguments in task["steps"]:
+            step_start = time.perf_counter()
+            resampler = Resampler(
+                dataset=resampled_data, random_state=task["random_state"]
+            )
+            resampled_data = getattr(resampler, resampling_type)(
+                attribute_to_balance=attribute_to_balance, **step_arguments
+            )
+            step_timings.append(round(time.perf_counter() - step_start, 4))
+    except Exception as e:
+        logger.error(f"Failed to resample {name}: {e!r}")
+        manifest["error"] = repr(e)
+        return manifest
+    resampling_seconds = time.perf_counter() - start
+
+    output_path = output_directory / f"{name}.csv.gz"
+    write_csv_with_lists(resampled_data, output_path, compression="gzip", index=False)
+
+    manifest.update(
+        {
+            "output_path": str(output_path),
+            "n_rows_resampled": len(resampled_data),
+            "step_seconds": step_timings,
+            "resampling_seconds": round(resampling_seconds, 4),
+            "total_seconds": round(time.perf_counter() - start, 4),
+        }
+    )
+    (output_directory / f"{name}.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def run_resampling_grid(
+    source_df_path: Path,
+    output_directory: Path,
+    arguments_keys: list,
+    resampling_types: dict,
+    arguments: dict,
+    random_states: list = [42],
+    attribute_to_balance: str = "legislativeSubjects",
+    n_jobs: int = 1,
+) -> list:
+    """
+    Loads the dataset once, then applies every configured strategy (and chain) with each random state,
+    in n_jobs processes sharing the dataset through a memory mapped Arrow file.
+    Saves each result with its manifest, and the manifests of the grid to manifest.json
+    """
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    dataset = read_csv_with_lists(source_df_path, compression="gzip")
+    load_seconds = time.perf_counter() - start
+    logger.info(f"Loaded {len(dataset)} rows in {load_seconds:.2f}s")
+
+    tasks = grid_tasks(arguments_keys, resampling_types, arguments, random_states)
+    manifests = []
+    if n_jobs == 1:
+        for task in tasks:
+            manifests.append(
+                run_task(task, attribute_to_balance, output_directory, dataset)
+            )
+            logger.info(f"Resampled {manifests[-1]['name']}")
+    else:
+        arrow_path = write_arrow_dataset(dataset, output_directory / ".dataset.arrow")
+        del dataset
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_worker,
+                initargs=(arrow_path, attribute_to_balance),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        run_task, task, attribute_to_balance, output_directory
+                    )
+                    for task in tasks
+                ]
+                for future in as_completed(futures):
+                    manifests.append(future.result())
+                    logger.info(f"Resampled {manifests[-1]['name']}")
+        finally:
+            arrow_path.unlink(missing_ok=True)
+
+    manifests = sorted(manifests, key=lambda manifest: manifest["name"])
+    (output_directory / "manifest.json").write_text(
+        json.dumps(
+            {
+                "source": str(source_df_path),
+                "load_seconds": round(load_seconds, 4),
+                "total_seconds": round(time.perf_counter() - start, 4),
+                "n_jobs": n_jobs,
+                "results": manifests,
+            },
+            indent=2,
+        )
+    )
+    return manifests
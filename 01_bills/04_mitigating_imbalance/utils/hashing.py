@@ -0,0 +1,47 @@
+import hashlib
+import json
+import logging
+
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataset_hash(dataset_location: Path, cache_location: Path) -> str:
+    """
+    Returns the sha256 of a dataset file. Hashes are memoized in the cache by
+    path, size and modification time so unchanged datasets are not re-read.
+    """
+    dataset_location = Path(dataset_location).resolve()
+    hashes_path = Path(cache_location) / "dataset_hashes.json"
+    hashes = json.loads(hashes_path.read_text()) if hashes_path.exists() else {}
+
+    stat = dataset_location.stat()
+    key = str(dataset_location)
+    cached = hashes.get(key)
+    if (
+        cached
+        and cached["size"] == stat.st_size
+        and cached["mtime"] == stat.st_mtime_ns
+    ):
+        return cached["hash"]
+
+    logger.info(f"Hashing dataset: {dataset_location}")
+    hashes[key] = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": file_hash(dataset_location),
+    }
+    hashes_path.parent.mkdir(parents=True, exist_ok=True)
+    hashes_path.write_text(json.dumps(hashes, indent=2))
+    return hashes[key]["hash"]
@@ -0,0 +1,299 @@
+import gzip
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+from .list_codec import LIST_COLUMNS, read_csv_with_lists
+
+logger = logging.getLogger(__name__)
+
+
+def label_matrix(labels: pd.Series, empty_label: str = "Empty"):
+    """
+    Returns the sparse (bills x labels) incidence matrix of a list (or single valued) attribute
+    and the labels of its columns. Bills without labels are given `empty_label`, as when exploding.
+    """
+    labels = labels.apply(
+        lambda x: (x if x else [empty_label]) if isinstance(x, list) else [x]
+    )
+    lengths = labels.str.len().to_numpy()
+    codes, categories = pd.factorize(
+        np.concatenate(labels.to_numpy()) if len(labels) else np.array([]),
+        sort=True,
+    )
+    rows = np.repeat(np.arange(len(labels)), lengths)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (rows, codes)),
+        shape=(len(labels), len(categories)),
+    )
+    # duplicated labels within a bill count once
+    matrix.data[:] = 1
+    return matrix, categories
+
+
+def imbalance_ratios(counts: np.ndarray) -> np.ndarray:
+    """
+    Returns the imbalance ratio per label (IRLbl): count of the most frequent label / count of the label
+    """
+    with np.errstate(divide="ignore"):
+        return np.where(counts > 0, counts.max() / counts, np.inf)
+
+
+def mean_imbalance_ratio(counts: np.ndarray) -> float:
+    """
+    Returns the mean imbalance ratio (MeanIR) of the labels present
+    """
+    return imbalance_ratios(counts)[counts > 0].mean()
+
+
+class ResampledIndex(object):
+    """
+    Resampled rows of a dataset, as positions into the original dataset (repeated when oversampled),
+    optionally with the resampled values of the balanced attribute of each row
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        n_rows: int,
+        attribute: str = None,
+        values: list = None,
+        source: str = None,
+    ):
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.n_rows = n_rows
+        self.attribute = attribute
+        self.values = values
+        self.source = source
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def multiplicity(self) -> np.ndarray:
+        """
+        Number of times each row of the original dataset is in the resampled dataset
+        """
+        return np.bincount(self.positions, minlength=self.n_rows)
+
+    def take(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the resampled rows of the original dataframe
+        """
+        if len(dataframe) != self.n_rows:
+            raise ValueError(
+                f"ResampledIndex of {self.n_rows} rows cannot be applied to a dataframe of {len(dataframe)} rows"
+            )
+        resampled = dataframe.take(self.positions).reset_index(drop=True)
+        if self.attribute:
+            resampled[self.attribute] = pd.Series(self.values, dtype=object)
+        return resampled
+
+    def compose(self, other: "ResampledIndex") -> "ResampledIndex":
+        """
+        Returns the index of resampling `other` (positions into this resampled dataset)
+        after this one, as positions into the original dataset
+        """
+        attribute, values = other.attribute, other.values
+        if self.attribute and attribute in (None, self.attribute):
+            attribute = self.attribute
+            if other.values is None:
+                values = [self.values[position] for position in other.positions]
+        elif self.attribute:
+            raise ValueError(
+                f"Cannot compose resampled values of {self.attribute} and {other.attribute}"
+            )
+        return ResampledIndex(
+            self.positions[other.positions], self.n_rows, attribute, values, self.source
+        )
+
+    def save(self, index_path: str, source_path: str = None):
+        """
+        Saves the index (gzipped JSON) referencing the source dataset, instead of a copy of the resampled rows
+        """
+        with gzip.open(index_path, "wt") as f:
+            json.dump(
+                {
+                    "source": str(source_path or self.source or "") or None,
+                    "n_rows": self.n_rows,
+                    "positions": self.positions.tolist(),
+                    "attribute": self.attribute,
+                    "values": self.values,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, index_path: str) -> "ResampledIndex":
+        """
+        Loads an index saved by `save`, with the location of its source dataset
+        """
+        with gzip.open(index_path, "rt") as f:
+            saved = json.load(f)
+        return cls(
+            saved["positions"],
+            saved["n_rows"],
+            saved["attribute"],
+            saved["values"],
+            saved["source"],
+        )
+
+
+def read_resampled_dataset(
+    index_path: str, list_columns: list = LIST_COLUMNS
+) -> pd.DataFrame:
+    """
+    Returns the resampled dataset of an index file, taking its rows from the source dataset
+    """
+    resampled_index = ResampledIndex.load(index_path)
+    dataset = read_csv_with_lists(
+        resampled_index.source, list_columns, compression="gzip"
+    )
+    return resampled_index.take(dataset)
+
+
+def ml_random_undersampling(
+    labels: sparse.csr_matrix, percentage: float = 10, random_state: int = 42
+) -> ResampledIndex:
+    """
+    ML-RUS (Charte et al., 2015): removes `percentage`% of the bills, picking at random
+    from the bills of each majority label (IRLbl < MeanIR) in turn, until the label is no
+    longer a majority label.
+    """
+    rng = np.random.default_rng(random_state)
+    n_rows = labels.shape[0]
+    counts = np.asarray(labels.sum(axis=0)).ravel().astype(np.float64)
+    mean_ir = mean_imbalance_ratio(counts)
+
+    columns = labels.tocsc()
+    majority = np.flatnonzero((imbalance_ratios(counts) < mean_ir) & (counts > 0))
+    bags = {
+        label: rng.permutation(
+            columns.indices[columns.indptr[label] : columns.indptr[label + 1]]
+        )
+        for label in majority
+    }
+    pointers = dict.fromkeys(bags, 0)
+    removed = np.zeros(n_rows, dtype=bool)
+
+    samples_to_delete = int(n_rows * percentage / 100)
+    while samples_to_delete > 0 and bags:
+        for label in list(bags):
+            if samples_to_delete <= 0:
+                break
+            bag = bags[label]
+            while pointers[label] < len(bag) and removed[bag[pointers[label]]]:
+                pointers[label] += 1
+            if pointers[label] == len(bag):
+                del bags[label]
+                continue
+
+            row = bag[pointers[label]]
+            removed[row] = True
+            counts[labels.indices[labels.indptr[row] : labels.indptr[row + 1]]] -= 1
+            samples_to_delete -= 1
+            if counts[label] == 0 or counts.max() / counts[label] >= mean_ir:
+                del bags[label]
+
+    logger.debug(f"ML-RUS removed {removed.sum()} of {n_rows} rows")
+    return ResampledIndex(np.flatnonzero(~removed), n_rows)
+
+
+def ml_random_oversampling(
+    labels: sparse.csr_matrix, percentage: float = 10, random_state: int = 42
+) -> ResampledIndex:
+    """
+    ML-ROS (Charte et al., 2015): adds `percentage`% more bills, cloning bills picked at
+    random from the bills of each minority label (IRLbl > MeanIR) in turn, until the label
+    is no longer a minority label.
+    """
+    rng = np.random.default_rng(random_state)
+    n_rows = labels.shape[0]
+    counts = np.asarray(labels.sum(axis=0)).ravel().astype(np.float64)
+    mean_ir = mean_imbalance_ratio(counts)
+
+    columns = labels.tocsc()
+    minority = np.flatnonzero((imbalance_ratios(counts) > mean_ir) & (counts > 0))
+    bags = {
+        label: columns.indices[columns.indptr[label] : columns.indptr[label + 1]]
+        for label in minority
+    }
+
+    clones = []
+    samples_to_clone = int(n_rows * percentage / 100)
+    while samples_to_clone > 0 and bags:
+        for label in list(bags):
+            if samples_to_clone <= 0:
+                break
+            bag = bags[label]
+            row = bag[rng.integers(len(bag))]
+            clones.append(row)
+            counts[labels.indices[labels.indptr[row] : labels.indptr[row + 1]]] += 1
+            samples_to_clone -= 1
+            if counts.max() / counts[label] <= mean_ir:
+                del bags[label]
+
+    logger.debug(f"ML-ROS cloned {len(clones)} rows")
+    return ResampledIndex(
+        np.concatenate([np.arange(n_rows), np.asarray(clones, dtype=np.int64)]),
+        n_rows,
+    )
+
+
+def label_random_undersampling(
+    labels: sparse.csr_matrix, min_count: int = 50, random_state: int = 42
+) -> ResampledIndex:
+    """
+    Keeps whole bills such that each label is assigned to at least min(min_count, count) bills,
+    going from the rarest label to the most frequent and picking bills at random
+    (bills kept for rarer labels count towards the more frequent labels they are also assigned to).
+    """
+    rng = np.random.default_rng(random_state)
+    n_rows = labels.shape[0]
+    columns = labels.tocsc()
+    label_counts = np.diff(columns.indptr)
+
+    kept = np.zeros(n_rows, dtype=bool)
+    kept_counts = np.zeros(labels.shape[1], dtype=np.int64)
+    for label in np.argsort(label_counts, kind="stable"):
+        bag = columns.indices[columns.indptr[label] : columns.indptr[label + 1]]
+        needed = min(min_count, len(bag)) - kept_counts[label]
+        if needed <= 0:
+            continue
+        candidates = bag[~kept[bag]]
+        chosen = rng.choice(candidates, size=needed, replace=False)
+        kept[chosen] = True
+        kept_counts += np.asarray(labels[chosen].sum(axis=0)).ravel()
+
+    return ResampledIndex(np.flatnonzero(kept), n_rows)
+
+
+def label_random_oversampling(
+    labels: sparse.csr_matrix, max_count: int = 5, random_state: int = 42
+) -> ResampledIndex:
+    """
+    Clones whole bills such that each label is assigned to at least `max_count` bills,
+    going from the rarest label to the most frequent and cloning bills of the label at random
+    (clones added for rarer labels count towards the other labels they are also assigned to).
+    """
+    rng = np.random.default_rng(random_state)
+    n_rows = labels.shape[0]
+    columns = labels.tocsc()
+    counts = np.diff(columns.indptr).astype(np.int64)
+
+    clones = []
+    for label in np.argsort(counts, kind="stable"):
+        needed = max_count - counts[label]
+        if needed <= 0 or counts[label] == 0:
+            continue
+        bag = columns.indices[columns.indptr[label] : columns.indptr[label + 1]]
+        chosen = bag[rng.integers(len(bag), size=needed)]
+        clones.append(chosen)
+        counts += np.asarray(labels[chosen].sum(axis=0)).ravel()
+
+    return ResampledIndex(
+        np.concatenate([np.arange(n_rows)] + clones).astype(np.int64), n_rows
+    )
@@ -0,0 +1,150 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+
+from pathlib import Path
+
+import pandas as pd
+
+from .hashing import dataset_hash
+from .multilabel import ResampledIndex
+from .resampler import Resampler, attribute_last
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 1 << 30
+
+
+def step_key(parent_key: str, step: dict) -> str:
+    """
+    Returns the cache key of a step applied to the result of the parent key (the dataset hash for the first step)
+    """
+    return hashlib.sha256(
+        json.dumps({"parent": parent_key, **step}, sort_keys=True).encode()
+    ).hexdigest()
+
+
+class ResamplingCache(object):
+    """
+    On-disk cache of resampled indices (ResampledIndex) by step key,
+    evicting the least recently used entries above max_size bytes
+    """
+
+    def __init__(self, cache_location: Path, max_size: int = CACHE_SIZE):
+        self.cache_location = Path(cache_location)
+        self.cache_location.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    def path(self, key: str) -> Path:
+        return self.cache_location / f"{key}.index.json.gz"
+
+    def get(self, key: str) -> ResampledIndex:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        # the modification time is the last use of the entry
+        os.utime(path)
+        return ResampledIndex.load(path)
+
+    def put(self, key: str, resampled_index: ResampledIndex):
+        resampled_index.save(self.path(key))
+        self.evict()
+
+    def evict(self):
+        entries = sorted(
+            (path.stat().st_mtime_ns, path.stat().st_size, path)
+            for path in self.cache_location.glob("*.index.json.gz")
+        )
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            logger.debug(f"Evicting {path.name} from the resampling cache")
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+
+class ResamplingPipeline(object):
+    """
+    Sequence of Resampler steps (resampling type and its arguments), each applied to the result of the previous step.
+    Steps resampling indices (index_only) are cached by the dataset hash and the parameters of every step up to
+    and including them, such that pipelines sharing a prefix of steps reuse its result.
+    """
+
+    def __init__(
+        self,
+        steps: list,
+        attribute_to_balance: str = "legislativeSubjects",
+        random_state: int = 42,
+        cache: ResamplingCache = None,
+    ):
+        self.steps = steps
+        self.attribute_to_balance = attribute_to_balance
+        self.random_state = random_state
+        self.cache = cache
+
+    def step_parameters(self, resampling_type: str, arguments: dict) -> dict:
+        return {
+            "resampling_type": resampling_type,
+            "arguments": arguments,
+            "attribute_to_balance": self.attribute_to_balance,
+            "random_state": self.random_state,
+        }
+
+    def run(self, dataset: pd.DataFrame, dataset_key: str = None) -> pd.DataFrame:
+        """
+        Returns the dataset resampled by every step. Without a dataset_key (e.g. the hash of its file)
+        nothing is cached.
+        """
+        resampled_index = ResampledIndex(range(len(dataset)), len(dataset))
+        resampled_data = None
+        key = dataset_key
+
+        for resampling_type, arguments in self.steps:
+            index_only = resampled_data is None and "index_only" in (
+                inspect.signature(getattr(Resampler, resampling_type)).parameters
+            )
+            if index_only:
+                key = key and step_key(
+                    key, self.step_parameters(resampling_type, arguments)
+                )
+                cached = self.cache.get(key) if self.cache and key else None
+                if cached is not None:
+                    logger.info(f"Using cached {resampling_type} ({key[:12]})")
+                    resampled_index = cached
+                    continue
+
+            resampler = Resampler(
+                dataset=(
+                    resampled_data
+                    if resampled_data is not None
+                    else resampled_index.take(dataset)
+                ),
+                random_state=self.random_state,
+            )
+            resampling_method = getattr(resampler, resampling_type)
+            if not index_only:
+                # results which are not indices end the cached prefix
+                resampled_data = resampling_method(
+                    attribute_to_balance=self.attribute_to_balance, **arguments
+                )
+                continue
+
+            step_result = resampling_method(
+                attribute_to_balance=self.attribute_to_balance,
+                index_only=True,
+                **arguments,
+            )
+            if not isinstance(step_result, ResampledIndex):
+                # e.g. knn_undersampling without sparse_features
+                resampled_data = step_result
+                continue
+            resampled_index = resampled_index.compose(step_result)
+            if self.cache and key:
+                self.cache.put(key, resampled_index)
+
+        if resampled_data is not None:
+            return resampled_data
+        return attribute_last(resampled_index.take(dataset), self.attribute_to_balance)
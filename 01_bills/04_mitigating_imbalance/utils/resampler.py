@@ -1,11 +1,13 @@
 import logging
 
+import numpy as np
 import pandas as pd
 
 from typing import Union
 
 from collections import Counter
 from imblearn.under_sampling import (
+    EditedNearestNeighbours,
     RandomUnderSampler,
     NeighbourhoodCleaningRule,
     NearMiss,
@@ -14,6 +16,16 @@ from imblearn.over_sampling import RandomOverSampler
 
 from sklearn.preprocessing import LabelEncoder
 
+from .features import build_features, get_neighbors_estimator
+from .multilabel import (
+    ResampledIndex,
+    label_matrix,
+    label_random_oversampling,
+    label_random_undersampling,
+    ml_random_oversampling,
+    ml_random_undersampling,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,10 +54,131 @@ def get_dataframe_copy(dataframe: pd.DataFrame, attributes: Union[str, list]):
     return dataframe_copy
 
 
+def attribute_last(dataframe: pd.DataFrame, attribute_to_balance: str) -> pd.DataFrame:
+    """
+    Returns the dataframe with the attribute to balance as its last column, as in the results of the
+    dataframe methods (the features followed by the resampled attribute)
+    """
+    columns = [column for column in dataframe.columns if column != attribute_to_balance]
+    return dataframe[columns + [attribute_to_balance]]
+
+
 class Resampler(object):
     def __init__(self, dataset: pd.DataFrame, random_state: int = 42):
         self.dataset = dataset
         self.random_state = random_state
+        self._label_matrices = {}
+
+    def get_label_matrix(self, attribute_to_balance: str):
+        """
+        Returns the (cached) sparse bills x labels matrix of the attribute and its labels
+        """
+        if attribute_to_balance not in self._label_matrices:
+            self._label_matrices[attribute_to_balance] = label_matrix(
+                self.dataset[attribute_to_balance]
+            )
+        return self._label_matrices[attribute_to_balance]
+
+    def apply_index(
+        self,
+        resampled_index: ResampledIndex,
+        attribute_to_balance: str,
+        index_only: bool = False,
+    ) -> Union[pd.DataFrame, ResampledIndex]:
+        """
+        Returns the rows of the dataset selected by a ResampledIndex (with the attribute to balance last, as
+        the dataframe methods do), or the index itself if index_only
+        """
+        if index_only:
+            return resampled_index
+        return attribute_last(resampled_index.take(self.dataset), attribute_to_balance)
+
+    def get_exploded_labels(self, attribute_to_balance: str):
+        """
+        Returns the dataset position of each exploded row of the attribute (empty lists as "Empty") and its value,
+        without copying or exploding the other columns
+        """
+        values = self.dataset[attribute_to_balance].reset_index(drop=True)
+        if isinstance(values.iloc[0], list):
+            values = values.apply(lambda x: x if x else ["Empty"]).explode()
+        return values.index.to_numpy(), values.to_numpy()
+
+    def resample_index(
+        self,
+        sampler,
+        attribute_to_balance: str,
+        features=None,
+        keep_labels: bool = False,
+    ) -> ResampledIndex:
+        """
+        Applies an imblearn sampler to the (exploded) row indices, or the rows of a sparse bills x features matrix,
+        and labels only, such that no other column (e.g. billText) is copied.
+        Resampled labels of list attributes are grouped back per bill, as the dataframe methods do,
+        or if keep_labels, the resampled bills keep all of their labels.
+        """
+        positions, labels = self.get_exploded_labels(attribute_to_balance)
+        if features is None:
+            X = np.arange(len(positions)).reshape(-1, 1)
+            y = labels
+        else:
+            # neighbour based samplers need numeric labels
+            X = features[positions]
+            y, _ = pd.factorize(labels)
+        sampler.fit_resample(X, y)
+        positions_resampled = positions[sampler.sample_indices_]
+        labels_resampled = labels[sampler.sample_indices_]
+
+        if not isinstance(self.dataset.iloc[0][attribute_to_balance], list):
+            if keep_labels:
+                return ResampledIndex(np.unique(positions_resampled), len(self.dataset))
+            return ResampledIndex(positions_resampled, len(self.dataset))
+
+        order = np.argsort(positions_resampled, kind="stable")
+        bills, starts = np.unique(positions_resampled[order], return_index=True)
+        grouped_order = self.grouped_order(bills, attribute_to_balance)
+        if keep_labels:
+            return ResampledIndex(bills[grouped_order], len(self.dataset))
+        values = [
+            list(bill_labels)
+            for bill_labels in np.split(labels_resampled[order], starts[1:])
+        ]
+        return ResampledIndex(
+            bills[grouped_order],
+            len(self.dataset),
+            attribute_to_balance,
+            [values[i] for i in grouped_order],
+        )
+
+    def grouped_order(self, positions: np.ndarray, attribute_to_balance: str):
+        """
+        Returns the order of the bills at positions in the results of the dataframe methods, which group the
+        resampled labels back with groupby(features) and so sort the bills by their other columns.
+        Seeded steps following an index only step then draw the same rows as after the dataframe method.
+        """
+        features = [
+            column for column in self.dataset.columns if column != attribute_to_balance
+        ]
+        rows = self.dataset[features].iloc[positions].reset_index(drop=True)
+        return rows.sort_values(features, kind="stable").index.to_numpy()
+
+    def build_features(
+        self,
+        attribute_to_balance: str,
+        features_to_remove: list = None,
+        text_feature: str = None,
+    ):
+        """
+        Returns the sparse bills x features matrix (one-hot / scaled features, and hashed TF-IDF of text_feature)
+        of all columns but the attribute to balance, features_to_remove and text columns
+        """
+        features = [
+            feature
+            for feature in self.dataset.columns
+            if feature
+            not in [attribute_to_balance, "billText", "summary", text_feature]
+            and feature not in (features_to_remove or [])
+        ]
+        return build_features(self.dataset, features, text_feature=text_feature)
 
     # UNDERSAMPLING
     def random_undersampling(
@@ -54,6 +187,7 @@ class Resampler(object):
         sampling_strategy: str = "auto",
         replacement: bool = False,
         min_count: int = None,
+        index_only: bool = False,
     ):
         """
         Under-sample the majority class(es) by randomly picking samples with or without replacement
@@ -64,7 +198,21 @@ class Resampler(object):
         'not majority': resample all classes but the majority class;
         'all': resample all classes;
         'auto': equivalent to 'not minority'.
+
+        If index_only, only the row indices and labels are resampled and a ResampledIndex is returned.
         """
+        if index_only:
+            _, labels = self.get_exploded_labels(attribute_to_balance)
+            if min_count:
+                sampling_strategy = {
+                    cls: min(min_count, count) for cls, count in Counter(labels).items()
+                }
+            rus = RandomUnderSampler(
+                sampling_strategy=sampling_strategy,
+                random_state=self.random_state,
+                replacement=replacement,
+            )
+            return self.resample_index(rus, attribute_to_balance)
 
         dataframe_copy = get_dataframe_copy(self.dataset, attribute_to_balance)
 
@@ -93,7 +241,7 @@ class Resampler(object):
             features = list(dataframe_copy.columns)
             features.remove(attribute_to_balance)
             df_resampled = (
-                df_resampled.groupby(features)[attribute_to_balance]
+                df_resampled.groupby(features, observed=True)[attribute_to_balance]
                 .apply(list)
                 .reset_index()
             )
@@ -106,6 +254,11 @@ class Resampler(object):
         sampling_strategy: str = "auto",
         n_neighbors: int = 3,
         features_to_remove: list = None,
+        sparse_features: bool = False,
+        text_feature: str = None,
+        n_jobs: int = None,
+        neighbors_backend: str = "auto",
+        index_only: bool = False,
     ):
         """
         Under-samples based on NearMiss methods
@@ -116,7 +269,46 @@ class Resampler(object):
         'not majority': resample all classes but the majority class;
         'all': resample all classes;
         'auto': equivalent to 'not minority'
+
+        If sparse_features, neighbours are found between (exploded) rows of a sparse matrix of the one-hot
+        features (and hashed TF-IDF of text_feature) by the neighbors_backend ('pynndescent' approximate,
+        'sklearn' exact or 'auto') with n_jobs, both for the edited nearest neighbours and the cleaning rule's
+        classifier, and whole bills are kept (returned as a ResampledIndex if index_only).
         """
+        if sparse_features:
+            ncr = NeighbourhoodCleaningRule(
+                n_neighbors=get_neighbors_estimator(
+                    n_neighbors,
+                    backend=neighbors_backend,
+                    n_jobs=n_jobs,
+                    random_state=self.random_state,
+                    classifier=True,
+                ),
+                sampling_strategy=sampling_strategy,
+                edited_nearest_neighbours=EditedNearestNeighbours(
+                    sampling_strategy=sampling_strategy,
+                    n_neighbors=get_neighbors_estimator(
+                        n_neighbors + 1,
+                        backend=neighbors_backend,
+                        n_jobs=n_jobs,
+                        random_state=self.random_state,
+                    ),
+                    kind_sel="mode",
+                    n_jobs=n_jobs,
+                ),
+                n_jobs=n_jobs,
+            )
+            features = self.build_features(
+                attribute_to_balance, features_to_remove, text_feature
+            )
+            return self.apply_index(
+                self.resample_index(
+                    ncr, attribute_to_balance, features, keep_labels=True
+                ),
+                attribute_to_balance,
+                index_only,
+            )
+
         dataframe_copy = get_dataframe_copy(self.dataset, attribute_to_balance)
         label_encoder = LabelEncoder()
         dataframe_copy[f"{attribute_to_balance}"] = label_encoder.fit_transform(
@@ -125,7 +317,7 @@ class Resampler(object):
 
         features = list(dataframe_copy.columns)
         features.remove(attribute_to_balance)
-        features = [f for f in features if f not in features_to_remove]
+        features = [f for f in features if f not in (features_to_remove or [])]
 
         encoders = {}
         for feature in features:
@@ -158,7 +350,7 @@ class Resampler(object):
 
         if isinstance(self.dataset.iloc[0][attribute_to_balance], list):
             df_resampled = (
-                df_resampled.groupby(features)[attribute_to_balance]
+                df_resampled.groupby(features, observed=True)[attribute_to_balance]
                 .apply(list)
                 .reset_index()
             )
@@ -175,6 +367,11 @@ class Resampler(object):
         sampling_strategy: str = "auto",
         n_neighbors: int = 3,
         features_to_remove: list = None,
+        sparse_features: bool = False,
+        text_feature: str = None,
+        n_jobs: int = None,
+        neighbors_backend: str = "auto",
+        index_only: bool = False,
     ):
         """
         Under-samples based on NearMiss methods
@@ -185,7 +382,38 @@ class Resampler(object):
         'not majority': resample all classes but the majority class;
         'all': resample all classes;
         'auto': equivalent to 'not minority'
+
+        If sparse_features, neighbours are found between (exploded) rows of a sparse matrix of the one-hot
+        features (and hashed TF-IDF of text_feature) by the neighbors_backend ('pynndescent' approximate,
+        'sklearn' exact or 'auto') with n_jobs, and whole bills are kept (returned as a ResampledIndex if index_only).
         """
+        if sparse_features:
+            _, labels = self.get_exploded_labels(attribute_to_balance)
+            min_class_count = pd.Series(labels).value_counts().min()
+            n_neighbors = (
+                min(n_neighbors, min_class_count - 1) if min_class_count > 1 else 1
+            )  # Avoid n_neighbors > class samples
+            nm = NearMiss(
+                n_neighbors=get_neighbors_estimator(
+                    n_neighbors,
+                    backend=neighbors_backend,
+                    n_jobs=n_jobs,
+                    random_state=self.random_state,
+                ),
+                sampling_strategy=sampling_strategy,
+                n_jobs=n_jobs,
+            )
+            features = self.build_features(
+                attribute_to_balance, features_to_remove, text_feature
+            )
+            return self.apply_index(
+                self.resample_index(
+                    nm, attribute_to_balance, features, keep_labels=True
+                ),
+                attribute_to_balance,
+                index_only,
+            )
+
         dataframe_copy = get_dataframe_copy(self.dataset, attribute_to_balance)
         label_encoder = LabelEncoder()
         dataframe_copy[f"{attribute_to_balance}"] = label_encoder.fit_transform(
@@ -231,7 +459,7 @@ class Resampler(object):
             features = list(dataframe_copy.columns)
             features.remove(attribute_to_balance)
             df_resampled = (
-                df_resampled.groupby(features)[attribute_to_balance]
+                df_resampled.groupby(features, observed=True)[attribute_to_balance]
                 .apply(list)
                 .reset_index()
             )
@@ -255,6 +483,7 @@ class Resampler(object):
         attribute_to_balance: str,
         sampling_strategy: str = "auto",
         max_count: int = 5,
+        index_only: bool = False,
     ):
         """
         Over-sample the minority class(es) by randomly picking samples with or without replacement
@@ -265,7 +494,20 @@ class Resampler(object):
         'not majority': resample all classes but the majority class;
         'all': resample all classes;
         'auto': equivalent to 'not majority'.
+
+        If index_only, only the row indices and labels are resampled and a ResampledIndex is returned.
         """
+        if index_only:
+            _, labels = self.get_exploded_labels(attribute_to_balance)
+            if max_count:
+                sampling_strategy = {
+                    cls: max(count, max_count) for cls, count in Counter(labels).items()
+                }
+            ros = RandomOverSampler(
+                sampling_strategy=sampling_strategy,
+                random_state=self.random_state,
+            )
+            return self.resample_index(ros, attribute_to_balance)
 
         dataframe_copy = get_dataframe_copy(self.dataset, attribute_to_balance)
 
@@ -291,13 +533,90 @@ class Resampler(object):
             features = list(dataframe_copy.columns)
             features.remove(attribute_to_balance)
             df_resampled = (
-                df_resampled.groupby(features)[attribute_to_balance]
+                df_resampled.groupby(features, observed=True)[attribute_to_balance]
                 .apply(list)
                 .reset_index()
             )
 
         return df_resampled
 
+    # MULTI-LABEL (whole bills are kept or cloned, labels are never exploded)
+    def ml_random_undersampling(
+        self,
+        attribute_to_balance: str,
+        percentage: float = 10,
+        index_only: bool = False,
+    ):
+        """
+        ML-RUS: removes `percentage`% of the bills, picked at random from the bills of
+        labels more frequent than average (IRLbl < MeanIR)
+        """
+        labels, _ = self.get_label_matrix(attribute_to_balance)
+        return self.apply_index(
+            ml_random_undersampling(
+                labels, percentage=percentage, random_state=self.random_state
+            ),
+            attribute_to_balance,
+            index_only,
+        )
+
+    def ml_random_oversampling(
+        self,
+        attribute_to_balance: str,
+        percentage: float = 10,
+        index_only: bool = False,
+    ):
+        """
+        ML-ROS: clones `percentage`% more bills, picked at random from the bills of
+        labels less frequent than average (IRLbl > MeanIR)
+        """
+        labels, _ = self.get_label_matrix(attribute_to_balance)
+        return self.apply_index(
+            ml_random_oversampling(
+                labels, percentage=percentage, random_state=self.random_state
+            ),
+            attribute_to_balance,
+            index_only,
+        )
+
+    def label_random_undersampling(
+        self,
+        attribute_to_balance: str,
+        min_count: int = 50,
+        index_only: bool = False,
+    ):
+        """
+        Keeps a random subset of whole bills such that each label keeps at least
+        min(min_count, count) bills (multi-label equivalent of random_undersampling with min_count)
+        """
+        labels, _ = self.get_label_matrix(attribute_to_balance)
+        return self.apply_index(
+            label_random_undersampling(
+                labels, min_count=min_count, random_state=self.random_state
+            ),
+            attribute_to_balance,
+            index_only,
+        )
+
+    def label_random_oversampling(
+        self,
+        attribute_to_balance: str,
+        max_count: int = 5,
+        index_only: bool = False,
+    ):
+        """
+        Clones whole bills at random such that each label has at least max_count bills
+        (multi-label equivalent of random_oversampling with max_count)
+        """
+        labels, _ = self.get_label_matrix(attribute_to_balance)
+        return self.apply_index(
+            label_random_oversampling(
+                labels, max_count=max_count, random_state=self.random_state
+            ),
+            attribute_to_balance,
+            index_only,
+        )
+
     def smote(
         self,
     ):
@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pandas as pd
+
+from pandas.api.types import union_categoricals
+
+from .list_codec import LIST_COLUMNS, decode_list_columns
+
+# dtypes of the columns of the datasets written by gathering (compiled_subjects.csv.gz,
+# compiled_subjects_with_text.csv.gz and their concatenations), applied when they are read.
+# Integer columns are nullable, list columns are read as str and decoded
+# in one pass per column (`decode_list_columns`).
+COLUMN_DTYPES = {
+    "congress": "Int64",
+    "billType": "category",
+    "billNumber": "Int64",
+    "legislativeSubjects": "list",
+    "policyArea": "category",
+    "billText": str,
+    "summary": str,
+}
+# bill identifiers, without which a row is dropped
+REQUIRED_COLUMNS = ["congress", "billType", "billNumber"]
+
+
+def arrow_schema(columns: list, dtypes: dict = COLUMN_DTYPES):
+    """
+    Returns the Arrow schema of the columns with their declared dtypes (e.g. of the Parquet datasets written
+    by Ray Data): int64 for nullable integers, dictionary encoded strings for categoricals, lists of strings for
+    list columns and strings otherwise
+    """
+    import pyarrow as pa
+
+    arrow_types = {
+        "Int64": pa.int64(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "list": pa.list_(pa.string()),
+    }
+    return pa.schema(
+        [
+            (column, arrow_types.get(dtypes.get(column), pa.string()))
+            for column in columns
+        ]
+    )
+
+
+def read_csv_options(columns: list, dtypes: dict = COLUMN_DTYPES) -> dict:
+    """
+    Returns the pd.read_csv options (dtype and na_values) reading the columns with their dtypes, list columns
+    as str to be decoded after the read.
+    Empty values are missing for the nullable integer and categorical columns (e.g. a bill without a policyArea,
+    rather than an "" category) and bill identifiers, such that only the text columns read empty strings as is.
+    """
+    dtypes = {column: dtypes[column] for column in columns if column in dtypes}
+    return {
+        "dtype": {
+            column: str if column in LIST_COLUMNS else dtype
+            for column, dtype in dtypes.items()
+        },
+        "keep_default_na": False,
+        "na_values": {
+            column: [""]
+            for column, dtype in dtypes.items()
+            if dtype in ["Int64", "category"] or column in REQUIRED_COLUMNS
+        },
+    }
+
+
+def read_csv_with_schema(
+    path: Path, columns: list = None, dtypes: dict = COLUMN_DTYPES, **kwargs
+):
+    """
+    Reads a dataset (csv(.gz)) with the declared dtypes of its columns (or of the given columns only)
+    in one pass. Also accepts pd.read_csv options, e.g. chunksize, with which the chunks are yielded.
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    columns = [column for column in columns or header if column in header]
+    list_columns = [column for column in columns if column in LIST_COLUMNS]
+    dataframe = pd.read_csv(
+        path,
+        usecols=columns,
+        **read_csv_options(columns, dtypes),
+        **kwargs,
+    )
+    if kwargs.get("chunksize") or kwargs.get("iterator"):
+        return (decode_list_columns(chunk, list_columns) for chunk in dataframe)
+    return decode_list_columns(dataframe, list_columns)
+
+
+def missing_required(dataframe: pd.DataFrame) -> pd.Series:
+    """
+    Returns whether each row is missing a bill identifier (REQUIRED_COLUMNS)
+    """
+    required = [column for column in REQUIRED_COLUMNS if column in dataframe.columns]
+    return dataframe[required].isna().any(axis=1)
+
+
+def concat_with_schema(dataframes: list) -> pd.DataFrame:
+    """
+    pd.concat keeping categorical columns categorical (with the union of the categories of the dataframes)
+    rather than falling back to object columns when the categories differ
+    """
+    for column in dataframes[0].columns:
+        if isinstance(dataframes[0][column].dtype, pd.CategoricalDtype):
+            categories = union_categoricals(
+                [dataframe[column] for dataframe in dataframes]
+            ).categories
+            dataframes = [
+                dataframe.assign(
+                    **{column: dataframe[column].cat.set_categories(categories)}
+                )
+                for dataframe in dataframes
+            ]
+    return pd.concat(dataframes)
@@ -0,0 +1,238 @@
+import json
+import logging
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+from .list_codec import LIST_COLUMNS, read_csv_with_lists
+from .multilabel import label_matrix
+
+logger = logging.getLogger(__name__)
+
+SPLIT_NAMES = ["train", "validation", "test"]
+SPLIT_RATIOS = [0.8, 0.1, 0.1]
+BILL_ID_COLUMNS = ["congress", "billType", "billNumber"]
+STRING_COLUMNS = ["congress", "billType", "policyArea", "billText", "summary"]
+CHUNK_SIZE = 10_000
+
+
+def choose_split(
+    desired_label_counts: np.ndarray,
+    desired_sizes: np.ndarray,
+    rng: np.random.Generator,
+) -> int:
+    """
+    Returns the split with the most desired examples of the label, breaking ties by
+    the most desired examples overall and then at random
+    """
+    candidates = np.flatnonzero(desired_label_counts == desired_label_counts.max())
+    if len(candidates) > 1:
+        sizes = desired_sizes[candidates]
+        candidates = candidates[sizes == sizes.max()]
+    return (
+        candidates[rng.integers(len(candidates))]
+        if len(candidates) > 1
+        else candidates[0]
+    )
+
+
+def iterative_stratification(
+    labels: sparse.csr_matrix,
+    ratios: list = SPLIT_RATIOS,
+    units: np.ndarray = None,
+    random_state: int = 42,
+) -> np.ndarray:
+    """
+    Multi-label iterative stratification (Sechidis et al., 2011): returns the split of each row,
+    such that the proportion of each label in each split follows the ratios.
+
+    Labels are processed from the rarest (among rows not yet assigned) and the rows of a label
+    assigned to the split which most needs the label. Rows sharing a unit (e.g. copies of an
+    oversampled bill, or bills of a congress) are assigned together.
+    """
+    rng = np.random.default_rng(random_state)
+    ratios = np.asarray(ratios, dtype=np.float64) / np.sum(ratios)
+    n_rows = labels.shape[0]
+    if units is None:
+        units = np.arange(n_rows)
+    n_units = units.max() + 1 if n_rows else 0
+
+    # (units x labels) counts and size of each unit
+    membership = sparse.csr_matrix(
+        (np.ones(n_rows), (units, np.arange(n_rows))), shape=(n_units, n_rows)
+    )
+    unit_labels = sparse.csr_matrix(membership @ labels, dtype=np.float64)
+    unit_columns = unit_labels.tocsc()
+    unit_sizes = np.bincount(units, minlength=n_units).astype(np.float64)
+
+    remaining = np.asarray(unit_labels.sum(axis=0)).ravel()
+    desired_label_counts = ratios[:, None] * remaining[None, :]
+    desired_sizes = ratios * n_rows
+    assignment = np.full(n_units, -1, dtype=np.int64)
+
+    def assign(unit: int, split: int):
+        assignment[unit] = split
+        columns = unit_labels.indices[
+            unit_labels.indptr[unit] : unit_labels.indptr[unit + 1]
+        ]
+        counts = unit_labels.data[
+            unit_labels.indptr[unit] : unit_labels.indptr[unit + 1]
+        ]
+        desired_label_counts[split, columns] -= counts
+        desired_sizes[split] -= unit_sizes[unit]
+        remaining[columns] -= counts
+
+    while (remaining > 0).any():
+        candidates = np.flatnonzero(remaining > 0)
+        rarest = candidates[remaining[candidates] == remaining[candidates].min()]
+        label = rarest[rng.integers(len(rarest))]
+
+        bag = unit_columns.indices[
+            unit_columns.indptr[label] : unit_columns.indptr[label + 1]
+        ]
+        for unit in rng.permutation(bag[assignment[bag] < 0]):
+            assign(
+                unit, choose_split(desired_label_counts[:, label], desired_sizes, rng)
+            )
+
+    # units without labels
+    for unit in rng.permutation(np.flatnonzero(assignment < 0)):
+        assign(unit, choose_split(desired_sizes, desired_sizes, rng))
+
+    return assignment[units]
+
+
+def split_assignment(
+    dataframe: pd.DataFrame,
+    attribute_to_balance: str = "legislativeSubjects",
+    ratios: list = SPLIT_RATIOS,
+    group_by: str = None,
+    random_state: int = 42,
+) -> np.ndarray:
+    """
+    Returns the split of each row of the dataframe, stratified on the attribute. Rows of the same bill
+    (e.g. oversampled copies) are kept in the same split, or rows of the same group_by value (e.g. congress)
+    if given, so that no bill (or group) is in more than one split
+    """
+    key_columns = (
+        [group_by]
+        if group_by
+        else [column for column in BILL_ID_COLUMNS if column in dataframe.columns]
+    )
+    units = (
+        dataframe.groupby(key_columns, sort=False, dropna=False).ngroup().to_numpy()
+        if key_columns
+        else None
+    )
+    labels, _ = label_matrix(dataframe[attribute_to_balance])
+    return iterative_stratification(
+        labels, ratios=ratios, units=units, random_state=random_state
+    )
+
+
+def split_dataframe(
+    dataframe: pd.DataFrame,
+    attribute_to_balance: str = "legislativeSubjects",
+    ratios: list = SPLIT_RATIOS,
+    split_names: list = SPLIT_NAMES,
+    group_by: str = None,
+    random_state: int = 42,
+) -> dict:
+    """
+    Returns the dataframe of each split (by name), stratified on the attribute
+    """
+    assignment = split_assignment(
+        dataframe, attribute_to_balance, ratios, group_by, random_state
+    )
+    return {
+        name: dataframe[assignment == split].reset_index(drop=True)
+        for split, name in enumerate(split_names)
+    }
+
+
+def split_summary(labels: pd.Series, assignment: np.ndarray, split_names: list) -> dict:
+    """
+    Returns the number of rows and labels of each split, and the labels missing from each split
+    """
+    matrix, categories = label_matrix(labels)
+    summary = {}
+    for split, name in enumerate(split_names):
+        label_counts = np.asarray(matrix[assignment == split].sum(axis=0)).ravel()
+        summary[name] = {
+            "n_rows": int((assignment == split).sum()),
+            "n_labels": int((label_counts > 0).sum()),
+            "missing_labels": categories[label_counts == 0].tolist(),
+        }
+    return summary
+
+
+def split_dataset(
+    source_df_path: Path,
+    output_directory: Path,
+    attribute_to_balance: str = "legislativeSubjects",
+    ratios: list = SPLIT_RATIOS,
+    split_names: list = SPLIT_NAMES,
+    group_by: str = None,
+    random_state: int = 42,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """
+    Splits a (resampled) csv.gz dataset into stratified splits, streaming its rows into Parquet shards
+    ({output_directory}/{split}/part-{chunk}.parquet) such that the full dataset is never in memory.
+    Only the attribute and bill identifier (or group_by) columns are read to compute the splits.
+    Saves and returns a summary of the splits (split_summary.json)
+    """
+    if len(ratios) != len(split_names):
+        raise ValueError(f"One ratio per split is required: {ratios}, {split_names}")
+    output_directory = Path(output_directory)
+
+    key_columns = [group_by] if group_by else BILL_ID_COLUMNS
+    header = pd.read_csv(source_df_path, nrows=0).columns
+    usecols = [attribute_to_balance] + [c for c in key_columns if c in header]
+    list_columns = [c for c in LIST_COLUMNS if c in header]
+    dtype = {c: str for c in STRING_COLUMNS if c in header and c not in list_columns}
+
+    labels = read_csv_with_lists(
+        source_df_path,
+        [c for c in list_columns if c in usecols],
+        usecols=usecols,
+        dtype={c: t for c, t in dtype.items() if c in usecols},
+    )
+    assignment = split_assignment(
+        labels, attribute_to_balance, ratios, group_by, random_state
+    )
+    summary = split_summary(labels[attribute_to_balance], assignment, split_names)
+    del labels
+
+    for name in split_names:
+        (output_directory / name).mkdir(parents=True, exist_ok=True)
+
+    offset = 0
+    for i, chunk in enumerate(
+        read_csv_with_lists(
+            source_df_path, list_columns, chunksize=chunk_size, dtype=dtype
+        )
+    ):
+        chunk_assignment = assignment[offset : offset + len(chunk)]
+        offset += len(chunk)
+        for split, name in enumerate(split_names):
+            shard = chunk[chunk_assignment == split]
+            if len(shard):
+                shard.to_parquet(
+                    output_directory / name / f"part-{i:05d}.parquet", index=False
+                )
+        logger.info(f"Split {offset} rows")
+
+    summary = {
+        "source": str(source_df_path),
+        "attribute_to_balance": attribute_to_balance,
+        "ratios": ratios,
+        "group_by": group_by,
+        "random_state": random_state,
+        "splits": summary,
+    }
+    (output_directory / "split_summary.json").write_text(json.dumps(summary, indent=2))
+    return summary
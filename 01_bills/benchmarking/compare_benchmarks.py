@@ -0,0 +1,49 @@
+import json
+import typer
+
+from pathlib import Path
+from typing_extensions import Annotated
+from utils.runner import compare_results
+
+
+def compare_benchmarks(
+    baseline: Annotated[
+        Path, typer.Argument(help="Benchmark results JSON to compare against.")
+    ],
+    candidate: Annotated[Path, typer.Argument(help="New benchmark results JSON.")],
+    statistic: Annotated[
+        str, typer.Option(help="Timing statistic to compare (min, median, mean, max)")
+    ] = "min",
+    threshold: Annotated[
+        float,
+        typer.Option(help="Relative slowdown reported as a regression (0.1 = 10%)."),
+    ] = 0.1,
+    fail_on_regression: Annotated[
+        bool, typer.Option(help="Exit with a non-zero status if any case regressed.")
+    ] = False,
+):
+    """
+    Prints a comparison table of two benchmark results files created by run_benchmarks.py
+    """
+    baseline_results = json.load(baseline.open("r"))
+    candidate_results = json.load(candidate.open("r"))
+    rows = compare_results(baseline_results, candidate_results, statistic=statistic)
+
+    regressions = []
+    print(f"{'benchmark':45} {'baseline':>10} {'candidate':>10} {'ratio':>8}")
+    for name, before, after, ratio in rows:
+        flag = ""
+        if ratio and ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio and ratio < 1 - threshold:
+            flag = "improved"
+        ratio_text = f"{ratio:8.2f}" if ratio else f"{'-':>8}"
+        print(f"{name:45} {before or 0:10.4f} {after or 0:10.4f} {ratio_text} {flag}")
+
+    if regressions and fail_on_regression:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(compare_benchmarks)
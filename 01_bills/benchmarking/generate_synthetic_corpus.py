@@ -0,0 +1,72 @@
+import typer
+import logging
+
+from pathlib import Path
+from typing import List
+from typing_extensions import Annotated
+from utils.synthetic import generate_synthetic_corpus
+
+
+def get_synthetic_corpus(
+    output_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location to write the synthetic source_pages/source_bills tree."
+        ),
+    ] = Path("../../local_data/01_bills/benchmark_corpus"),
+    congresses: Annotated[
+        List[int], typer.Option(help="Congresses to generate bills for.")
+    ] = [117, 118],
+    bills_per_congress: Annotated[
+        int, typer.Option(help="Number of bills generated for each congress.")
+    ] = 500,
+    subjects_per_bill: Annotated[
+        int, typer.Option(help="Mean number of legislative subjects per bill.")
+    ] = 8,
+    text_versions: Annotated[
+        int, typer.Option(help="Number of text versions per bill (max 4).")
+    ] = 2,
+    text_size: Annotated[
+        int, typer.Option(help="Approximate size in bytes of each bill text file.")
+    ] = 20_000,
+    n_subjects: Annotated[
+        int, typer.Option(help="Number of distinct legislative subjects.")
+    ] = 1000,
+    page_limit: Annotated[
+        int, typer.Option(help="Number of bills in each source page.")
+    ] = 250,
+    seed: Annotated[int, typer.Option(help="Random seed for the generator.")] = 42,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Local CLI Wrapper for the `generate_synthetic_corpus` function.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    generate_synthetic_corpus(
+        output_location=output_location,
+        congresses=congresses,
+        bills_per_congress=bills_per_congress,
+        subjects_per_bill=subjects_per_bill,
+        text_versions=text_versions,
+        text_size=text_size,
+        n_subjects=n_subjects,
+        page_limit=page_limit,
+        seed=seed,
+    )
+
+
+if __name__ == "__main__":
+    typer.run(get_synthetic_corpus)
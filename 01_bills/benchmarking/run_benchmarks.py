@@ -0,0 +1,160 @@
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import json
+import shutil
+import time
+import typer
+import logging
+
+from pathlib import Path
+from typing import List
+from typing_extensions import Annotated
+from utils.fake_api import FakeCongressAPI
+from utils.runner import (
+    STAGES,
+    BenchmarkContext,
+    git_revision,
+    run_benchmarks,
+    write_results,
+)
+from utils.stages import load_stage_module
+from utils.synthetic import generate_synthetic_corpus
+
+
+def run_pipeline_benchmarks(
+    corpus_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location of the synthetic corpus. Generated if missing or if the corpus parameters differ."
+        ),
+    ] = Path("../../local_data/01_bills/benchmark_corpus"),
+    work_directory: Annotated[
+        Path,
+        typer.Option(help="Location to write the outputs of the benchmarked stages."),
+    ] = Path("../../local_data/01_bills/benchmark_work"),
+    output_directory: Annotated[
+        Path, typer.Option(help="Location to store the benchmark results JSON.")
+    ] = Path("./results"),
+    stages: Annotated[
+        List[str],
+        typer.Option(
+            help="Stages to benchmark (retrieval, gathering, concat, profiling, resampling)"
+        ),
+    ] = STAGES,
+    names: Annotated[
+        List[str],
+        typer.Option(help="Only run the named benchmarks (e.g. gathering.subjects)"),
+    ] = [],
+    repeat: Annotated[
+        int, typer.Option(help="Number of timed runs of each benchmark.")
+    ] = 3,
+    congresses: Annotated[
+        List[int], typer.Option(help="Congresses in the synthetic corpus.")
+    ] = [117, 118],
+    bills_per_congress: Annotated[
+        int, typer.Option(help="Number of bills generated for each congress.")
+    ] = 500,
+    subjects_per_bill: Annotated[
+        int, typer.Option(help="Mean number of legislative subjects per bill.")
+    ] = 8,
+    text_versions: Annotated[
+        int, typer.Option(help="Number of text versions per bill (max 4).")
+    ] = 2,
+    text_size: Annotated[
+        int, typer.Option(help="Approximate size in bytes of each bill text file.")
+    ] = 20_000,
+    page_limit: Annotated[
+        int, typer.Option(help="Number of bills in each source page.")
+    ] = 250,
+    seed: Annotated[int, typer.Option(help="Random seed for the generator.")] = 42,
+    latency: Annotated[
+        float, typer.Option(help="Delay in seconds added to every fake API response.")
+    ] = 0.0,
+    rate_429: Annotated[
+        float, typer.Option(help="Probability of a fake API 429 response.")
+    ] = 0.0,
+    rate_5xx: Annotated[
+        float, typer.Option(help="Probability of a fake API 5xx response.")
+    ] = 0.0,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Benchmarks the pipeline stages against a synthetic corpus and a local fake Congress.gov API.
+    Saves timings to output_directory under the file name {timestamp}_{commit}.json
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+    corpus_parameters = {
+        "congresses": congresses,
+        "bills_per_congress": bills_per_congress,
+        "subjects_per_bill": subjects_per_bill,
+        "text_versions": text_versions,
+        "text_size": text_size,
+        "page_limit": page_limit,
+        "seed": seed,
+    }
+    corpus_file = corpus_location / "corpus.json"
+    corpus = json.load(corpus_file.open("r")) if corpus_file.exists() else {}
+    if any(corpus.get(k) != v for k, v in corpus_parameters.items()):
+        logging.info(f"Generating synthetic corpus: {corpus_location}")
+        shutil.rmtree(corpus_location, ignore_errors=True)
+        shutil.rmtree(work_directory, ignore_errors=True)
+        corpus = generate_synthetic_corpus(
+            output_location=corpus_location, **corpus_parameters
+        )
+
+    api = FakeCongressAPI(
+        corpus_location=corpus_location,
+        latency=latency,
+        rate_429=rate_429,
+        rate_5xx=rate_5xx,
+        seed=seed,
+    )
+    ctx = BenchmarkContext(
+        corpus_location=corpus_location,
+        work_directory=work_directory,
+        congresses=congresses,
+        page_limit=page_limit,
+        api=api,
+    )
+    # The retrieval modules log every request to the "ray" logger at import
+    load_stage_module("retrieval", "fetch_store")
+    logging.getLogger("ray").setLevel(max(level_enum, logging.WARNING))
+
+    with api:
+        results = run_benchmarks(ctx, stages=stages, repeat=repeat, names=names)
+
+    commit = git_revision().get("commit", "")[:10] or "unknown"
+    output_path = output_directory / f"{time.strftime('%Y%m%dT%H%M%S')}_{commit}.json"
+    parameters = {
+        "stages": stages,
+        "repeat": repeat,
+        "latency": latency,
+        "rate_429": rate_429,
+        "rate_5xx": rate_5xx,
+    }
+    write_results(output_path, results, corpus, parameters)
+    print(f"Saved results to: {output_path}")
+    for name, result in results.items():
+        print(
+            f"{name:45} {result.get('min', float('nan')):10.4f}s {result.get('error', '')}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(run_pipeline_benchmarks)
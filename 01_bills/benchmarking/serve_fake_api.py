@@ -0,0 +1,68 @@
+import time
+import typer
+import logging
+
+from pathlib import Path
+from typing_extensions import Annotated
+from utils.fake_api import FakeCongressAPI
+
+
+def serve_fake_api(
+    corpus_location: Annotated[
+        Path,
+        typer.Option(
+            help="Location of a corpus created by generate_synthetic_corpus.py."
+        ),
+    ] = Path("../../local_data/01_bills/benchmark_corpus"),
+    port: Annotated[int, typer.Option(help="Port to listen on.")] = 8900,
+    latency: Annotated[
+        float, typer.Option(help="Delay in seconds added to every response.")
+    ] = 0.0,
+    jitter: Annotated[
+        float, typer.Option(help="Maximum random delay in seconds added to latency.")
+    ] = 0.0,
+    rate_429: Annotated[
+        float,
+        typer.Option(help="Probability of responding with 429 Too Many Requests."),
+    ] = 0.0,
+    rate_5xx: Annotated[
+        float, typer.Option(help="Probability of responding with a 5xx server error.")
+    ] = 0.0,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            help="Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+        ),
+    ] = "INFO",
+):
+    """
+    Serves a synthetic corpus as a fake Congress.gov API,
+    usable as the --api-url of the 01_retrieval scripts.
+    """
+    log_level = log_level.upper()
+    level_enum = getattr(logging, log_level, None)
+    if not isinstance(level_enum, int):
+        raise typer.BadParameter(f"Invalid log level: {log_level}")
+    logging.basicConfig(
+        level=level_enum,
+        format="%(asctime)s - %(name)s.%(funcName)s:%(lineno)d - %(levelname)s - %(message)s",
+    )
+
+    api = FakeCongressAPI(
+        corpus_location=corpus_location,
+        latency=latency,
+        jitter=jitter,
+        rate_429=rate_429,
+        rate_5xx=rate_5xx,
+        port=port,
+    )
+    with api:
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    typer.run(serve_fake_api)
@@ -0,0 +1,211 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+import urllib.parse
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .synthetic import TEXT_URL
+
+logger = logging.getLogger(__name__)
+
+BILL_LIST_PATH = re.compile(r"^/v3/bill/(?P<congress>\d+)/?$")
+BILL_PATH = re.compile(
+    r"^/v3/bill/(?P<congress>\d+)/(?P<house>[a-z]+)/(?P<number>\d+)"
+    r"(?:/(?P<subfield>subjects|summaries|text))?/?$"
+)
+TEXT_PATH = re.compile(
+    r"^/(?P<congress>\d+)/bills/(?P<house>[a-z]+)(?P<number>\d+)/(?P<file_name>[^/]+)$"
+)
+SERVER_ERRORS = [500, 502, 503, 520]
+
+
+class FakeCongressAPI(object):
+    """
+    Local HTTP server imitating the Congress.gov API endpoints used by
+    01_retrieval, serving the documents of a synthetic corpus
+    (see `generate_synthetic_corpus`).
+
+    Latency and error injection are configurable: every request is delayed by
+    `latency` seconds (plus up to `jitter` seconds) and fails with a 429 or a
+    5xx response with the given probabilities.
+
+    Usage:
+        with FakeCongressAPI(corpus_location) as api:
+            LoCBillsAPI(api.url, "key").get_bill(118, "hr", 1)
+    """
+
+    def __init__(
+        self,
+        corpus_location: Path,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        rate_5xx: float = 0.0,
+        seed: int = 42,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.corpus_location = Path(corpus_location)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.stats = Counter()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bill_lists = self._load_bill_lists()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def url(self) -> str:
+        """
+        Base url to pass as `api_url` to `LoCBillsAPI`.
+        """
+        return f"{self.base_url}v3/"
+
+    def _load_bill_lists(self) -> dict:
+        bill_lists = {}
+        pages_dir = self.corpus_location / "source_pages"
+        for page in pages_dir.glob("*.json"):
+            if page.name.endswith(".status.json"):
+                continue
+            congress, offset = page.stem.split("_")
+            bill_lists.setdefault(congress, []).append(
+                (int(offset), json.load(page.open("r")).get("bills", []))
+            )
+        return {
+            congress: [bill for _, bills in sorted(pages) for bill in bills]
+            for congress, pages in bill_lists.items()
+        }
+
+    def _inject(self):
+        """
+        Returns the injected status code for a request, if any.
+        """
+        with self._lock:
+            roll = self._rng.random()
+            delay = self.latency + self._rng.random() * self.jitter
+            status = None
+            if roll < self.rate_429:
+                status = 429
+            elif roll < self.rate_429 + self.rate_5xx:
+                status = self._rng.choice(SERVER_ERRORS)
+        if delay:
+            time.sleep(delay)
+        return status
+
+    def _bill_list(self, congress: str, qs: dict):
+        bills = self._bill_lists.get(congress, [])
+        offset = int(qs.get("offset", ["0"])[0])
+        limit = int(qs.get("limit", ["20"])[0])
+        return {
+            "bills": bills[offset : offset + limit],
+            "pagination": {"count": len(bills)},
+            "request": {"congress": congress, "format": "json"},
+        }
+
+    def _bill_document(self, congress, house, number, subfield):
+        file_name = {
+            None: "bill.json",
+            "subjects": "subjects.json",
+            "summaries": "summaries.json",
+            "text": "text.json",
+        }[subfield]
+        path = self.corpus_location / "source_bills" / congress / house / number
+        path = path / file_name
+        if not path.exists():
+            return None
+        document = path.read_text(encoding="utf-8")
+        if subfield == "text":
+            document = document.replace(TEXT_URL, self.base_url)
+        return document
+
+    def respond(self, path: str, query: str):
+        """
+        Returns (status, content_type, body) for a request path and query string.
+        """
+        qs = urllib.parse.parse_qs(query)
+        if status := self._inject():
+            return status, "application/json", json.dumps({"error": status})
+
+        if match := BILL_LIST_PATH.match(path):
+            if "api_key" not in qs:
+                return 403, "application/json", json.dumps({"error": "API_KEY"})
+            body = json.dumps(self._bill_list(match["congress"], qs))
+            return 200, "application/json", body
+        if match := BILL_PATH.match(path):
+            if "api_key" not in qs:
+                return 403, "application/json", json.dumps({"error": "API_KEY"})
+            document = self._bill_document(
+                match["congress"], match["house"], match["number"], match["subfield"]
+            )
+            if document is not None:
+                return 200, "application/json", document
+        elif match := TEXT_PATH.match(path):
+            text_path = (
+                self.corpus_location
+                / "source_bills"
+                / match["congress"]
+                / match["house"]
+                / match["number"]
+                / match["file_name"]
+            )
+            if text_path.exists():
+                return 200, "text/html", text_path.read_text(encoding="utf-8")
+        return 404, "application/json", json.dumps({"error": "Not found"})
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                split_path = urllib.parse.urlsplit(self.path)
+                status, content_type, body = api.respond(
+                    split_path.path, split_path.query
+                )
+                api.stats[status] += 1
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Congress.gov API listening: {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
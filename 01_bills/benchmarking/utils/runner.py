@@ -0,0 +1,468 @@
+import contextlib
+import io
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+
+from pathlib import Path
+
+from .fake_api import FakeCongressAPI
+from .stages import BILLS_DIR, load_stage_module
+
+logger = logging.getLogger(__name__)
+
+API_KEY = "benchmark"
+STAGES = ["retrieval", "gathering", "concat", "profiling", "resampling"]
+SUBJECTS_FILE = "compiled_subjects.csv.gz"
+SUBJECTS_WITH_TEXT_FILE = "compiled_subjects_with_text.csv.gz"
+PROFILING_ATTRIBUTES = ["congress", "billType", "legislativeSubjects", "policyArea"]
+
+
+class BenchmarkContext(object):
+    """
+    Holds the locations and shared state used by the benchmark cases.
+    """
+
+    def __init__(
+        self,
+        corpus_location: Path,
+        work_directory: Path,
+        congresses: list,
+        page_limit: int,
+        api: FakeCongressAPI = None,
+    ):
+        self.corpus_location = Path(corpus_location)
+        self.work_directory = Path(work_directory)
+        self.congresses = congresses
+        self.page_limit = page_limit
+        self.api = api
+        self.dataset = None
+        self.resampling_dataset = None
+
+    @property
+    def source_bills(self) -> Path:
+        return self.corpus_location / "source_bills"
+
+    @property
+    def response_cache(self) -> Path:
+        return self.work_directory / "retrieval" / "responses.sqlite"
+
+    @property
+    def gathering_directory(self) -> Path:
+        return self.work_directory / "gathering"
+
+    @property
+    def concat_path(self) -> Path:
+        return self.gathering_directory / f"concat_{SUBJECTS_WITH_TEXT_FILE}"
+
+
+def reset_directory(directory: Path):
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True, exist_ok=True)
+
+
+# RETRIEVAL
+def setup_retrieval_pages(ctx: BenchmarkContext):
+    reset_directory(ctx.work_directory / "retrieval" / "source_pages")
+
+
+def run_retrieval_pages(ctx: BenchmarkContext):
+    fetch_store = load_stage_module("retrieval", "fetch_store")
+    for congress in ctx.congresses:
+        fetch_store.fetch_and_store_congress_bills_source_pages(
+            api_url=ctx.api.url,
+            api_key=API_KEY,
+            congress=congress,
+            output_location=str(ctx.work_directory / "retrieval" / "source_pages"),
+            page_limit=ctx.page_limit,
+            overwrite=True,
+        )
+
+
+def setup_retrieval_bills(ctx: BenchmarkContext):
+    pages_directory = ctx.work_directory / "retrieval" / "source_pages"
+    shutil.rmtree(pages_directory, ignore_errors=True)
+    shutil.copytree(ctx.corpus_location / "source_pages", pages_directory)
+    reset_directory(ctx.work_directory / "retrieval" / "source_bills")
+
+
+def run_retrieval_bills(ctx: BenchmarkContext, **cache_options):
+    fetch_store = load_stage_module("retrieval", "fetch_store")
+    pages_directory = ctx.work_directory / "retrieval" / "source_pages"
+    for page in sorted(pages_directory.glob("*.json")):
+        if page.name.endswith(".status.json"):
+            continue
+        fetch_store.fetch_and_store_bills_from_source_page(
+            api_url=ctx.api.url,
+            api_key=API_KEY,
+            source_file=str(page),
+            output_location=str(ctx.work_directory / "retrieval" / "source_bills"),
+            overwrite=True,
+            **cache_options,
+        )
+
+
+def setup_retrieval_bills_replay(ctx: BenchmarkContext):
+    if not ctx.response_cache.exists():
+        logger.info("Recording API responses")
+        setup_retrieval_bills(ctx)
+        run_retrieval_bills(
+            ctx, cache_location=str(ctx.response_cache), cache_mode="record"
+        )
+    setup_retrieval_bills(ctx)
+
+
+def run_retrieval_bills_replay(ctx: BenchmarkContext):
+    run_retrieval_bills(
+        ctx, cache_location=str(ctx.response_cache), cache_mode="replay"
+    )
+
+
+# GATHERING
+def setup_gathering(ctx: BenchmarkContext):
+    for congress in ctx.congresses:
+        (ctx.gathering_directory / str(congress)).mkdir(parents=True, exist_ok=True)
+
+
+def run_gathering_subjects(ctx: BenchmarkContext):
+    dataframe = load_stage_module("gathering", "dataframe")
+    for congress in ctx.congresses:
+        dataframe.fetch_and_populate_subject_dataframe_from_source_data(
+            source_directory=ctx.source_bills / str(congress),
+            output_path=ctx.gathering_directory / str(congress) / SUBJECTS_FILE,
+        )
+
+
+def run_gathering_subjects_with_text(ctx: BenchmarkContext):
+    dataframe = load_stage_module("gathering", "dataframe")
+    for congress in ctx.congresses:
+        dataframe.fetch_and_populate_subject_bill_text_dataframe_from_source_data(
+            source_directory=ctx.source_bills / str(congress),
+            output_path=ctx.gathering_directory
+            / str(congress)
+            / SUBJECTS_WITH_TEXT_FILE,
+            glob_pattern="*/*",
+        )
+
+
+def run_gathering_combined(ctx: BenchmarkContext):
+    dataframe = load_stage_module("gathering", "dataframe")
+    for congress in ctx.congresses:
+        dataframe.fetch_and_populate_compiled_dataframes_from_source_data(
+            source_directory=ctx.source_bills / str(congress),
+            subjects_output_path=ctx.gathering_directory
+            / str(congress)
+            / SUBJECTS_FILE,
+            subjects_with_text_output_path=ctx.gathering_directory
+            / str(congress)
+            / SUBJECTS_WITH_TEXT_FILE,
+            glob_pattern="*/*",
+        )
+
+
+def ensure_gathered(ctx: BenchmarkContext):
+    if not all(
+        (ctx.gathering_directory / str(c) / SUBJECTS_WITH_TEXT_FILE).exists()
+        for c in ctx.congresses
+    ):
+        logger.info("Preparing gathered dataframes")
+        setup_gathering(ctx)
+        run_gathering_subjects_with_text(ctx)
+
+
+# CONCAT
+def run_concat(ctx: BenchmarkContext):
+    dataframe = load_stage_module("gathering", "dataframe")
+    dataframe.concat_dataframes(
+        source_directory=ctx.gathering_directory,
+        dataframe_file=SUBJECTS_WITH_TEXT_FILE,
+    )
+
+
+def ensure_concatenated(ctx: BenchmarkContext):
+    ensure_gathered(ctx)
+    if not ctx.concat_path.exists():
+        logger.info("Preparing concatenated dataframe")
+        run_concat(ctx)
+
+
+# PROFILING AND RESAMPLING
+def load_dataset(ctx: BenchmarkContext):
+    schema = load_stage_module("profiling", "schema")
+    streaming = load_stage_module("profiling", "streaming")
+    ctx.dataset = schema.read_csv_with_schema(
+        ctx.concat_path, dtypes=streaming.PROFILING_DTYPES
+    )
+
+
+def ensure_dataset(ctx: BenchmarkContext):
+    ensure_concatenated(ctx)
+    if ctx.dataset is None:
+        load_dataset(ctx)
+
+
+def profiling_function(module: str, function: str, **kwargs):
+    def run(ctx: BenchmarkContext):
+        import matplotlib.pyplot as plt
+
+        profiling = load_stage_module("profiling", module)
+        with contextlib.redirect_stdout(io.StringIO()):
+            getattr(profiling, function)(ctx.dataset, **kwargs)
+        plt.close("all")
+
+    return run
+
+
+def load_resampling_dataset(ctx: BenchmarkContext):
+    """
+    Loads the dataset as the resampling scripts do (plain dtypes, lists decoded), rather than with the
+    profiling schema (categoricals and nullable integers)
+    """
+    list_codec = load_stage_module("resampling", "list_codec")
+    ctx.resampling_dataset = list_codec.read_csv_with_lists(
+        ctx.concat_path, compression="gzip", dtype={"congress": str}
+    )
+
+
+def ensure_resampling_dataset(ctx: BenchmarkContext):
+    ensure_concatenated(ctx)
+    if ctx.resampling_dataset is None:
+        load_resampling_dataset(ctx)
+
+
+def run_gini_and_entropy(ctx: BenchmarkContext):
+    statistical = load_stage_module("profiling", "statistical")
+    for attribute in PROFILING_ATTRIBUTES:
+        statistical.calculate_gini_index(ctx.dataset, attribute)
+        statistical.calculate_entropy(ctx.dataset, attribute)
+
+
+def resampling_function(steps: list, schema_typed: bool = False):
+    """
+    Runs the resampling steps on the dataset as loaded by the resampling scripts, or if schema_typed
+    on the dataset as loaded for profiling (categorical billType and policyArea, Int64 billNumber)
+    """
+
+    def run(ctx: BenchmarkContext):
+        resampler = load_stage_module("resampling", "resampler")
+        dataset = ctx.dataset if schema_typed else ctx.resampling_dataset
+        for method, kwargs in steps:
+            sampler = resampler.Resampler(dataset=dataset, random_state=42)
+            dataset = getattr(sampler, method)(
+                attribute_to_balance="legislativeSubjects", **kwargs
+            )
+        return {"rows": len(dataset)}
+
+    return run
+
+
+RUS = ("random_undersampling", {"min_count": 50})
+ROS = ("random_oversampling", {"max_count": 5})
+
+BENCHMARKS = [
+    # (stage, name, setup, run)
+    ("retrieval", "retrieval.source_pages", setup_retrieval_pages, run_retrieval_pages),
+    ("retrieval", "retrieval.bills", setup_retrieval_bills, run_retrieval_bills),
+    (
+        "retrieval",
+        "retrieval.bills_replay",
+        setup_retrieval_bills_replay,
+        run_retrieval_bills_replay,
+    ),
+    ("gathering", "gathering.subjects", setup_gathering, run_gathering_subjects),
+    (
+        "gathering",
+        "gathering.subjects_with_text",
+        setup_gathering,
+        run_gathering_subjects_with_text,
+    ),
+    ("gathering", "gathering.combined", setup_gathering, run_gathering_combined),
+    ("concat", "concat.subjects_with_text", ensure_gathered, run_concat),
+    ("profiling", "profiling.load_dataset", ensure_concatenated, load_dataset),
+    (
+        "profiling",
+        "profiling.cardinality",
+        ensure_dataset,
+        profiling_function(
+            "statistical", "calculate_cardinality", attributes=PROFILING_ATTRIBUTES
+        ),
+    ),
+    (
+        "profiling",
+        "profiling.class_ratio",
+        ensure_dataset,
+        profiling_function(
+            "statistical", "calculate_class_ratio", attribute="legislativeSubjects"
+        ),
+    ),
+    ("profiling", "profiling.gini_entropy", ensure_dataset, run_gini_and_entropy),
+    (
+        "profiling",
+        "profiling.chi_squared",
+        ensure_dataset,
+        profiling_function(
+            "statistical",
+            "chi_squared_test",
+            attributes=["policyArea", "legislativeSubjects"],
+        ),
+    ),
+    (
+        "profiling",
+        "profiling.cramers_v_heatmap",
+        ensure_dataset,
+        profiling_function(
+            "statistical", "plot_cramers_v_heatmap", attributes=PROFILING_ATTRIBUTES
+        ),
+    ),
+    (
+        "profiling",
+        "profiling.cross_tabulation_heatmap",
+        ensure_dataset,
+        profiling_function(
+            "general",
+            "cross_tabulation_heatmap",
+            attributes=["legislativeSubjects", "policyArea"],
+            n1=20,
+            n2=20,
+        ),
+    ),
+    (
+        "profiling",
+        "profiling.frequent_combination_heatmap",
+        ensure_dataset,
+        profiling_function("general", "frequent_combination_heatmap"),
+    ),
+    (
+        "resampling",
+        "resampling.random_undersampling",
+        ensure_resampling_dataset,
+        resampling_function([RUS]),
+    ),
+    (
+        "resampling",
+        "resampling.random_oversampling",
+        ensure_resampling_dataset,
+        resampling_function([ROS]),
+    ),
+    (
+        "resampling",
+        "resampling.rus_ros",
+        ensure_resampling_dataset,
+        resampling_function([RUS, ROS]),
+    ),
+    (
+        "resampling",
+        "resampling.rus_ros_schema_typed",
+        ensure_dataset,
+        resampling_function([RUS, ROS], schema_typed=True),
+    ),
+]
+
+
+def git_revision() -> dict:
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=BILLS_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def summarise_times(times: list) -> dict:
+    if not times:
+        return {}
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+
+
+def run_benchmarks(
+    ctx: BenchmarkContext,
+    stages: list = STAGES,
+    repeat: int = 3,
+    names: list = None,
+) -> dict:
+    """
+    Runs the selected benchmark cases, each `repeat` times.
+    Setup (and any prerequisite stage outputs) is run untimed before every repeat.
+    Returns a dictionary of timings per case.
+    """
+    results = {}
+    for stage, name, setup, run in BENCHMARKS:
+        if stage not in stages or (names and name not in names):
+            continue
+        if stage == "retrieval" and ctx.api is None:
+            logger.warning(f"Skipping {name}: no fake API configured")
+            continue
+        logger.info(f"Running benchmark: {name}")
+        times = []
+        result = {"stage": stage, "repeat": repeat}
+        for _ in range(repeat):
+            try:
+                setup(ctx)
+                if ctx.api is not None:
+                    ctx.api.stats.clear()
+                start = time.perf_counter()
+                info = run(ctx)
+                times.append(time.perf_counter() - start)
+            except Exception as e:
+                logger.exception(f"Benchmark failed: {name}")
+                result["error"] = f"{type(e).__name__}: {e}"
+                break
+            if info:
+                result["info"] = info
+            if stage == "retrieval":
+                result["responses"] = {
+                    str(status): count for status, count in ctx.api.stats.items()
+                }
+        result["times"] = times
+        result.update(summarise_times(times))
+        results[name] = result
+        logger.info(f"{name}: {result.get('min')}")
+    return results
+
+
+def write_results(
+    output_path: Path, results: dict, corpus: dict, parameters: dict
+) -> Path:
+    document = {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": corpus,
+            "parameters": parameters,
+        },
+        "results": results,
+    }
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    json.dump(document, output_path.open("w"), indent=2)
+    return output_path
+
+
+def compare_results(baseline: dict, candidate: dict, statistic: str = "min") -> list:
+    """
+    Returns rows of (name, baseline, candidate, ratio) for the cases present in
+    both benchmark result documents. A ratio above 1 means the candidate is slower.
+    """
+    rows = []
+    for name, candidate_result in candidate.get("results", {}).items():
+        baseline_result = baseline.get("results", {}).get(name)
+        if not baseline_result:
+            continue
+        before = baseline_result.get(statistic)
+        after = candidate_result.get(statistic)
+        ratio = after / before if before and after else None
+        rows.append((name, before, after, ratio))
+    return rows
@@ -0,0 +1,34 @@
+import importlib
+import importlib.util
+import sys
+
+from pathlib import Path
+
+BILLS_DIR = Path(__file__).resolve().parents[2]
+
+STAGE_DIRECTORIES = {
+    "retrieval": BILLS_DIR / "01_retrieval",
+    "gathering": BILLS_DIR / "02_gathering",
+    "profiling": BILLS_DIR / "03_profiling",
+    "resampling": BILLS_DIR / "04_mitigating_imbalance",
+}
+
+
+def load_stage_module(stage: str, module: str):
+    """
+    Imports `utils.<module>` from one of the pipeline stage directories.
+    Every stage has its own `utils` package, so each is registered under
+    a stage specific name (e.g. `gathering_utils.dataframe`) to avoid clashes.
+    """
+    package_name = f"{stage}_utils"
+    if package_name not in sys.modules:
+        utils_dir = STAGE_DIRECTORIES[stage] / "utils"
+        spec = importlib.util.spec_from_file_location(
+            package_name,
+            utils_dir / "__init__.py",
+            submodule_search_locations=[str(utils_dir)],
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[package_name] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f"{package_name}.{module}")
@@ -0,0 +1,352 @@
+import json
+import logging
+import random
+
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.congress.gov/v3/"
+TEXT_URL = "https://www.congress.gov/"
+
+BILL_TYPES = ["hr", "s", "hres", "sres", "hjres", "sjres", "hconres", "sconres"]
+BILL_TYPE_WEIGHTS = [0.55, 0.3, 0.06, 0.04, 0.02, 0.01, 0.01, 0.01]
+
+POLICY_AREAS = [
+    "Agriculture and Food",
+    "Animals",
+    "Armed Forces and National Security",
+    "Arts, Culture, Religion",
+    "Civil Rights and Liberties, Minority Issues",
+    "Commerce",
+    "Congress",
+    "Crime and Law Enforcement",
+    "Economics and Public Finance",
+    "Education",
+    "Emergency Management",
+    "Energy",
+    "Environmental Protection",
+    "Families",
+    "Finance and Financial Sector",
+    "Foreign Trade and International Finance",
+    "Government Operations and Politics",
+    "Health",
+    "Housing and Community Development",
+    "Immigration",
+    "International Affairs",
+    "Labor and Employment",
+    "Law",
+    "Native Americans",
+    "Private Legislation",
+    "Public Lands and Natural Resources",
+    "Science, Technology, Communications",
+    "Social Sciences and History",
+    "Social Welfare",
+    "Sports and Recreation",
+    "Taxation",
+    "Transportation and Public Works",
+    "Water Resources Development",
+]
+
+TEXT_VERSION_TYPES = {
+    "h": ["Introduced in House", "Reported in House", "Engrossed in House"],
+    "s": ["Introduced in Senate", "Reported in Senate", "Engrossed in Senate"],
+}
+TEXT_VERSION_CODES = {
+    "Introduced in House": "ih",
+    "Reported in House": "rh",
+    "Engrossed in House": "eh",
+    "Introduced in Senate": "is",
+    "Reported in Senate": "rs",
+    "Engrossed in Senate": "es",
+    "Enrolled Bill": "enr",
+}
+
+WORDS = (
+    "the of and to in a be shall section act for by such or any secretary "
+    "under this state united states amended subsection paragraph fiscal year "
+    "federal program funds appropriated authorized provision public law code "
+    "title described agency report congress committee date enactment purpose"
+).split()
+
+
+def congress_start_year(congress: int) -> int:
+    return 1789 + 2 * (congress - 1)
+
+
+def subject_names(n_subjects: int) -> list:
+    return [f"Synthetic subject {i:05d}" for i in range(n_subjects)]
+
+
+def zipf_weights(n: int, exponent: float) -> list:
+    return [1 / (rank**exponent) for rank in range(1, n + 1)]
+
+
+def sample_without_replacement(
+    rng: random.Random, population: list, weights: list, k: int
+) -> list:
+    """
+    Weighted sample of k distinct items (Efraimidis-Spirakis keys)
+    """
+    k = min(k, len(population))
+    keys = [rng.random() ** (1 / w) for w in weights]
+    ranked = sorted(range(len(population)), key=keys.__getitem__, reverse=True)
+    return [population[i] for i in ranked[:k]]
+
+
+def synthetic_text(rng: random.Random, size: int, header: str) -> str:
+    body = []
+    length = len(header)
+    while length < size:
+        line = " ".join(rng.choices(WORDS, k=12))
+        body.append(line)
+        length += len(line) + 1
+    return f"<html><body><pre>\n{header}\n" + "\n".join(body) + "\n</pre></body></html>"
+
+
+def synthetic_xml(rng: random.Random, size: int, header: str) -> str:
+    text = synthetic_text(rng, size, header)
+    return f'<?xml version="1.0"?>\n<bill><text>{text}</text></bill>'
+
+
+def text_versions_for_bill(
+    rng: random.Random, congress: int, house: str, text_versions: int
+) -> list:
+    chamber = "s" if house.startswith("s") else "h"
+    version_types = TEXT_VERSION_TYPES[chamber] + ["Enrolled Bill"]
+    start_year = congress_start_year(congress)
+    day = rng.randint(3, 300)
+    versions = []
+    for version_type in version_types[:text_versions]:
+        month, day_of_month = divmod(day, 28)
+        versions.append(
+            (
+                version_type,
+                f"{start_year}-{month + 1:02d}-{day_of_month + 1:02d}T04:00:00Z",
+            )
+        )
+        day = min(day + rng.randint(5, 60), 28 * 12 - 1)
+    return versions
+
+
+def bill_documents(
+    rng: random.Random,
+    congress: int,
+    house: str,
+    bill_number: int,
+    subjects: list,
+    policy_area: str,
+    text_versions: int,
+    has_subjects: bool,
+    has_text: bool,
+):
+    """
+    Returns the API documents stored for a single bill:
+    bill.json, subjects.json, summaries.json and text.json, as
+    written by `fetch_and_store_bill_data`.
+    """
+    bill_api_url = f"{API_URL}bill/{congress}/{house}/{bill_number}"
+    request = {
+        "billNumber": str(bill_number),
+        "billType": house,
+        "congress": str(congress),
+        "contentType": "application/json",
+        "format": "json",
+    }
+    versions = text_versions_for_bill(rng, congress, house, text_versions)
+
+    bill = {
+        "congress": congress,
+        "number": str(bill_number),
+        "type": house.upper(),
+        "title": f"Synthetic bill {congress} {house.upper()} {bill_number}",
+        "policyArea": {"name": policy_area},
+        "summaries": {"count": 1, "url": f"{bill_api_url}/summaries?format=json"},
+    }
+    if has_subjects:
+        bill["subjects"] = {
+            "count": len(subjects),
+            "url": f"{bill_api_url}/subjects?format=json",
+        }
+    if has_text:
+        bill["textVersions"] = {
+            "count": len(versions),
+            "url": f"{bill_api_url}/text?format=json",
+        }
+
+    subjects_json = {
+        "subjects": {
+            "legislativeSubjects": [
+                {"name": name, "updateDate": versions[0][1]} for name in subjects
+            ],
+            "policyArea": {"name": policy_area},
+        },
+        "pagination": {"count": len(subjects)},
+        "request": request,
+    }
+    summaries_json = {
+        "summaries": [
+            {
+                "actionDate": date[:10],
+                "actionDesc": version_type,
+                "text": f"<p><strong>{bill['title']}</strong></p><p>{version_type}.</p>",
+                "updateDate": date,
+                "versionCode": f"{index:02d}",
+            }
+            for index, (version_type, date) in enumerate(versions)
+        ],
+        "pagination": {"count": len(versions)},
+        "request": request,
+    }
+    text_json = {"textVersions": [], "pagination": {"count": len(versions)}}
+    text_json["request"] = request
+    for version_type, date in reversed(versions):
+        file_stem = (
+            f"BILLS-{congress}{house}{bill_number}{TEXT_VERSION_CODES[version_type]}"
+        )
+        text_url = f"{TEXT_URL}{congress}/bills/{house}{bill_number}/{file_stem}"
+        text_json["textVersions"].append(
+            {
+                "date": date,
+                "type": version_type,
+                "formats": [
+                    {"type": "Formatted Text", "url": f"{text_url}.htm"},
+                    {"type": "PDF", "url": f"{text_url}.pdf"},
+                    {"type": "Formatted XML", "url": f"{text_url}.xml"},
+                ],
+            }
+        )
+    return {"bill": bill}, subjects_json, summaries_json, text_json
+
+
+def generate_synthetic_corpus(
+    output_location: Path,
+    congresses: list = [117, 118],
+    bills_per_congress: int = 500,
+    subjects_per_bill: int = 8,
+    text_versions: int = 2,
+    text_size: int = 20_000,
+    n_subjects: int = 1000,
+    subject_skew: float = 1.1,
+    page_limit: int = 250,
+    missing_fraction: float = 0.05,
+    seed: int = 42,
+) -> dict:
+    """
+    Writes a synthetic `source_pages`/`source_bills` tree under output_location
+    with the same layout and JSON shapes stored by the retrieval scripts.
+    Subjects are drawn from a Zipf distribution so the corpus is imbalanced
+    like the real data. Returns a summary of the generated corpus.
+    """
+    rng = random.Random(seed)
+    output_location = Path(output_location)
+    pages_dir = output_location / "source_pages"
+    bills_dir = output_location / "source_bills"
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    bills_dir.mkdir(parents=True, exist_ok=True)
+
+    subjects_pool = subject_names(n_subjects)
+    subject_weights = zipf_weights(n_subjects, subject_skew)
+    policy_weights = zipf_weights(len(POLICY_AREAS), 0.8)
+
+    summary = {
+        "congresses": list(congresses),
+        "bills_per_congress": bills_per_congress,
+        "subjects_per_bill": subjects_per_bill,
+        "text_versions": text_versions,
+        "text_size": text_size,
+        "n_subjects": n_subjects,
+        "page_limit": page_limit,
+        "seed": seed,
+        "bills": 0,
+        "text_files": 0,
+    }
+    for congress in congresses:
+        logger.info(f"Generating congress: {congress}")
+        numbers = {house: 0 for house in BILL_TYPES}
+        page_bills = []
+        for _ in range(bills_per_congress):
+            house = rng.choices(BILL_TYPES, weights=BILL_TYPE_WEIGHTS)[0]
+            numbers[house] += 1
+            bill_number = numbers[house]
+            n_bill_subjects = max(1, int(rng.expovariate(1 / subjects_per_bill)))
+            subjects = sample_without_replacement(
+                rng, subjects_pool, subject_weights, n_bill_subjects
+            )
+            policy_area = rng.choices(POLICY_AREAS, weights=policy_weights)[0]
+            has_subjects = rng.random() >= missing_fraction
+            has_text = rng.random() >= missing_fraction
+
+            bill_json, subjects_json, summaries_json, text_json = bill_documents(
+                rng=rng,
+                congress=congress,
+                house=house,
+                bill_number=bill_number,
+                subjects=subjects,
+                policy_area=policy_area,
+                text_versions=text_versions,
+                has_subjects=has_subjects,
+                has_text=has_text,
+            )
+            bill_dir = bills_dir / str(congress) / house / str(bill_number)
+            bill_dir.mkdir(parents=True, exist_ok=True)
+            json.dump(bill_json, (bill_dir / "bill.json").open("w"), indent=2)
+            json.dump(summaries_json, (bill_dir / "summaries.json").open("w"), indent=2)
+            if has_subjects:
+                json.dump(
+                    subjects_json, (bill_dir / "subjects.json").open("w"), indent=2
+                )
+            if has_text:
+                json.dump(text_json, (bill_dir / "text.json").open("w"), indent=2)
+                for version in text_json["textVersions"]:
+                    header = f"{house.upper()} {bill_number} {version['type']}"
+                    for format in version["formats"]:
+                        file_name = format["url"].split("/")[-1]
+                        if file_name.endswith(".htm"):
+                            text = synthetic_text(rng, text_size, header)
+                        elif file_name.endswith(".xml"):
+                            text = synthetic_xml(rng, text_size, header)
+                        else:
+                            continue
+                        (bill_dir / file_name).write_text(text, encoding="utf-8")
+                        summary["text_files"] += 1
+
+            page_bills.append(
+                {
+                    "congress": congress,
+                    "number": str(bill_number),
+                    "type": house.upper(),
+                    "title": bill_json["bill"]["title"],
+                    "url": f"{API_URL}bill/{congress}/{house}/{bill_number}?format=json",
+                }
+            )
+            summary["bills"] += 1
+
+        for page_offset in range(0, len(page_bills), page_limit):
+            page_json = {
+                "bills": page_bills[page_offset : page_offset + page_limit],
+                "pagination": {"count": len(page_bills)},
+                "request": {"congress": str(congress), "format": "json"},
+            }
+            status = {
+                "source": str(pages_dir / f"{congress}_{page_offset}.json"),
+                "bills": {
+                    f"{b['congress']}/{b['type'].lower()}/{b['number']}": {
+                        "processed": False
+                    }
+                    for b in page_json["bills"]
+                },
+            }
+            json.dump(
+                page_json,
+                (pages_dir / f"{congress}_{page_offset}.json").open("w"),
+                indent=2,
+            )
+            json.dump(
+                status,
+                (pages_dir / f"{congress}_{page_offset}.status.json").open("w"),
+                indent=2,
+            )
+
+    json.dump(summary, (output_location / "corpus.json").open("w"), indent=2)
+    return summary
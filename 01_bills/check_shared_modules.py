@@ -0,0 +1,76 @@
+import sys
+import typer
+import difflib
+
+from pathlib import Path
+from typing_extensions import Annotated
+
+# modules copied into the utils package of each stage using them (the scripts of a stage only import
+# its own utils), the first stage being the one where the module is edited
+SHARED_MODULES = {
+    "hashing.py": ["03_profiling", "04_mitigating_imbalance"],
+    "list_codec.py": ["02_gathering", "03_profiling", "04_mitigating_imbalance"],
+    "schema.py": ["02_gathering", "03_profiling", "04_mitigating_imbalance"],
+    "text_versions.py": ["01_retrieval", "02_gathering"],
+}
+ROOT = Path(__file__).parent
+
+
+def differing_copies(root: Path = ROOT) -> dict:
+    """
+    Returns the copies of each shared module which differ from the first one, with their unified diff
+    """
+    differing = {}
+    for module, stages in SHARED_MODULES.items():
+        source = root / stages[0] / "utils" / module
+        source_lines = source.read_text().splitlines(keepends=True)
+        for stage in stages[1:]:
+            copy = root / stage / "utils" / module
+            copy_lines = (
+                copy.read_text().splitlines(keepends=True) if copy.exists() else []
+            )
+            if copy_lines != source_lines:
+                differing[copy] = "".join(
+                    difflib.unified_diff(
+                        source_lines,
+                        copy_lines,
+                        str(source.relative_to(root)),
+                        str(copy.relative_to(root)),
+                    )
+                )
+    return differing
+
+
+def check_shared_modules(
+    fix: Annotated[
+        bool,
+        typer.Option(
+            help="Overwrite the differing copies with the module of the first stage."
+        ),
+    ] = False,
+):
+    """
+    Checks that the copies of the shared modules (SHARED_MODULES) are identical, exiting with 1 and
+    printing their diff otherwise
+    """
+    differing = differing_copies()
+    for copy, diff in differing.items():
+        if fix:
+            module = copy.name
+            copy.write_text(
+                (ROOT / SHARED_MODULES[module][0] / "utils" / module).read_text()
+            )
+            print(f"Updated: {copy.relative_to(ROOT)}")
+        else:
+            print(diff)
+    if differing and not fix:
+        print(
+            f"{len(differing)} shared module copies differ, edit the module of the first stage "
+            f"and run with --fix",
+            file=sys.stderr,
+        )
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(check_shared_modules)
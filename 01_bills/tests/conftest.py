@@ -0,0 +1,21 @@
+import importlib.util
+
+from pathlib import Path
+
+import pytest
+
+# every stage has its own `utils` package, loaded under a stage specific name as by the benchmarks
+_spec = importlib.util.spec_from_file_location(
+    "benchmarking_stages",
+    Path(__file__).parents[1] / "benchmarking" / "utils" / "stages.py",
+)
+stages = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(stages)
+
+
+@pytest.fixture
+def load_stage_module():
+    """
+    Imports `utils.<module>` of a stage, e.g. load_stage_module("gathering", "list_codec")
+    """
+    return stages.load_stage_module
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from sklearn.neighbors import NearestNeighbors
+
+pytest.importorskip("pynndescent")
+
+
+@pytest.fixture
+def features(load_stage_module):
+    return load_stage_module("resampling", "features")
+
+
+@pytest.fixture
+def samples():
+    X = np.random.default_rng(42).normal(size=(200, 8))
+    # duplicated rows are at distance 0 of each other, so not necessarily their own first neighbour
+    X[100:150] = X[:50]
+    return X
+
+
+def test_fitted_neighbors_exclude_themselves(features, samples):
+    nn = features.ApproximateNearestNeighbors(n_neighbors=3, metric="euclidean")
+    distances, indices = nn.fit(samples).kneighbors()
+    assert indices.shape == distances.shape == (len(samples), 3)
+    assert not (indices == np.arange(len(samples))[:, None]).any()
+    # the duplicate of a row is its first neighbour
+    assert indices[:50, 0].tolist() == list(range(100, 150))
+    assert indices[100:150, 0].tolist() == list(range(50))
+    assert np.allclose(distances[:50, 0], 0)
+
+    exact_distances, _ = (
+        NearestNeighbors(n_neighbors=3).fit(samples).kneighbors(return_distance=True)
+    )
+    assert np.allclose(distances, exact_distances)
+
+
+def test_kneighbors_graph_has_no_self_loops(features, samples):
+    nn = features.ApproximateNearestNeighbors(n_neighbors=3, metric="euclidean")
+    graph = nn.fit(samples).kneighbors_graph()
+    assert graph.shape == (len(samples), len(samples))
+    assert (graph.sum(axis=1) == 3).all()
+    assert graph.diagonal().sum() == 0
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+import pytest
+
+ROUND_TRIP_LISTS = [
+    [],
+    [""],
+    ["Health", "Taxation"],
+    ["[Bracketed] subject"],
+    ["a|b", "c"],
+    ['"quoted", subject', "new\nline"],
+    ["null"],
+]
+
+
+@pytest.fixture(params=["gathering", "profiling", "resampling"])
+def list_codec(request, load_stage_module):
+    return load_stage_module(request.param, "list_codec")
+
+
+@pytest.mark.parametrize("values", ROUND_TRIP_LISTS)
+def test_list_round_trip(list_codec, values):
+    assert list_codec.decode_list(list_codec.encode_list(values)) == values
+
+
+def test_csv_round_trip(list_codec):
+    dataframe = pd.DataFrame(
+        {
+            "billNumber": range(len(ROUND_TRIP_LISTS)),
+            "legislativeSubjects": ROUND_TRIP_LISTS,
+        }
+    )
+    buffer = io.StringIO()
+    list_codec.write_csv_with_lists(dataframe, buffer, index=False)
+    buffer.seek(0)
+    read = list_codec.read_csv_with_lists(buffer)
+    assert read["legislativeSubjects"].tolist() == ROUND_TRIP_LISTS
+    buffer.seek(0)
+    chunks = list_codec.read_csv_with_lists(buffer, chunksize=2)
+    assert [values for chunk in chunks for values in chunk["legislativeSubjects"]] == (
+        ROUND_TRIP_LISTS
+    )
+
+
+@pytest.mark.parametrize(
+    "value, values",
+    [
+        ("", []),
+        (None, []),
+        ("Health|Taxation", ["Health", "Taxation"]),
+        ("['Health', 'Taxation']", ["Health", "Taxation"]),
+        ("[Bracketed] subject", ["[Bracketed] subject"]),
+    ],
+)
+def test_decode_legacy_values(list_codec, value, values):
+    assert list_codec.decode_list(value) == values
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+CSV = """congress,billType,billNumber,legislativeSubjects,policyArea,billText
+117,hr,1,"[""Health""]",Health,text
+117,hr,2,[],,text
+117,s,3,[],,
+"""
+
+
+@pytest.fixture(params=["gathering", "profiling"])
+def schema(request, load_stage_module):
+    return load_stage_module(request.param, "schema")
+
+
+def test_empty_categories_are_missing(schema, tmp_path):
+    path = tmp_path / "dataset.csv"
+    path.write_text(CSV)
+    dataset = schema.read_csv_with_schema(path)
+    assert isinstance(dataset["policyArea"].dtype, pd.CategoricalDtype)
+    assert dataset["policyArea"].value_counts().to_dict() == (
+        pd.read_csv(path)["policyArea"].value_counts().to_dict()
+    )
+    assert dataset["policyArea"].isna().tolist() == [False, True, True]
+    assert dataset["billText"].tolist() == ["text", "text", ""]
+    assert dataset["legislativeSubjects"].tolist() == [["Health"], [], []]